@@ -151,6 +151,43 @@ def test_edge_cases():
         print(f"📊 Strategic: {np.rad2deg(strategic_result.target_yaw_delta):+.3f}°")
         print(f"⚡ Reactive:  {np.rad2deg(reactive_result.yaw_delta):+.3f}°")
 
+def test_planner_decisions():
+    """Verificar decisões dos planejadores vetorizados em cenários conhecidos."""
+    
+    strategic = StrategicPlanner()
+    reactive = ReactiveAvoider()
+    
+    # Obstáculo próximo (0.1m) à esquerda: strategic escolhe corredor livre,
+    # reactive desvia para a direita (yaw negativo)
+    depth_map = np.full((480, 640), 5.0, dtype=np.float32)
+    depth_map[:, :200] = 0.1
+    
+    for zone_mapper in (ZoneMapper(grid_h=6, grid_w=8), ZoneMapper(grid_h=48, grid_w=64)):
+        grid = zone_mapper.map_depth_to_zones(depth_map)
+        assert strategic.plan(grid).min_distance_ahead == 5.0
+        command = reactive.compute(grid)
+        assert command.yaw_delta == -0.6
+        assert command.forward_scale == 1.0 and not command.emergency_brake
+        
+        # Espelhado: obstáculo à direita
+        grid = zone_mapper.map_depth_to_zones(depth_map[:, ::-1].copy())
+        assert strategic.plan(grid).min_distance_ahead == 5.0
+        assert reactive.compute(grid).yaw_delta == 0.6
+    
+    zone_mapper = ZoneMapper(grid_h=6, grid_w=8)
+    
+    # Caminho livre: reativo segue em frente sem reduzir velocidade
+    grid = zone_mapper.map_depth_to_zones(create_test_depth_map("clear_path"))
+    command = reactive.compute(grid)
+    assert (command.yaw_delta, command.forward_scale, command.emergency_brake) == (0.0, 1.0, False)
+    
+    # Tudo muito próximo: frenagem de emergência
+    grid = zone_mapper.map_depth_to_zones(np.full((480, 640), 0.1, dtype=np.float32))
+    command = reactive.compute(grid)
+    assert command.emergency_brake and command.forward_scale == 0.0
+    assert strategic.plan(grid).min_distance_ahead < 0.15
+
 if __name__ == "__main__":
     test_algorithm_comparison()
-    test_edge_cases()
\ No newline at end of file
+    test_edge_cases()
+    test_planner_decisions()
\ No newline at end of file
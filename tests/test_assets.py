@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Teste dos assets estáticos da interface web (bytes crus/gzip, ETag, cache).
+"""
+
+import gzip
+import sys
+import os
+import threading
+import urllib.request
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.assets import (StaticAssets, accepts_gzip, IMMUTABLE_CACHE, REVALIDATE_CACHE)
+
+
+def test_index_references_versioned_assets():
+    """A página aponta para CSS/JS com ?v=hash; cada asset existe e o gzip descomprime igual."""
+    assets = StaticAssets()
+    index = assets.get('/')
+    assert index is assets.assets['index.html']
+    html = index.raw.decode('utf-8')
+    assert '{{asset:' not in html
+    for name in ('viewer.css', 'viewer.js'):
+        asset = assets.assets[name]
+        assert asset.url in html
+        assert assets.get(asset.url) is asset
+        assert gzip.decompress(asset.gzip) == asset.raw and len(asset.gzip) < len(asset.raw)
+    assert assets.get('/static/nao_existe.js') is None and assets.get('/data') is None
+    print("✅ Página com assets versionados: OK")
+
+
+def test_web_viewer_uses_shared_assets():
+    """web_viewer.html usa o mesmo CSS/JS (sem cópia inline) e web_viewer.py os serve em /static/."""
+    from tofcam import web_viewer
+
+    html = web_viewer.STATIC_ASSETS.get('/').raw.decode('utf-8')
+    assert '<style>' not in html and '<script>' not in html
+
+    server = web_viewer.ThreadedHTTPServer(('localhost', 0), web_viewer.TOFcamRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f"http://localhost:{server.server_address[1]}"
+        for name in ('viewer.css', 'viewer.js'):
+            asset = web_viewer.STATIC_ASSETS.assets[name]
+            assert asset.url in html
+            with urllib.request.urlopen(base + asset.url) as response:
+                assert response.status == 200 and response.read() == asset.raw
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ web_viewer com assets compartilhados: OK")
+
+
+def test_negotiation_and_revalidation():
+    """gzip só quando aceito; ETag forte por representação; 304 sem corpo."""
+    assets = StaticAssets()
+    index = assets.get('/')
+
+    status, body, headers = assets.response(index, '/', 'gzip, deflate, br')
+    headers = dict(headers)
+    assert status == 200 and body is index.gzip
+    assert headers['Content-Encoding'] == 'gzip' and headers['Vary'] == 'Accept-Encoding'
+    assert headers['Cache-Control'] == REVALIDATE_CACHE
+
+    status, body, plain = assets.response(index, '/', None)
+    plain = dict(plain)
+    assert status == 200 and body is index.raw and 'Content-Encoding' not in plain
+    assert plain['ETag'] != headers['ETag']
+
+    status, body, _ = assets.response(index, '/', 'gzip', headers['ETag'])
+    assert status == 304 and body == b''
+    # ETag da outra representação não vale
+    assert assets.response(index, '/', 'identity', headers['ETag'])[0] == 200
+
+    script = assets.assets['viewer.js']
+    assert dict(assets.response(script, script.url, 'gzip')[2])['Cache-Control'] == IMMUTABLE_CACHE
+
+    assert accepts_gzip('gzip') and accepts_gzip('br, gzip;q=0.5') and accepts_gzip('*')
+    assert not accepts_gzip('gzip;q=0') and not accepts_gzip('br') and not accepts_gzip(None)
+    print("✅ Negociação gzip e revalidação: OK")
+
+
+if __name__ == "__main__":
+    test_index_references_versioned_assets()
+    test_web_viewer_uses_shared_assets()
+    test_negotiation_and_revalidation()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Teste do formato binário das grades de zonas e do depth map.
+"""
+
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.binary import (GRID_HEADER, DEPTH_HEADER, DEPTH_UINT16,
+                           encode_grid, decode_grid, encode_depth, decode_depth)
+from tofcam.nav import ZoneMapper
+
+
+def test_grid_roundtrip():
+    """ZoneGrid real -> bytes -> arrays idênticos, offsets alinhados para typed arrays."""
+    rng = np.random.default_rng(5)
+    depth_map = rng.uniform(0.05, 1.0, (480, 640)).astype(np.float32)
+    grid = ZoneMapper(grid_h=7, grid_w=9, warn_threshold=0.35, emergency_threshold=0.2).map_depth_to_zones(depth_map)
+
+    payload = encode_grid(grid, frame_id=42)
+    cells = 7 * 9
+    assert GRID_HEADER.size % 4 == 0
+    assert len(payload) == GRID_HEADER.size + 64 + 2 * 4 * cells  # state preenchido até 64 bytes
+
+    frame_id, decoded = decode_grid(payload)
+    assert frame_id == 42 and (decoded.grid_h, decoded.grid_w) == (7, 9)
+    assert np.array_equal(decoded.state, grid.state)
+    assert np.array_equal(decoded.min_depth, grid.min_depth)
+    assert np.array_equal(decoded.mean_depth, grid.mean_depth)
+    assert np.isclose(decoded.depth_min, grid.depth_min) and np.isclose(decoded.depth_max, grid.depth_max)
+    print("✅ Grade binária: OK")
+
+
+def test_depth_roundtrip():
+    """float16 com erro relativo de meia precisão; uint16 com erro <= um passo de quantização."""
+    rng = np.random.default_rng(6)
+    depth_map = rng.uniform(0.2, 5.0, (240, 320)).astype(np.float32)
+
+    payload = encode_depth(depth_map, frame_id=7)
+    assert len(payload) == DEPTH_HEADER.size + 2 * depth_map.size
+    frame_id, depth = decode_depth(payload)
+    assert frame_id == 7 and depth.shape == (240, 320)
+    assert np.allclose(depth, depth_map, rtol=1e-3)
+
+    frame_id, depth = decode_depth(encode_depth(depth_map, frame_id=8, dtype=DEPTH_UINT16))
+    step = (depth_map.max() - depth_map.min()) / 65535
+    assert frame_id == 8 and np.abs(depth - depth_map).max() <= step
+
+    # Mapa constante não divide por zero
+    _, depth = decode_depth(encode_depth(np.full((4, 4), 2.0, np.float32), dtype=DEPTH_UINT16))
+    assert np.allclose(depth, 2.0)
+
+    try:
+        decode_depth(b'XXXX' + payload[4:])
+        assert False, "magic inválido deveria falhar"
+    except ValueError:
+        pass
+    print("✅ Depth binário: OK")
+
+
+if __name__ == "__main__":
+    test_grid_roundtrip()
+    test_depth_roundtrip()
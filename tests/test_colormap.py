@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Teste do colormap intuitivo de profundidade (lookup table).
+"""
+
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.colormap import DepthColormap, DEPTH_COLORMAP
+
+
+def reference_color(depth_norm, contrast=1.8):
+    """Cor BGR de um pixel calculada como no laço por pixel original."""
+    val = (1.0 - depth_norm) ** (1.0 / contrast)
+    if val <= 0.25:
+        r, g = 255, int(128 * val / 0.25)
+    elif val <= 0.5:
+        r, g = 255, int(128 + 127 * (val - 0.25) / 0.25)
+    elif val <= 0.75:
+        r, g = int(255 - 255 * (val - 0.5) / 0.25), 255
+    else:
+        r, g = 0, int(255 - 255 * (val - 0.75) / 0.25)
+    return np.array([0, g, r])
+
+
+def test_intuitive_scheme():
+    """Valor máximo = vermelho, mínimo = preto; LUT próxima do cálculo por pixel."""
+    depth = np.linspace(0.0, 5.0, 64 * 48, dtype=np.float32).reshape(48, 64)
+
+    for colormap in (DEPTH_COLORMAP, DepthColormap(size=1024)):
+        colored = colormap.apply(depth)
+        assert colored.shape == (48, 64, 3) and colored.dtype == np.uint8
+        assert list(colored[-1, -1]) == [0, 0, 255]  # valor máximo: vermelho
+        assert list(colored[0, 0]) == [0, 0, 0]      # valor mínimo: preto
+
+        normalized = depth / depth.max()
+        reference = np.array([reference_color(v) for v in normalized.ravel()]).reshape(colored.shape)
+        # Diferença só da quantização da tabela (maior perto da curva de contraste)
+        tolerance = 16 if colormap.size == 256 else 8
+        assert np.abs(colored.astype(int) - reference).max() <= tolerance
+
+    # Mapa constante não divide por zero
+    assert DEPTH_COLORMAP.apply(np.full((4, 4), 0.5, np.float32)).shape == (4, 4, 3)
+    print("✅ Colormap intuitivo: OK")
+
+
+if __name__ == "__main__":
+    test_intuitive_scheme()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Teste da descoberta de câmeras: sondagem paralela com timeout e cache
+indexado pela identidade dos dispositivos.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.discovery import CameraDiscovery
+
+
+class FakeProber:
+    """Câmeras 1 e 3 funcionam; cada sonda demora `delay`; `hang` nunca responde."""
+
+    def __init__(self, working=(1, 3), delay=0.2, hang=()):
+        self.working = set(working)
+        self.delay = delay
+        self.hang = set(hang)
+        self.calls = []
+        self._release = threading.Event()
+
+    def __call__(self, index):
+        self.calls.append(index)
+        if index in self.hang:
+            self._release.wait(10)
+            return None
+        time.sleep(self.delay)
+        return {'index': index, 'shape': [480, 640, 3]} if index in self.working else None
+
+
+def test_parallel_probe_with_timeout():
+    """5 sondas de 0.2s em paralelo; uma câmera travada só custa o timeout."""
+    prober = FakeProber(hang=(4,))
+    discovery = CameraDiscovery(timeout=0.5, state_file=None, prober=prober, fingerprint=lambda: 'a')
+
+    start = time.monotonic()
+    cameras = discovery.discover()
+    elapsed = time.monotonic() - start
+
+    assert cameras == [1, 3]
+    assert sorted(prober.calls) == [0, 1, 2, 3, 4]
+    assert elapsed < 0.8, elapsed
+    prober._release.set()
+    print(f"✅ Sondagem paralela com timeout ({elapsed:.2f}s): OK")
+
+
+def test_cache_keyed_on_devices():
+    """Mesma identidade de dispositivos: cache sem sondar; identidade nova: re-sonda."""
+    fingerprint = {'value': 'video0:video1'}
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'tofcam', 'cameras.json')
+
+        def discovery(prober):
+            return CameraDiscovery(state_file=state_file, prober=prober,
+                                   fingerprint=lambda: fingerprint['value'])
+
+        cold = FakeProber(delay=0)
+        assert discovery(cold).discover() == [1, 3]
+        assert len(cold.calls) == 5
+
+        # Partida quente: nenhuma câmera aberta
+        warm_prober = FakeProber(delay=0)
+        warm = discovery(warm_prober)
+        assert warm.discover() == [1, 3]
+        assert warm.from_cache and warm_prober.calls == []
+        assert warm.details[3]['shape'] == [480, 640, 3]
+
+        # Câmera conectada: identidade muda, nova sondagem
+        fingerprint['value'] = 'video0:video1:video2'
+        plugged = FakeProber(working=(1, 2, 3), delay=0)
+        rescanned = discovery(plugged)
+        assert rescanned.discover() == [1, 2, 3]
+        assert not rescanned.from_cache and len(plugged.calls) == 5
+    print("✅ Cache por identidade dos dispositivos: OK")
+
+
+def test_background_rescan():
+    """Rescan em segundo plano avisa quando a lista de câmeras muda."""
+    fingerprint = {'value': 'a'}
+    prober = FakeProber(delay=0)
+    discovery = CameraDiscovery(state_file=None, prober=prober, fingerprint=lambda: fingerprint['value'])
+    discovery.discover()
+
+    changes = []
+    changed = threading.Event()
+    discovery.start_rescan(lambda cameras: (changes.append(cameras), changed.set()), interval=0.05)
+    try:
+        time.sleep(0.2)
+        assert changes == []  # Identidade igual: nenhuma sondagem
+        assert len(prober.calls) == 5
+
+        prober.working = {0, 1, 3}
+        fingerprint['value'] = 'b'
+        assert changed.wait(2)
+        assert changes == [[0, 1, 3]]
+    finally:
+        discovery.stop_rescan()
+    print("✅ Rescan em segundo plano: OK")
+
+
+if __name__ == "__main__":
+    test_parallel_probe_with_timeout()
+    test_cache_keyed_on_devices()
+    test_background_rescan()
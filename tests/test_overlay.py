@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Teste do compositor de labels (sprites pré-renderizados).
+Compara com o desenho direto: sombra + texto com cv2.putText sobre o frame.
+"""
+
+import cv2
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.overlay import OverlayCompositor
+
+
+def reference_label(img, text, position, scale=0.5, thickness=1):
+    """Texto com contraste automático desenhado direto no frame, como antes."""
+    x, y = position
+    region = img[max(0, int(y - 20 * scale)):int(y + 5), max(0, int(x - 5)):int(x + len(text) * 10 * scale + 5)]
+    if np.mean(cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)) < 128:
+        text_color, shadow_color = (255, 255, 255), (0, 0, 0)
+    else:
+        text_color, shadow_color = (0, 0, 0), (255, 255, 255)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.putText(img, text, (x + 1, y + 1), font, scale, shadow_color, thickness + 1)
+    cv2.putText(img, text, (x, y), font, scale, text_color, thickness)
+
+
+def test_matches_direct_drawing():
+    """Sprites em fundo escuro, claro e ruidoso: mesma imagem a menos de arredondamento."""
+    rng = np.random.default_rng(0)
+    labels = [
+        ('original', "ORIGINAL", (10, 20), 0.5),
+        ('strategic', "STRATEGIC: +0.25", (10, 260), 0.5),
+        ('clock', "12:00:01", (10, 310), 0.4),
+    ]
+    backgrounds = [
+        np.full((480, 640, 3), 30, np.uint8),
+        np.full((480, 640, 3), 200, np.uint8),
+        rng.integers(0, 256, (480, 640, 3), dtype=np.uint8),
+    ]
+
+    overlay = OverlayCompositor()
+    for background in backgrounds:
+        expected, result = background.copy(), background.copy()
+        for slot, text, position, scale in labels:
+            reference_label(expected, text, position, scale)
+            assert overlay.draw(result, slot, text, position, scale=scale)
+        assert np.abs(expected.astype(int) - result).max() <= 2
+    print("✅ Sprites iguais ao desenho direto: OK")
+
+
+def test_rerender_only_on_change():
+    """Labels estáticos renderizados uma vez; dinâmicos só quando o texto muda."""
+    overlay = OverlayCompositor()
+    canvas = np.zeros((480, 640, 3), np.uint8)
+
+    for yaw in (0.1, 0.1, 0.1, -0.3):
+        overlay.draw(canvas, 'original', "ORIGINAL", (10, 20))
+        overlay.draw(canvas, 'strategic', f"STRATEGIC: {yaw:+.2f}", (10, 260))
+    assert overlay.renders == 3
+
+    # Fora da imagem: nada é desenhado
+    assert not overlay.draw(canvas, 'outside', "X", (700, 20))
+    print("✅ Re-renderização sob demanda: OK")
+
+
+if __name__ == "__main__":
+    test_matches_direct_drawing()
+    test_rerender_only_on_change()
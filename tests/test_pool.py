@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Teste do pool de buffers de frame: reuso, contabilidade de vazamentos e
+leitura/colormap escrevendo em buffers do pool.
+"""
+
+import gc
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.camera import CameraSource
+from tofcam.colormap import DEPTH_COLORMAP
+from tofcam.pool import FramePool
+
+
+def test_reuse_and_leak_accounting():
+    """Buffers voltam para o pool; devolução dupla é erro e buffers perdidos são contados."""
+    pool = FramePool()
+    with pool.lease("frame") as lease:
+        first = lease.acquire((480, 640, 3))
+        depth = lease.acquire((480, 640), np.float32)
+        assert first.shape == (480, 640, 3) and depth.dtype == np.float32
+        assert pool.in_use == 2
+    assert pool.in_use == 0
+
+    # Mesmo formato: o mesmo array volta, sem alocar
+    with pool.lease("frame") as lease:
+        assert lease.acquire((480, 640, 3)) is first
+    assert pool.stats()['allocations'] == 2 and pool.stats()['reuses'] == 1
+
+    buffer = pool.acquire(16, tag="teste")
+    assert [entry['tag'] for entry in pool.outstanding()] == ["teste"]
+    pool.release(buffer)
+    try:
+        pool.release(buffer)
+        assert False, "devolução dupla deveria falhar"
+    except ValueError:
+        pass
+
+    # Esquecido sem release(): o GC avisa o pool
+    pool.acquire((8, 8), tag="esquecido")
+    gc.collect()
+    stats = pool.stats()
+    assert stats['leaked'] == 1 and stats['in_use'] == 0
+    print("✅ Reuso e contabilidade de vazamentos: OK")
+
+
+def test_read_and_colormap_into_pool():
+    """Câmera e colormap escrevem nos buffers do pool, com o mesmo resultado de antes."""
+    pool = FramePool()
+    camera = CameraSource(use_test_image=True, test_size=(64, 48))
+    reference = CameraSource(use_test_image=True, test_size=(64, 48))
+    for _ in range(3):
+        with pool.lease("frame") as lease:
+            buffer = lease.acquire((48, 64, 3))
+            frame = camera.read(out=buffer)
+            assert frame is buffer and np.array_equal(frame, reference.read())
+
+            depth = frame[:, :, 2].astype(np.float32) / 255.0
+            color = DEPTH_COLORMAP.apply(depth, out=lease.acquire((48, 64, 3)), pool=pool)
+            assert np.array_equal(color, DEPTH_COLORMAP.apply(depth))
+    stats = pool.stats()
+    # Primeiro frame aloca; os seguintes só reutilizam
+    assert stats['allocations'] == 4 and stats['in_use'] == 0 and stats['leaked'] == 0
+    print("✅ Leitura e colormap em buffers do pool: OK")
+
+
+if __name__ == "__main__":
+    test_reuse_and_leak_accounting()
+    test_read_and_colormap_into_pool()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Teste da câmera sintética do CameraSource (use_test_image=True).
+"""
+
+import time
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.camera import THREADED_TEST_FPS, CameraSource, SyntheticObstacle
+
+
+def test_default_scene():
+    """Cena padrão: gradientes estáticos, canal animado e obstáculos fixos."""
+    camera = CameraSource(use_test_image=True)
+    assert camera.open()
+
+    first = camera.read()
+    second = camera.read()
+    assert first.shape == (480, 640, 3) and first.dtype == np.uint8
+    assert first[0, 639, 0] == 255 * 639 // 640
+    assert first[479, 0, 1] == 255 * 479 // 480
+    assert np.array_equal(first[:, :, :2], second[:, :, :2])
+    assert not np.array_equal(first[:, :, 2], second[:, :, 2])
+
+    # Retângulo branco e círculo amarelo nas posições originais
+    assert (first[200, 250] == 255).all()
+    assert list(first[350, 450]) == [0, 255, 255]
+    camera.release()
+    print("✅ Cena padrão: OK")
+
+
+def test_resolution_obstacles_and_pacing():
+    """Resolução configurável, obstáculo em movimento e ritmo por test_fps."""
+    obstacle = SyntheticObstacle("rect", (0.1, 0.5), (0.05, 0.1), (255, 255, 255), velocity=(0.2, 0.0))
+    camera = CameraSource(use_test_image=True, test_size=(320, 240), test_obstacles=[obstacle])
+
+    frames = [camera.read() for _ in range(3)]
+    assert frames[0].shape == (240, 320, 3)
+    columns = [np.flatnonzero((f[120] == 255).all(axis=-1)).mean() for f in frames]
+    assert columns[0] < columns[1] < columns[2]
+
+    # Rebote na borda: posição continua dentro de [0, 1]
+    assert np.allclose(obstacle.position(10), obstacle.position(0))
+    assert 0.0 <= obstacle.position(7)[0] <= 1.0
+
+    paced = CameraSource(use_test_image=True, test_size=(64, 48), test_fps=100.0)
+    start = time.perf_counter()
+    for _ in range(11):
+        paced.read()
+    assert time.perf_counter() - start >= 0.09
+    print("✅ Resolução, obstáculos e ritmo: OK")
+
+
+def test_threaded_latest_frame():
+    """Consumidor lento recebe o frame mais novo (idade < 1 período), buffers do anel e descartes contados."""
+    fps = 100.0
+    camera = CameraSource(use_test_image=True, test_size=(64, 48), test_fps=fps, threaded=True)
+    camera.open()
+    try:
+        ages, sequences = [], []
+        for _ in range(8):
+            time.sleep(0.03)  # "Inferência" 3x mais lenta que a câmera
+            latest = camera.read_latest(timeout=1.0)
+            assert latest is not None and latest.frame.shape == (48, 64, 3)
+            assert any(latest.frame is buffer for buffer in camera._ring)
+            ages.append(latest.age)
+            sequences.append(latest.sequence)
+
+        assert sequences == sorted(sequences) and len(set(sequences)) == len(sequences)
+        assert np.median(ages) < 1.0 / fps
+        assert camera.frames_dropped >= 8 and camera.frames_captured >= sequences[-1]
+
+        copy = camera.read()
+        assert copy is not None and not any(np.shares_memory(copy, buffer) for buffer in camera._ring)
+    finally:
+        camera.release()
+    assert camera._grab_thread is None
+
+    # test_fps = 0 com grabber: ritmo nominal, sem loop ocupando um núcleo
+    camera = CameraSource(use_test_image=True, test_size=(64, 48), threaded=True)
+    camera.open()
+    try:
+        time.sleep(0.3)
+    finally:
+        camera.release()
+    assert camera.frames_captured <= 0.3 * THREADED_TEST_FPS + 3, camera.frames_captured
+    print("✅ Grabber em segundo plano: OK")
+
+
+if __name__ == "__main__":
+    test_default_scene()
+    test_resolution_obstacles_and_pacing()
+    test_threaded_latest_frame()
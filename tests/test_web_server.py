@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+"""
+Teste do servidor web (tofcam/web.py) sem câmera: frames publicados manualmente.
+"""
+
+import base64
+import json
+import socket
+import threading
+import time
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.tof_types import EncodedFrame
+from tofcam import web
+
+
+def test_encoded_frame():
+    """Frame guarda bytes JPEG crus; base64/data URI só sob demanda e uma vez."""
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    image[:, 32:] = 255
+
+    frame = EncodedFrame.encode(image, quality=60, frame_id=7, timestamp=1.5)
+    assert isinstance(frame.jpeg, bytes) and frame.jpeg[:2] == b'\xff\xd8'
+    assert len(frame) == len(frame.jpeg)
+    assert (frame.frame_id, frame.timestamp) == (7, 1.5)
+
+    assert 'base64' not in vars(frame)
+    assert base64.b64decode(frame.base64) == frame.jpeg
+    assert frame.data_uri == 'data:image/jpeg;base64,' + frame.base64
+    assert vars(frame)['base64'] is frame.base64  # cacheado
+
+    try:
+        frame.jpeg = b''
+        assert False, "EncodedFrame deveria ser imutável"
+    except AttributeError:
+        pass
+    print("✅ EncodedFrame: OK")
+
+
+def test_lazy_depth_sources():
+    """Só as fontes de profundidade usadas pelo modo/pesos são calculadas."""
+    class CountingEstimator:
+        calls = 0
+
+        def estimate_depth(self, frame):
+            self.calls += 1
+            return np.full(frame.shape[:2], 0.5, np.float32)
+
+    viewer = web.TOFcamWebViewer()
+    viewer.depth_estimator = CountingEstimator()
+
+    viewer.depth_mode = "gradient"
+    assert viewer.depth_source_weights() == [("gradient", 1.0)]
+    viewer.depth_mode = "midas"
+    assert viewer.depth_source_weights() == [("primary", 1.0)]
+    viewer.depth_mode = "hybrid"
+    viewer.midas_weight, viewer.gradient_weight = 0.0, 0.58
+    assert viewer.depth_source_weights() == [("gradient", 1.0)]
+    viewer.midas_weight, viewer.gradient_weight = 0.75, 0.25
+    assert viewer.depth_source_weights() == [("primary", 0.75), ("gradient", 0.25)]
+
+    # Gradiente float32 igual ao cálculo float64 original
+    gray = (np.arange(48 * 64) % 251).astype(np.uint8).reshape(48, 64)
+    import cv2
+    grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    gradient = np.sqrt(grad_x ** 2 + grad_y ** 2)
+    expected = 1.0 - gradient / (gradient.max() + 1e-8)
+    depth = viewer._gradient_depth(gray)
+    assert depth.dtype == np.float32 and np.allclose(depth, expected, atol=1e-6)
+
+    # MiDaS só é chamado quando a fonte primária tem peso
+    class StillCamera:
+        def read(self):
+            return True, np.zeros((480, 640, 3), np.uint8)
+
+    viewer.camera_source = StillCamera()
+    viewer.depth_mode = "gradient"
+    assert viewer.process_frame() is not None
+    assert viewer.depth_estimator.calls == 0
+    viewer.depth_mode = "hybrid"
+    result = viewer.process_frame()
+    assert viewer.depth_estimator.calls == 1
+    # Mosaico 2x2 escrito no canvas preallocado, sem cópias por frame
+    assert result['combined'] is viewer._canvas and result['combined'].shape == (480, 640, 3)
+    print("✅ Fontes de profundidade sob demanda: OK")
+
+
+def test_client_overlay_mode():
+    """Modo client: só original | depth no JPEG, setas/labels/grades ficam para o navegador."""
+    class StillCamera:
+        def read(self):
+            return True, np.full((480, 640, 3), 90, np.uint8)
+
+    viewer = web.TOFcamWebViewer()
+    viewer.camera_source = StillCamera()
+    viewer.depth_mode = "gradient"
+
+    assert web.overlay_mode_action(viewer, {'mode': 'client'}) == {'success': True, 'mode': 'client'}
+    result = viewer.process_frame()
+    assert result['combined'] is viewer._panels and result['combined'].shape == (240, 640, 3)
+    assert result['overlay'] == 'client' and result['grids'] == {}
+    assert not web.overlay_mode_action(viewer, {'mode': 'svg'})['success']
+
+    web.overlay_mode_action(viewer, {'mode': 'server'})
+    result = viewer.process_frame()
+    assert result['overlay'] == 'server' and result['combined'].shape == (480, 640, 3)
+    assert 'grids' not in result
+
+    # Grade compacta: um dígito de CellState por célula, linha a linha
+    from tofcam.tof_types import ZoneGrid
+    state = np.array([[0, 1, 2], [2, 0, 0]], np.uint8)
+    grid = ZoneGrid(grid_h=2, grid_w=3, min_depth=np.zeros((2, 3)), mean_depth=np.zeros((2, 3)),
+                    state=state, depth_min=0.0, depth_max=1.0)
+    record = web.zone_grid_record(grid, (0.5, 1.0, 0.25, 0.75))
+    assert record == {'rows': 2, 'cols': 3, 'roi': [0.5, 1.0, 0.25, 0.75], 'states': '012200'}
+    json.dumps(record)
+    print("✅ Overlay no navegador: OK")
+
+
+def test_pooled_frame_buffers():
+    """Buffers do frame vêm do pool e voltam no publish seguinte: alocações param de crescer."""
+    rng = np.random.default_rng(2)
+    frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(2)]
+
+    class AlternatingCamera:
+        reads = 0
+
+        def read(self):
+            self.reads += 1
+            return True, frames[self.reads % 2]
+
+    viewer = web.TOFcamWebViewer()
+    viewer.camera_source = AlternatingCamera()
+    hub = web.FrameHub()
+    allocations = []
+    for frame_id in range(6):
+        lease = viewer.buffers.lease("frame")
+        result = viewer.process_frame(lease=lease)
+        hub.publish(EncodedFrame(b'jpeg'), {}, web.FrameArrays(result['depth_map'], {}, lease))
+        allocations.append(viewer.buffers.stats()['allocations'])
+    assert allocations[-1] == allocations[1], allocations
+
+    # Frame substituído: buffers devolvidos, depth do frame antigo não é mais servido
+    _, previous = hub.latest_arrays()
+    hub.publish(EncodedFrame(b'jpeg'), {}, None)
+    assert previous.retired and previous.depth() is None
+    stats = viewer.buffers.stats()
+    assert stats['in_use'] == 0 and stats['leaked'] == 0
+
+    # Sem lease: buffers devolvidos na hora, depth_map do result é do chamador
+    result = viewer.process_frame()
+    assert viewer.buffers.in_use == 0 and result['depth_map'].shape == (480, 640)
+    print("✅ Pool de buffers por frame: OK")
+
+
+def test_demand_driven_pipeline():
+    """Sem viewers: sem visualização/JPEG e taxa idle; cliente conectando volta ao normal em um frame."""
+    class CountingCamera:
+        reads = 0
+
+        def read(self):
+            CountingCamera.reads += 1
+            return True, np.full((480, 640, 3), 90, np.uint8)
+
+        def release(self):
+            pass
+
+    viewer = web.TOFcamWebViewer()
+    viewer.camera_source = CountingCamera()
+    viewer.depth_mode = "gradient"
+    viewer.idle_interval = 30.0
+    viewer.frame_interval = 0.02
+    viewer.start_capture()
+    try:
+        time.sleep(0.3)
+        assert viewer.pipeline_mode == "idle"
+        assert CountingCamera.reads == 1 and viewer.hub.frame is None
+
+        # Cliente de streaming acorda o loop na hora
+        start = time.time()
+        with viewer.hub.client():
+            frame_id, frame, _ = viewer.hub.wait(0, timeout=2.0)
+        assert frame is not None and time.time() - start < 1.0
+        assert viewer.pipeline_mode == "full"
+
+        # Só consumidor de navegação: dados a cada frame, nada publicado para a web
+        received = []
+        viewer.viewer_timeout = 0.0
+        viewer.add_navigation_consumer(received.append)
+        time.sleep(0.2)
+        published = viewer.hub.frame_id
+        time.sleep(0.2)
+        assert viewer.pipeline_mode == "navigation"
+        assert viewer.hub.frame_id == published and len(received) >= 5
+        assert {'strategic', 'reactive', 'frame_count'} <= set(received[-1])
+        viewer.remove_navigation_consumer(received.append)
+    finally:
+        viewer.stop_capture()
+    print("✅ Processamento sob demanda: OK")
+
+
+def test_async_camera_switch():
+    """POST responde na hora com o job; a câmera antiga transmite até a nova estar aquecida."""
+    class FakeCamera:
+        def __init__(self, value):
+            self.value = value
+            self.released = False
+
+        def read(self):
+            return True, np.full((480, 640, 3), self.value, np.uint8)
+
+        def release(self):
+            self.released = True
+
+    old_camera, new_camera = FakeCamera(40), FakeCamera(200)
+    opening = threading.Event()
+
+    viewer = web.TOFcamWebViewer()
+    viewer.camera_source = old_camera
+    viewer.available_cameras = [0, 1]
+    viewer.current_camera = 0
+    viewer.depth_mode = "gradient"
+    viewer.frame_interval = 0.02
+
+    def slow_open(camera_id, job=None):
+        job.update(state='warming')
+        opening.wait(2.0)
+        return new_camera
+    viewer._open_camera = slow_open
+
+    viewer.start_capture()
+    try:
+        with viewer.hub.client():
+            start = time.time()
+            response = web.switch_camera_action(viewer, {'camera_id': 1})
+            assert time.time() - start < 0.1
+            assert response['success'] and response['job'] == 1
+
+            # Durante o aquecimento: progresso em /cameras e frames da câmera antiga
+            time.sleep(0.1)
+            cameras = json.loads(web.cameras_payload(viewer))
+            assert cameras[1]['switch'] == {'id': 1, 'camera': 1, 'state': 'warming'}
+            assert cameras[0]['active'] and 'switch' not in cameras[0]
+            frame_id = viewer.hub.frame_id
+            assert viewer.hub.wait(frame_id, timeout=1.0)[1] is not None
+
+            opening.set()
+            deadline = time.time() + 2.0
+            while viewer.switch_jobs[1]['state'] != 'done' and time.time() < deadline:
+                time.sleep(0.01)
+            assert viewer.switch_jobs[1]['state'] == 'done'
+            assert viewer.current_camera == 1 and viewer.camera_source is new_camera
+            assert old_camera.released and not new_camera.released
+            assert json.loads(web.cameras_payload(viewer))[1]['active']
+
+        assert not web.switch_camera_action(viewer, {'camera_id': 7})['success']
+    finally:
+        viewer.stop_capture()
+    print("✅ Troca de câmera assíncrona: OK")
+
+
+def test_camera_switch_during_stuck_read():
+    """Capture_loop preso em read(): a troca acontece, mas a câmera antiga só é liberada depois do read()."""
+    class BlockingCamera:
+        def __init__(self):
+            self.stuck = threading.Event()
+            self.unblock = threading.Event()
+            self.blocked = threading.Event()
+            self.reading = False
+            self.released_while_reading = None
+
+        def read(self):
+            self.reading = True
+            if self.stuck.is_set():
+                self.blocked.set()
+                self.unblock.wait(5.0)
+            self.reading = False
+            return True, np.zeros((480, 640, 3), np.uint8)
+
+        def release(self):
+            self.released_while_reading = self.reading
+
+    class StillCamera:
+        def read(self):
+            return True, np.full((480, 640, 3), 200, np.uint8)
+
+    old_camera, new_camera = BlockingCamera(), StillCamera()
+    viewer = web.TOFcamWebViewer()
+    viewer.camera_source = old_camera
+    viewer.available_cameras = [0, 1]
+    viewer.depth_mode = "gradient"
+    viewer.frame_interval = 0.01
+    viewer.switch_timeout = 0.2
+    viewer._open_camera = lambda camera_id, job=None: new_camera
+
+    viewer.start_capture()
+    try:
+        old_camera.stuck.set()
+        assert old_camera.blocked.wait(2.0)
+        assert viewer.switch_camera(1)
+        # Trocou após o timeout, sem liberar a câmera que ainda está em read()
+        assert viewer.camera_source is new_camera
+        assert old_camera.released_while_reading is None
+
+        old_camera.unblock.set()
+        deadline = time.time() + 2.0
+        while old_camera.released_while_reading is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert old_camera.released_while_reading is False
+    finally:
+        old_camera.unblock.set()
+        viewer.stop_capture()
+    print("✅ Troca de câmera com read() em andamento: OK")
+
+
+def test_frame_hub_drop_to_latest():
+    """Cliente lento recebe sempre o frame mais recente, sem travar os demais."""
+    hub = web.FrameHub()
+    frames = [EncodedFrame(b'jpeg%d' % i, frame_id=i) for i in range(1, 6)]
+
+    hub.publish(frames[0], {'n': 1})
+    frame_id, frame, data = hub.wait(0, timeout=0.1)
+    assert (frame_id, frame, data) == (1, frames[0], {'n': 1})
+
+    # Sem frame novo: timeout devolve None
+    assert hub.wait(frame_id, timeout=0.01) == (1, None, None)
+
+    for i, frame in enumerate(frames[1:], start=2):
+        hub.publish(frame, {'n': i})
+    assert hub.wait(frame_id, timeout=0.1)[1] is frames[-1]
+
+    hub.close()
+    assert hub.wait(hub.frame_id, timeout=5.0)[1] is None  # não espera após close
+    print("✅ FrameHub drop-to-latest: OK")
+
+
+def test_published_frame_uses_hub_id():
+    """O frame publicado leva o frame_id do hub: /data?image=1, ETag e SSE falam do mesmo frame."""
+    hub = web.FrameHub()
+    viewer = type('Viewer', (), {'hub': hub})()
+    # Frames de navegação/ociosos pulados no capture_loop: contador local fica para trás
+    for stale_id in (1, 1, 2):
+        hub.publish(EncodedFrame(b'jpeg', frame_id=stale_id), {'frame_count': stale_id})
+
+    frame_id, frame, _ = hub.latest()
+    assert frame_id == 3 and frame.frame_id == frame_id
+    payload = json.loads(web.data_payload(viewer, '/data?image=1'))
+    assert payload['image_frame_id'] == frame_id
+    assert web.sse_event(frame_id, hub.data_json).startswith(b'id: %d\n' % payload['image_frame_id'])
+    hub.close()
+    print("✅ frame_id do frame publicado = frame_id do hub: OK")
+
+
+def test_mjpeg_many_viewers():
+    """20+ clientes MJPEG simultâneos recebem frames de uma única publicação."""
+    viewer = web.tofcam_viewer
+    hub = viewer.hub
+    hub.open()
+    server = web.ThreadedHTTPServer(('127.0.0.1', 0), web.TOFcamRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    clients = []
+    try:
+        for _ in range(24):
+            sock = socket.create_connection(server.server_address, timeout=5)
+            sock.sendall(b'GET /mjpeg HTTP/1.1\r\nHost: localhost\r\n\r\n')
+            clients.append(sock)
+        deadline = time.time() + 5
+        while hub.clients < len(clients) and time.time() < deadline:
+            time.sleep(0.01)
+        assert hub.clients == len(clients)
+
+        frame = EncodedFrame.encode(np.zeros((24, 32, 3), np.uint8), frame_id=1)
+        hub.publish(frame, {'frame_count': 0})
+
+        for sock in clients:
+            received = b''
+            while frame.jpeg not in received:
+                chunk = sock.recv(65536)
+                assert chunk, "conexão fechada antes do frame"
+                received += chunk
+            assert b'multipart/x-mixed-replace' in received
+    finally:
+        for sock in clients:
+            sock.close()
+        hub.close()
+        server.shutdown()
+        server.server_close()
+    print(f"✅ {len(clients)} clientes MJPEG: OK")
+
+
+def test_events_stream():
+    """SSE /events envia o JSON de cada frame publicado, serializado uma vez no hub."""
+    hub = web.tofcam_viewer.hub
+    hub.open()
+    server = web.ThreadedHTTPServer(('127.0.0.1', 0), web.TOFcamRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    sock = socket.create_connection(server.server_address, timeout=5)
+    try:
+        sock.sendall(b'GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        deadline = time.time() + 5
+        while hub.clients < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        data = {'frame_count': 41, 'strategic': 0.1, 'reactive': -0.2, 'timestamp': 1.0, 'camera': 0}
+        hub.publish(EncodedFrame(b'jpeg'), data)
+        expected = b'data: ' + hub.data_json + b'\n\n'
+        assert json.loads(hub.data_json) == data
+
+        received = b''
+        while expected not in received:
+            chunk = sock.recv(65536)
+            assert chunk, "conexão fechada antes do evento"
+            received += chunk
+        assert b'text/event-stream' in received
+        assert b'id: %d\n' % hub.frame_id in received
+    finally:
+        sock.close()
+        hub.close()
+        server.shutdown()
+        server.server_close()
+    print("✅ SSE /events: OK")
+
+
+def test_async_backend():
+    """Backend asyncio: mesmas rotas, centenas de streams ociosos sem uma thread cada."""
+    import asyncio
+    import urllib.request
+    from tofcam.web_async import AsyncWebServer
+
+    viewer = web.tofcam_viewer
+    hub = viewer.hub
+    hub.open()
+    loop = asyncio.new_event_loop()
+    server = AsyncWebServer(viewer, '127.0.0.1', 0)
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.port}'
+
+    clients = []
+    try:
+        threads_before = threading.active_count()
+        for _ in range(200):
+            sock = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+            sock.sendall(b'GET /mjpeg HTTP/1.1\r\nHost: localhost\r\n\r\n')
+            clients.append(sock)
+        deadline = time.time() + 5
+        while hub.clients < len(clients) and time.time() < deadline:
+            time.sleep(0.01)
+        assert hub.clients == len(clients)
+        assert threading.active_count() - threads_before < 10
+
+        # Publicação vinda de outra thread (como o capture_loop)
+        frame = EncodedFrame.encode(np.zeros((24, 32, 3), np.uint8), frame_id=1)
+        publisher = threading.Thread(target=hub.publish, args=(frame, {'frame_count': 0}))
+        publisher.start()
+        publisher.join()
+        for sock in clients[::20]:
+            received = b''
+            while frame.jpeg not in received:
+                chunk = sock.recv(65536)
+                assert chunk, "conexão fechada antes do frame"
+                received += chunk
+
+        assert urllib.request.urlopen(base + '/stream?1').read() == frame.jpeg
+        assert json.loads(urllib.request.urlopen(base + '/data').read()) == {'frame_count': 0}
+        assert b'TOFcam' in urllib.request.urlopen(base + '/').read()
+
+        request = urllib.request.Request(base + '/depth_mode', data=json.dumps({'mode': 'gradient'}).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        assert json.loads(urllib.request.urlopen(request).read()) == {'success': True, 'mode': 'gradient'}
+    finally:
+        for sock in clients:
+            sock.close()
+        viewer.depth_mode = 'hybrid'
+        hub.close()
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+    print("✅ Backend asyncio: OK")
+
+
+def check_keep_alive_and_etag(port):
+    """Várias requisições na mesma conexão; /stream responde 304 para o ETag atual."""
+    import http.client
+
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    connection.request('GET', '/stream')
+    response = connection.getresponse()
+    jpeg = response.read()
+    etag = response.getheader('ETag')
+    assert response.status == 200 and response.version == 11
+    assert int(response.getheader('Content-Length')) == len(jpeg)
+    assert etag and 'no-store' not in response.getheader('Cache-Control')
+
+    connection.request('GET', '/stream', headers={'If-None-Match': etag})
+    response = connection.getresponse()
+    assert response.status == 304 and response.read() == b''
+    assert response.getheader('ETag') == etag
+
+    connection.request('GET', '/data')
+    response = connection.getresponse()
+    assert response.status == 200 and json.loads(response.read()) is not None
+
+    # Página em cache: gzip negociado e 304 na revalidação
+    connection.request('GET', '/', headers={'Accept-Encoding': 'gzip'})
+    response = connection.getresponse()
+    page = response.read()
+    assert response.status == 200 and response.getheader('Content-Encoding') == 'gzip'
+    assert page == web.STATIC_ASSETS.get('/').gzip
+    connection.request('GET', '/', headers={'Accept-Encoding': 'gzip',
+                                            'If-None-Match': response.getheader('ETag')})
+    response = connection.getresponse()
+    assert response.status == 304 and response.read() == b''
+    sock = connection.sock
+    assert sock is not None  # mesma conexão TCP reaproveitada
+
+    web.tofcam_viewer.hub.publish(EncodedFrame(b'novo'), {})
+    connection.request('GET', '/stream', headers={'If-None-Match': etag})
+    response = connection.getresponse()
+    assert response.status == 200 and response.read() == b'novo'
+    assert response.getheader('ETag') != etag
+    assert connection.sock is sock
+    connection.close()
+
+
+def run_on_both_backends(check):
+    """Executar check(port) contra o servidor com threads e o asyncio."""
+    import asyncio
+    from tofcam.web_async import AsyncWebServer
+
+    server = web.ThreadedHTTPServer(('127.0.0.1', 0), web.TOFcamRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        check(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    loop = asyncio.new_event_loop()
+    async_server = AsyncWebServer(web.tofcam_viewer, '127.0.0.1', 0)
+    loop.run_until_complete(async_server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    try:
+        check(async_server.port)
+    finally:
+        web.tofcam_viewer.hub.close()
+        asyncio.run_coroutine_threadsafe(async_server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def test_keep_alive_and_etag():
+    """HTTP/1.1 persistente e GET condicional nos dois backends."""
+    hub = web.tofcam_viewer.hub
+    hub.open()
+    hub.publish(EncodedFrame(b'jpeg'), {'frame_count': 0})
+    run_on_both_backends(check_keep_alive_and_etag)
+    print("✅ Keep-alive e ETag: OK")
+
+
+def check_binary_endpoints(port):
+    """Grade e depth binários do frame atual; 503 sem grade; 304 com o ETag do frame."""
+    import http.client
+    from tofcam.binary import decode_depth, decode_grid
+
+    hub = web.tofcam_viewer.hub
+    frame_id, arrays = hub.latest_arrays()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+    connection.request('GET', '/grid/strategic')
+    response = connection.getresponse()
+    payload = response.read()
+    assert response.status == 200 and response.getheader('Content-Type') == 'application/octet-stream'
+    grid_frame_id, grid = decode_grid(payload)
+    assert grid_frame_id == frame_id
+    assert np.array_equal(grid.state, arrays.grids['strategic'].state)
+    assert np.array_equal(grid.min_depth, arrays.grids['strategic'].min_depth)
+
+    connection.request('GET', '/grid/strategic', headers={'If-None-Match': response.getheader('ETag')})
+    response = connection.getresponse()
+    assert response.status == 304 and response.read() == b''
+
+    connection.request('GET', '/grid/reactive')
+    response = connection.getresponse()
+    response.read()
+    assert response.status == 503
+
+    for query, atol in (('', 1e-3), ('?dtype=uint16', 1e-4)):
+        connection.request('GET', '/depth.bin' + query)
+        response = connection.getresponse()
+        depth_frame_id, depth = decode_depth(response.read())
+        assert response.status == 200 and depth_frame_id == frame_id
+        assert np.allclose(depth, arrays.depth_map, atol=atol)
+    connection.close()
+
+
+def test_binary_endpoints():
+    """/grid/<nome> e /depth.bin servem o FrameArrays publicado, serializado uma vez por frame."""
+    from tofcam.tof_types import ZoneGrid
+
+    rng = np.random.default_rng(1)
+    state = rng.integers(0, 3, (24, 32)).astype(np.uint8)
+    grid = ZoneGrid(grid_h=24, grid_w=32, min_depth=rng.uniform(0, 1, (24, 32)),
+                    mean_depth=rng.uniform(0, 1, (24, 32)), state=state, depth_min=0.0, depth_max=1.0)
+    arrays = web.FrameArrays(rng.uniform(0, 1, (48, 64)).astype(np.float32), {'strategic': grid})
+
+    hub = web.tofcam_viewer.hub
+    hub.open()
+    hub.publish(EncodedFrame(b'jpeg'), {}, arrays)
+    assert arrays.frame_id == hub.frame_id
+    assert arrays.grid('strategic') is arrays.grid('strategic')  # cache por frame
+    run_on_both_backends(check_binary_endpoints)
+    print("✅ Endpoints binários: OK")
+
+
+class SyntheticCamera:
+    """Cena sintética do CameraSource com a interface do cv2.VideoCapture (ret, frame)."""
+
+    def __init__(self):
+        from tofcam.camera import CameraSource
+        self.source = CameraSource(use_test_image=True)
+
+    def read(self):
+        return True, self.source.read()
+
+    def release(self):
+        pass
+
+
+def capture_frames(viewer, count=2):
+    """Rodar o capture_loop real (com um viewer conectado) até publicar count frames."""
+    viewer.camera_source = SyntheticCamera()
+    viewer.depth_mode = "gradient"
+    viewer.frame_interval = 0.01
+    viewer._init_zone_mappers()
+    viewer.strategic, viewer.reactive = web.StrategicPlanner(), web.ReactiveAvoider()
+    first_id = viewer.hub.frame_id
+    viewer.start_capture()
+    try:
+        with viewer.hub.client():
+            deadline = time.time() + 5.0
+            while viewer.hub.frame_id < first_id + count and time.time() < deadline:
+                time.sleep(0.01)
+    finally:
+        viewer.stop_capture()
+    assert viewer.hub.frame_id >= first_id + count
+
+
+def check_grid_endpoints(port):
+    """As duas grades do frame capturado: 200, com as dimensões dos ZoneMappers."""
+    import http.client
+    from tofcam.binary import decode_grid
+
+    frame_id, arrays = web.tofcam_viewer.hub.latest_arrays()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    for name, shape in (('strategic', (24, 32)), ('reactive', (12, 16))):
+        connection.request('GET', f'/grid/{name}')
+        response = connection.getresponse()
+        payload = response.read()
+        assert response.status == 200, (name, response.status)
+        grid_frame_id, grid = decode_grid(payload)
+        assert grid_frame_id == frame_id and grid.state.shape == shape
+        assert np.array_equal(grid.state, arrays.grids[name].state)
+    connection.close()
+
+
+def test_grid_endpoints_from_capture():
+    """Grades produzidas pelo pipeline real (ZoneMappers de tofcam.nav), não injetadas no hub."""
+    viewer = web.tofcam_viewer
+    capture_frames(viewer)
+    viewer.hub.open()
+    run_on_both_backends(check_grid_endpoints)
+    print("✅ Grades do pipeline nos endpoints binários: OK")
+
+
+def check_client_overlay_grids(port):
+    """/data no modo client traz as duas grades compactas do frame."""
+    import http.client
+
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    connection.request('GET', '/data')
+    response = connection.getresponse()
+    data = json.loads(response.read())
+    connection.close()
+    assert response.status == 200 and data['overlay'] == 'client'
+    for name, (rows, cols) in (('strategic', (24, 32)), ('reactive', (12, 16))):
+        grid = data['grids'][name]
+        assert (grid['rows'], grid['cols']) == (rows, cols)
+        assert len(grid['states']) == rows * cols and set(grid['states']) <= set('012')
+
+
+def test_client_overlay_grids_from_capture():
+    """Modo client com o pipeline real: o navegador recebe grades para desenhar."""
+    viewer = web.tofcam_viewer
+    web.overlay_mode_action(viewer, {'mode': 'client'})
+    try:
+        capture_frames(viewer)
+    finally:
+        web.overlay_mode_action(viewer, {'mode': 'server'})
+    viewer.hub.open()
+    run_on_both_backends(check_client_overlay_grids)
+    print("✅ Grades no /data do modo client: OK")
+
+
+if __name__ == "__main__":
+    test_encoded_frame()
+    test_lazy_depth_sources()
+    test_client_overlay_mode()
+    test_pooled_frame_buffers()
+    test_demand_driven_pipeline()
+    test_async_camera_switch()
+    test_camera_switch_during_stuck_read()
+    test_frame_hub_drop_to_latest()
+    test_published_frame_uses_hub_id()
+    test_mjpeg_many_viewers()
+    test_events_stream()
+    test_async_backend()
+    test_keep_alive_and_etag()
+    test_binary_endpoints()
+    test_grid_endpoints_from_capture()
+    test_client_overlay_grids_from_capture()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Teste do ZoneMapper vetorizado.
+Compara o resultado com o cálculo célula a célula (np.percentile por célula).
+"""
+
+import numpy as np
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tofcam.nav import ZoneMapper
+from tofcam.tof_types import CellState
+
+
+def cell_region(mapper, depth_map, i, j):
+    """Pixels da célula (i, j) como no laço original (última linha/coluna absorvem o resto)."""
+    h, w = depth_map.shape
+    y0, y1 = int(mapper.roi[0] * h), int(mapper.roi[1] * h)
+    x0, x1 = int(mapper.roi[2] * w), int(mapper.roi[3] * w)
+    roi_h, roi_w = y1 - y0, x1 - x0
+    cell_h, cell_w = roi_h // mapper.grid_h, roi_w // mapper.grid_w
+
+    yy0 = y0 + i * cell_h
+    yy1 = y0 + ((i + 1) * cell_h if i < mapper.grid_h - 1 else roi_h)
+    xx0 = x0 + j * cell_w
+    xx1 = x0 + ((j + 1) * cell_w if j < mapper.grid_w - 1 else roi_w)
+
+    return depth_map[yy0:yy1, xx0:xx1]
+
+
+def reference_cell(mapper, depth_map, i, j):
+    """Estatísticas de uma célula calculadas como no laço original."""
+    region = cell_region(mapper, depth_map, i, j)
+    if region.size == 0:
+        return np.inf, np.inf, CellState.FREE
+
+    min_depth = float(np.percentile(region, 10))
+    mean_depth = float(region.mean())
+    if min_depth < mapper.emergency_threshold:
+        state = CellState.EMERGENCY
+    elif min_depth < mapper.warn_threshold:
+        state = CellState.WARNING
+    else:
+        state = CellState.FREE
+    return min_depth, mean_depth, state
+
+
+def test_matches_reference():
+    """Grid vetorizado deve reproduzir o cálculo por célula, inclusive bordas irregulares."""
+    rng = np.random.default_rng(42)
+
+    configs = [
+        ((480, 640), 24, 32, (0.1, 1.0, 0.1, 0.9)),
+        ((480, 640), 12, 16, (0.5, 1.0, 0.25, 0.75)),
+        ((481, 643), 7, 9, (0.0, 1.0, 0.0, 1.0)),   # última linha/coluna maiores
+        ((5, 7), 6, 8, (0.0, 1.0, 0.0, 1.0)),        # células vazias
+    ]
+
+    for shape, gh, gw, roi in configs:
+        depth_map = rng.uniform(0.05, 1.0, shape).astype(np.float32)
+        mapper = ZoneMapper(grid_h=gh, grid_w=gw, roi=roi)
+        grid = mapper.map_depth_to_zones(depth_map)
+
+        assert (grid.grid_h, grid.grid_w) == (gh, gw)
+        for i in range(gh):
+            for j in range(gw):
+                min_depth, mean_depth, state = reference_cell(mapper, depth_map, i, j)
+                cell = grid.cells[i, j]
+                assert cell.min_depth == min_depth
+                assert np.isclose(cell.mean_depth, mean_depth, rtol=1e-5) or cell.mean_depth == mean_depth
+                assert cell.state == state
+
+        print(f"✅ {shape} grid {gh}x{gw}: OK")
+
+
+def test_struct_of_arrays_grid():
+    """ZoneGrid guarda arrays contíguos e monta ZoneCell apenas sob demanda."""
+    depth_map = np.full((120, 160), 2.0, dtype=np.float32)
+    depth_map[:, :40] = 0.1
+
+    grid = ZoneMapper(grid_h=6, grid_w=8).map_depth_to_zones(depth_map)
+
+    assert grid.min_depth.dtype == np.float32 and grid.min_depth.flags['C_CONTIGUOUS']
+    assert grid.mean_depth.dtype == np.float32
+    assert grid.state.dtype == np.uint8
+    assert grid.cells.shape == (6, 8)
+
+    cell = grid.cells[-1, 0]
+    assert (cell.row, cell.col) == (5, 0)
+    assert cell.state == CellState.EMERGENCY
+    assert grid.cells[0, 7].state == CellState.FREE
+
+    # Acesso da antiga matriz de ZoneCell: cells[i][j], len e iteração por linhas
+    assert grid.cells[5][0] == grid.cells[5, 0] and grid.cells[-1][-1] == grid.cells[5, 7]
+    assert len(grid.cells) == 6 and len(grid.cells[0]) == 8
+    rows = [[cell.state for cell in row] for row in grid.cells]
+    assert np.array_equal(np.array(rows, dtype=np.uint8), grid.state)
+    assert [cell.col for cell in grid.cells[2]] == list(range(8))
+
+    clone = grid.copy()
+    clone.state[:] = CellState.FREE
+    assert grid.cells[0, 0].state == CellState.EMERGENCY
+    print("✅ ZoneGrid struct-of-arrays: OK")
+
+
+def test_partition_keeps_input():
+    """stat_mode="partition" não pode reordenar o depth_map do chamador (reshape que vira view)."""
+    rng = np.random.default_rng(5)
+    cases = [
+        ((24, 64), ZoneMapper(grid_h=24, grid_w=32, stat_mode="partition")),  # ch == 1
+        ((48, 32), ZoneMapper(grid_h=4, grid_w=32, stat_mode="partition")),   # cw == 1
+        ((48, 10), ZoneMapper(grid_h=4, grid_w=1, stat_mode="partition")),    # largura toda
+    ]
+    for shape, mapper in cases:
+        depth_map = rng.uniform(0.05, 1.0, shape).astype(np.float32)
+        original = depth_map.copy()
+        grid = mapper.map_depth_to_zones(depth_map)
+        assert np.array_equal(depth_map, original), shape
+        assert np.isfinite(grid.min_depth).all()
+    print("✅ Partition sem alterar o depth map: OK")
+
+
+def test_stat_modes():
+    """partition = k-ésimo valor exato de cada célula, médias iguais ao modo exact."""
+    rng = np.random.default_rng(3)
+    depth_map = rng.uniform(0.05, 1.0, (481, 643)).astype(np.float32)
+    kwargs = dict(grid_h=7, grid_w=9, warn_threshold=0.35, emergency_threshold=0.2)
+
+    exact = ZoneMapper(**kwargs).map_depth_to_zones(depth_map)
+    partition = ZoneMapper(stat_mode="partition", **kwargs).map_depth_to_zones(depth_map)
+
+    assert exact.metadata == {'stat_mode': 'exact'}
+    assert partition.metadata == {'stat_mode': 'partition'}
+
+    mapper = ZoneMapper(**kwargs)
+    for i in range(7):
+        for j in range(9):
+            region = np.sort(cell_region(mapper, depth_map, i, j), axis=None)
+            assert partition.min_depth[i, j] == region[(region.size - 1) // 10]
+    assert np.array_equal(partition.mean_depth, exact.mean_depth)
+
+    try:
+        ZoneMapper(grid_h=2, grid_w=2, stat_mode="histogram")
+        assert False, "stat_mode inválido deveria falhar"
+    except ValueError:
+        pass
+    print("✅ Modos de estatística: OK")
+
+
+if __name__ == "__main__":
+    test_matches_reference()
+    test_struct_of_arrays_grid()
+    test_stat_modes()
+    test_partition_keeps_input()
@@ -10,6 +10,13 @@ Modules:
     web: Web interface and API server
     depth: Depth estimation using MiDaS and custom algorithms
     nav: Navigation algorithms (strategic and reactive)
+    colormap: Depth colormap lookup tables
+    overlay: Cached label sprites for visualizations
+    binary: Binary zone-grid and depth payloads
+    assets: Cached static files for the web UI
+    discovery: Parallel, cached camera discovery
+    pool: Reusable frame buffers with leak accounting
+    multicam: Synchronized multi-camera capture and shared inference
     types: Data structures and type definitions
     
 Author: Marcelo Lavor
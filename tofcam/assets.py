@@ -0,0 +1,152 @@
+"""
+TOFcam Static Assets
+====================
+
+Arquivos da interface web (tofcam/static) carregados uma vez na
+inicialização e mantidos em memória como bytes crus e gzip, com ETag forte
+por representação. As páginas referenciam os outros arquivos com
+{{asset:<nome>}}, trocado por /static/<nome>?v=<hash>: URLs versionadas são
+servidas com cache imutável e a página só revalida (304) nas visitas seguintes.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Cache-Control de URLs versionadas (?v=hash) e das demais (sempre revalidar)
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# Abaixo disso o gzip não compensa o cabeçalho extra
+MIN_GZIP_SIZE = 256
+
+_ASSET_REF = re.compile(r'\{\{asset:([\w.\-]+)\}\}')
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.svg': 'image/svg+xml',
+}
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match (lista, '*' ou ETags fracos) corresponde ao ETag atual?"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in candidates)
+
+
+def accepts_gzip(accept_encoding):
+    """Accept-Encoding inclui gzip (ou *) com q > 0?"""
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """Um arquivo servido: bytes crus, gzip (ou None) e o hash do conteúdo."""
+    name: str
+    content_type: str
+    raw: bytes
+    gzip: Optional[bytes]
+    digest: str
+
+    @classmethod
+    def from_bytes(cls, name: str, raw: bytes) -> "StaticAsset":
+        content_type = CONTENT_TYPES.get(os.path.splitext(name)[1]) \
+            or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        compressed = gzip.compress(raw, compresslevel=9, mtime=0) if len(raw) >= MIN_GZIP_SIZE else None
+        if compressed is not None and len(compressed) >= len(raw):
+            compressed = None
+        return cls(name, content_type, raw, compressed, hashlib.sha256(raw).hexdigest()[:16])
+
+    @property
+    def url(self) -> str:
+        """URL versionada pelo conteúdo."""
+        return f'/static/{self.name}?v={self.digest}'
+
+    def representation(self, accept_encoding) -> Tuple[bytes, str, Optional[str]]:
+        """(corpo, ETag, Content-Encoding) conforme o Accept-Encoding do cliente."""
+        if self.gzip is not None and accepts_gzip(accept_encoding):
+            return self.gzip, f'"{self.digest}-gzip"', 'gzip'
+        return self.raw, f'"{self.digest}"', None
+
+
+class StaticAssets:
+    """Registro dos assets de um diretório; '/' serve o index."""
+
+    def __init__(self, directory: str = STATIC_DIR, index: str = 'index.html'):
+        self.directory = directory
+        self.index = index
+        self.assets: Dict[str, StaticAsset] = {}
+        self.load()
+
+    def load(self):
+        """(Re)carregar o diretório: primeiro os arquivos referenciados, depois as páginas."""
+        sources = {}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    sources[name] = f.read()
+
+        assets = {}
+        pages = {}
+        for name, raw in sources.items():
+            if name.endswith('.html'):
+                pages[name] = raw
+            else:
+                assets[name] = StaticAsset.from_bytes(name, raw)
+        for name, raw in pages.items():
+            text = _ASSET_REF.sub(lambda match: assets[match.group(1)].url, raw.decode('utf-8'))
+            assets[name] = StaticAsset.from_bytes(name, text.encode('utf-8'))
+        self.assets = assets
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        """Asset de uma rota ('/' ou '/static/<nome>'), ou None."""
+        route = urlparse(path).path
+        if route == '/':
+            return self.assets.get(self.index)
+        if route.startswith('/static/'):
+            return self.assets.get(route[len('/static/'):])
+        return None
+
+    def response(self, asset: StaticAsset, path: str, accept_encoding=None,
+                 if_none_match=None) -> Tuple[int, bytes, List[Tuple[str, str]]]:
+        """
+        (status, corpo, cabeçalhos) para servir o asset: 304 sem corpo se o
+        cliente já tem essa representação, senão 200 com os bytes em cache.
+        """
+        body, etag, encoding = asset.representation(accept_encoding)
+        versioned = 'v' in parse_qs(urlparse(path).query)
+        headers = [
+            ('ETag', etag),
+            ('Cache-Control', IMMUTABLE_CACHE if versioned else REVALIDATE_CACHE),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if etag_matches(if_none_match, etag):
+            return 304, b'', headers
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        return 200, body, headers
@@ -0,0 +1,118 @@
+"""
+TOFcam Binary Payloads
+======================
+
+Formato binário das grades de zonas e do depth map para ferramentas que só
+querem números: cabeçalho fixo little-endian seguido dos buffers crus, com
+offsets alinhados para mapear direto em np.frombuffer ou typed arrays
+(Uint8Array/Float32Array/Uint16Array) sem cópia.
+
+Grade (/grid/<nome>), cabeçalho GRID_HEADER (24 bytes):
+    magic b'TOFZ', versão, tamanho do cabeçalho, linhas, colunas,
+    frame_id, depth_min (f32), depth_max (f32)
+    + state   uint8[linhas*colunas] (CellState), preenchido até múltiplo de 4
+    + min     float32[linhas*colunas]
+    + mean    float32[linhas*colunas]
+
+Depth (/depth.bin), cabeçalho DEPTH_HEADER (28 bytes):
+    magic b'TOFD', versão, tamanho do cabeçalho, altura, largura,
+    frame_id, dtype (1=float16, 2=uint16), reservado, scale (f32), offset (f32)
+    + depth   float16 ou uint16 [altura*largura]; uint16: valor*scale + offset
+"""
+
+import struct
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from tofcam.tof_types import ZoneGrid
+except ImportError:
+    from tof_types import ZoneGrid
+
+FORMAT_VERSION = 1
+
+GRID_MAGIC = b'TOFZ'
+GRID_HEADER = struct.Struct('<4sHHHHIff')
+
+DEPTH_MAGIC = b'TOFD'
+DEPTH_HEADER = struct.Struct('<4sHHHHIHHff')
+
+DEPTH_FLOAT16 = 1
+DEPTH_UINT16 = 2
+DEPTH_DTYPES = {DEPTH_FLOAT16: np.dtype('<f2'), DEPTH_UINT16: np.dtype('<u2')}
+
+
+def _pad4(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def encode_grid(grid: ZoneGrid, frame_id: int = 0) -> bytes:
+    """ZoneGrid -> cabeçalho + state/min/mean crus."""
+    cells = grid.grid_h * grid.grid_w
+    state = grid.state.tobytes()
+    header = GRID_HEADER.pack(GRID_MAGIC, FORMAT_VERSION, GRID_HEADER.size,
+                              grid.grid_h, grid.grid_w, frame_id,
+                              grid.depth_min, grid.depth_max)
+    return b''.join((
+        header,
+        state, bytes(_pad4(cells) - cells),
+        grid.min_depth.astype('<f4', copy=False).tobytes(),
+        grid.mean_depth.astype('<f4', copy=False).tobytes(),
+    ))
+
+
+def decode_grid(payload: bytes) -> Tuple[int, ZoneGrid]:
+    """Inverso de encode_grid: (frame_id, ZoneGrid) com arrays sobre o próprio buffer."""
+    magic, version, header_size, rows, cols, frame_id, depth_min, depth_max = \
+        GRID_HEADER.unpack_from(payload)
+    if magic != GRID_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("payload de grade inválido")
+    cells = rows * cols
+    min_offset = header_size + _pad4(cells)
+    mean_offset = min_offset + 4 * cells
+    grid = ZoneGrid(
+        grid_h=rows,
+        grid_w=cols,
+        min_depth=np.frombuffer(payload, '<f4', cells, min_offset).reshape(rows, cols),
+        mean_depth=np.frombuffer(payload, '<f4', cells, mean_offset).reshape(rows, cols),
+        state=np.frombuffer(payload, np.uint8, cells, header_size).reshape(rows, cols),
+        depth_min=depth_min,
+        depth_max=depth_max,
+    )
+    return frame_id, grid
+
+
+def encode_depth(depth_map: np.ndarray, frame_id: int = 0, dtype: int = DEPTH_FLOAT16) -> bytes:
+    """
+    Depth map -> cabeçalho + buffer float16 ou uint16 quantizado.
+    uint16 cobre [min, max] do frame com 65536 níveis (erro <= (max-min)/131070).
+    """
+    height, width = depth_map.shape
+    if dtype == DEPTH_FLOAT16:
+        scale, offset = 1.0, 0.0
+        data = depth_map.astype('<f2')
+    elif dtype == DEPTH_UINT16:
+        depth_min, depth_max = float(depth_map.min()), float(depth_map.max())
+        scale = (depth_max - depth_min) / 65535.0 if depth_max > depth_min else 1.0
+        offset = depth_min
+        quantized = (depth_map.astype(np.float32) - np.float32(offset)) * np.float32(1.0 / scale) + np.float32(0.5)
+        data = np.clip(quantized, 0, 65535).astype('<u2')
+    else:
+        raise ValueError(f"dtype de depth desconhecido: {dtype}")
+    header = DEPTH_HEADER.pack(DEPTH_MAGIC, FORMAT_VERSION, DEPTH_HEADER.size,
+                               height, width, frame_id, dtype, 0, scale, offset)
+    return header + data.tobytes()
+
+
+def decode_depth(payload: bytes) -> Tuple[int, np.ndarray]:
+    """Inverso de encode_depth: (frame_id, depth float32 H x W)."""
+    magic, version, header_size, height, width, frame_id, dtype, _, scale, offset = \
+        DEPTH_HEADER.unpack_from(payload)
+    if magic != DEPTH_MAGIC or version != FORMAT_VERSION or dtype not in DEPTH_DTYPES:
+        raise ValueError("payload de depth inválido")
+    data = np.frombuffer(payload, DEPTH_DTYPES[dtype], height * width, header_size)
+    depth = data.reshape(height, width).astype(np.float32)
+    if dtype == DEPTH_UINT16:
+        depth = depth * np.float32(scale) + np.float32(offset)
+    return frame_id, depth
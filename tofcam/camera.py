@@ -1,6 +1,8 @@
+import threading
+import time
 import cv2
 import numpy as np
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, Sequence, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 try:
     from tofcam.tof_types import DepthEstimator, ZoneGrid, StrategicPlan, ReactiveCommand
@@ -10,16 +12,116 @@ except ImportError:
 if TYPE_CHECKING:
     from mapping import ZoneMapper, StrategicPlanner, ReactiveAvoider
 
+@dataclass
+class SyntheticObstacle:
+    """
+    Obstáculo desenhado pela câmera sintética. Coordenadas relativas ao frame
+    (centro em [0,1], size = meia largura/altura ou raio em fração da altura);
+    velocity em fração do frame por quadro, com rebote nas bordas.
+    """
+    shape: str  # "rect" ou "circle"
+    center: Tuple[float, float]
+    size: Tuple[float, float]
+    color: Tuple[int, int, int]
+    velocity: Tuple[float, float] = (0.0, 0.0)
+
+    def position(self, frame_index: int) -> Tuple[float, float]:
+        """Centro relativo no quadro frame_index (onda triangular em [0,1])."""
+        coords = []
+        for start, speed in zip(self.center, self.velocity):
+            t = (start + speed * frame_index) % 2.0
+            coords.append(2.0 - t if t > 1.0 else t)
+        return coords[0], coords[1]
+
+    def draw(self, frame: np.ndarray, frame_index: int):
+        height, width = frame.shape[:2]
+        cx, cy = self.position(frame_index)
+        cx, cy = int(round(cx * width)), int(round(cy * height))
+        if self.shape == "circle":
+            cv2.circle(frame, (cx, cy), int(round(self.size[0] * height)), self.color, -1)
+        else:
+            hw, hh = int(round(self.size[0] * width)), int(round(self.size[1] * height))
+            cv2.rectangle(frame, (cx - hw, cy - hh), (cx + hw, cy + hh), self.color, -1)
+
+
+# Cena padrão (em 640x480: retângulo (200,150)-(300,250) e círculo em (450,350) r=50)
+DEFAULT_TEST_OBSTACLES = (
+    SyntheticObstacle("rect", (250 / 640, 200 / 480), (50 / 640, 50 / 480), (255, 255, 255)),
+    SyntheticObstacle("circle", (450 / 640, 350 / 480), (50 / 480, 50 / 480), (0, 255, 255)),
+)
+
+
+# Ritmo da imagem sintética no grabber em segundo plano quando test_fps = 0
+# (sem ritmo, a thread geraria frames em loop e ocuparia um núcleo inteiro)
+THREADED_TEST_FPS = 30.0
+
+
+@dataclass
+class CapturedFrame:
+    """Frame do grabber em segundo plano, com instante de captura (time.monotonic) e sequência."""
+    frame: np.ndarray
+    timestamp: float
+    sequence: int
+
+    @property
+    def age(self) -> float:
+        """Segundos desde a captura."""
+        return time.monotonic() - self.timestamp
+
+
 class CameraSource:
-    def __init__(self, index: int = 0, use_test_image: bool = False):
+    def __init__(
+        self,
+        index: int = 0,
+        use_test_image: bool = False,
+        test_size: Tuple[int, int] = (640, 480),
+        test_fps: float = 0.0,
+        test_obstacles: Optional[Sequence[SyntheticObstacle]] = None,
+        threaded: bool = False,
+        ring_size: int = 3,
+    ):
+        """
+        test_size: (largura, altura) da imagem sintética.
+        test_fps: ritmo da imagem sintética (0 = sem espera, o mais rápido possível;
+            com threaded, 0 usa THREADED_TEST_FPS).
+        test_obstacles: obstáculos da cena sintética (padrão: DEFAULT_TEST_OBSTACLES).
+        threaded: capturar continuamente em uma thread (anel de ring_size buffers
+            preallocados); read()/read_latest() entregam sempre o frame mais novo,
+            sem frames velhos acumulados no buffer do driver.
+        """
+        if threaded and ring_size < 3:
+            raise ValueError("ring_size deve ser >= 3 (escrita, mais recente, em leitura)")
         self.index = index
         self.cap = None
         self.use_test_image = use_test_image
         self.test_frame_count = 0
+        self.test_size = test_size
+        self.test_fps = test_fps
+        self.test_obstacles = list(DEFAULT_TEST_OBSTACLES if test_obstacles is None else test_obstacles)
+        self._test_base = None
+        self._test_phase = None
+        self._next_test_time = 0.0
+
+        # Grabber em segundo plano
+        self.threaded = threaded
+        self.ring_size = ring_size
+        self.frames_captured = 0
+        self.frames_dropped = 0   # Capturados e substituídos sem nunca serem lidos
+        self.read_failures = 0
+        self._ring = None
+        self._slot_info = []      # (timestamp, sequence) de cada buffer
+        self._latest_slot = None
+        self._latest_consumed = True
+        self._held_slot = None    # Buffer entregue pelo último read_latest()
+        self._last_sequence = 0
+        self._grab_condition = threading.Condition()
+        self._grab_stop = threading.Event()
+        self._grab_thread = None
 
     def open(self):
         if self.use_test_image:
             print("📸 Usando imagem de teste sintética")
+            self._start_grabber()
             return True
         
         self.cap = cv2.VideoCapture(self.index)
@@ -27,40 +129,211 @@ class CameraSource:
             print(f"❌ Não foi possível abrir a câmera {self.index}")
             print("💡 Ativando modo de teste com imagem sintética")
             self.use_test_image = True
+            self._start_grabber()
             return True
+        if self.threaded:
+            # Com o grabber drenando o driver, um buffer basta
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         print(f"✅ Câmera {self.index} aberta com sucesso")
+        self._start_grabber()
         return True
 
-    def read(self) -> Optional[np.ndarray]:
-        if self.use_test_image:
-            # Gera uma imagem de teste colorida com gradiente
-            height, width = 480, 640
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Gradiente colorido + ruído para simular uma cena
-            for y in range(height):
-                for x in range(width):
-                    frame[y, x] = [
-                        int(255 * x / width),  # Componente R
-                        int(255 * y / height), # Componente G
-                        int(127 + 127 * np.sin(self.test_frame_count * 0.1 + x * 0.01)) # Componente B animado
-                    ]
-            
-            # Adiciona alguns objetos simulados
-            cv2.rectangle(frame, (200, 150), (300, 250), (255, 255, 255), -1)
-            cv2.circle(frame, (450, 350), 50, (0, 255, 255), -1)
-            
-            self.test_frame_count += 1
+    # ---- Grabber em segundo plano ----
+
+    def _start_grabber(self):
+        if not self.threaded or self._grab_thread is not None:
+            return
+        self._grab_stop.clear()
+        self._grab_thread = threading.Thread(
+            target=self._grab_loop, name=f"camera-grabber-{self.index}", daemon=True
+        )
+        self._grab_thread.start()
+
+    def _stop_grabber(self):
+        if self._grab_thread is None:
+            return
+        self._grab_stop.set()
+        with self._grab_condition:
+            self._grab_condition.notify_all()
+        self._grab_thread.join(timeout=2.0)
+        self._grab_thread = None
+
+    def _grab_into(self, buffer: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Capturar um frame, escrevendo em buffer quando possível (sem alocar)."""
+        frame = self._read_direct(buffer)
+        if frame is None or buffer is None or frame is buffer:
             return frame
+        if frame.shape != buffer.shape or frame.dtype != buffer.dtype:
+            return frame  # Resolução mudou: o anel é refeito
+        np.copyto(buffer, frame)
+        return buffer
+
+    def _grab_loop(self):
+        while not self._grab_stop.is_set():
+            with self._grab_condition:
+                # Buffer livre: nem o mais recente nem o que está com o leitor
+                slot = 0
+                if self._ring is not None:
+                    busy = (self._latest_slot, self._held_slot)
+                    slot = next(i for i in range(self.ring_size) if i not in busy)
+            buffer = self._ring[slot] if self._ring is not None else None
+
+            try:
+                frame = self._grab_into(buffer)
+            except Exception as e:
+                print(f"⚠️ Erro no grabber da câmera {self.index}: {e}")
+                frame = None
+            timestamp = time.monotonic()
+            if frame is None:
+                self.read_failures += 1
+                self._grab_stop.wait(0.01)
+                continue
+
+            with self._grab_condition:
+                if frame is not buffer:
+                    # Primeiro frame (ou nova resolução): alocar o anel no formato da câmera
+                    self._ring = [np.empty_like(frame) for _ in range(self.ring_size)]
+                    self._slot_info = [(0.0, 0)] * self.ring_size
+                    self._held_slot = None
+                    slot = 0
+                    np.copyto(self._ring[slot], frame)
+                self._last_sequence += 1
+                self.frames_captured += 1
+                if not self._latest_consumed:
+                    self.frames_dropped += 1
+                self._slot_info[slot] = (timestamp, self._last_sequence)
+                self._latest_slot = slot
+                self._latest_consumed = False
+                self._grab_condition.notify_all()
+
+    def read_latest(self, timeout: float = 1.0) -> Optional[CapturedFrame]:
+        """
+        Frame mais recente ainda não lido (espera até timeout por um novo).
+        Sem cópia: o array vale até a próxima chamada de read_latest()/read().
+        """
+        if not self.threaded:
+            frame = self.read()
+            if frame is None:
+                return None
+            self._last_sequence += 1
+            return CapturedFrame(frame, time.monotonic(), self._last_sequence)
+
+        with self._grab_condition:
+            # Buffer anterior volta para o grabber
+            self._held_slot = None
+            if not self._grab_condition.wait_for(
+                lambda: not self._latest_consumed or self._grab_stop.is_set(), timeout=timeout
+            ) or self._latest_consumed:
+                return None
+            slot = self._latest_slot
+            self._latest_consumed = True
+            self._held_slot = slot
+            timestamp, sequence = self._slot_info[slot]
+            return CapturedFrame(self._ring[slot], timestamp, sequence)
+
+    def _prepare_test_image(self):
+        """Gradientes estáticos (canais 0 e 1) e fase do canal animado, calculados uma vez."""
+        width, height = self.test_size
+        base = np.zeros((height, width, 3), dtype=np.uint8)
+        base[:, :, 0] = (255 * np.arange(width) // width).astype(np.uint8)[None, :]
+        base[:, :, 1] = (255 * np.arange(height) // height).astype(np.uint8)[:, None]
+        self._test_base = base
+        self._test_phase = np.arange(width) * 0.01
+        self._next_test_time = time.perf_counter()
+
+    def _read_test_image(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        self._wait_test_frame()
+        return self._render_test_image(out)
+
+    def _wait_test_frame(self):
+        """Esperar o instante do próximo frame sintético (ritmo test_fps)."""
+        if self._test_base is None or self._test_base.shape[1::-1] != tuple(self.test_size):
+            self._prepare_test_image()
+
+        fps = self.test_fps
+        if fps <= 0 and self.threaded:
+            fps = THREADED_TEST_FPS
+        if fps > 0:
+            delay = self._next_test_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Sem acumular atraso se o consumidor ficou para trás
+            self._next_test_time = max(self._next_test_time, time.perf_counter() - 1.0 / fps)
+            self._next_test_time += 1.0 / fps
+
+    def _render_test_image(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if self._test_base is None:
+            self._prepare_test_image()
+        # Gradiente colorido + canal animado (uma linha, replicada em todas as linhas)
+        if out is not None and out.shape == self._test_base.shape and out.dtype == self._test_base.dtype:
+            frame = out
+            np.copyto(frame, self._test_base)
+        else:
+            frame = self._test_base.copy()
+        animated = (127 + 127 * np.sin(self.test_frame_count * 0.1 + self._test_phase)).astype(np.uint8)
+        frame[:, :, 2] = animated[None, :]
+
+        # Obstáculos simulados
+        for obstacle in self.test_obstacles:
+            obstacle.draw(frame, self.test_frame_count)
+
+        self.test_frame_count += 1
+        return frame
+
+    def _read_direct(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Ler da câmera (ou cena sintética) na thread atual, escrevendo em out se o formato conferir."""
+        if self.use_test_image:
+            return self._read_test_image(out)
         
         if self.cap is None:
             return None
-        ret, frame = self.cap.read()
+        ret, frame = self.cap.read(out) if out is not None else self.cap.read()
         if not ret:
             return None
         return frame
 
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Próximo frame. out: buffer do chamador (ex.: de um FramePool) onde o
+        frame é escrito sem alocar; o retorno é out quando formato e dtype
+        conferem, senão um array novo (ex.: a câmera mudou de resolução).
+        """
+        if self.threaded:
+            # Cópia: o chamador pode guardar o frame
+            latest = self.read_latest()
+            if latest is None:
+                return None
+            if out is not None and out.shape == latest.frame.shape and out.dtype == latest.frame.dtype:
+                np.copyto(out, latest.frame)
+                return out
+            return latest.frame.copy()
+
+        return self._read_direct(out)
+
+    def grab(self) -> bool:
+        """
+        Capturar o frame agora, sem decodificar (cv2 grab()). Com várias
+        câmeras, grab() em todas e depois retrieve() deixa as capturas quase
+        simultâneas: a decodificação não atrasa a captura das outras.
+        """
+        if self.use_test_image:
+            self._wait_test_frame()
+            return True
+        if self.cap is None:
+            return False
+        return self.cap.grab()
+
+    def retrieve(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Decodificar o frame do último grab(), escrevendo em out se o formato conferir."""
+        if self.use_test_image:
+            return self._render_test_image(out)
+        if self.cap is None:
+            return None
+        ret, frame = self.cap.retrieve(out) if out is not None else self.cap.retrieve()
+        return frame if ret else None
+
     def release(self):
+        self._stop_grabber()
         if self.cap is not None:
             self.cap.release()
             self.cap = None
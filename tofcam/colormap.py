@@ -0,0 +1,99 @@
+"""
+TOFcam Depth Colormap
+=====================
+
+Colormap intuitivo de profundidade (vermelho=próximo, verde=longe, preto=muito longe)
+como tabela de consulta pré-calculada, compartilhada pelo DepthEstimator e pelos
+visualizadores web.
+"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Pontos de controle do esquema intuitivo (BGR), no valor já com contraste:
+#   0.00 -> Vermelho intenso   - PERIGO/MUITO PRÓXIMO
+#   0.25 -> Vermelho-laranja   - ATENÇÃO/PRÓXIMO
+#   0.50 -> Amarelo            - CUIDADO/MÉDIO
+#   0.75 -> Verde              - SEGURO/LONGE
+#   1.00 -> Preto              - MUITO LONGE/IRRELEVANTE
+INTUITIVE_STOPS = (
+    (0.00, (0, 0, 255)),
+    (0.25, (0, 128, 255)),
+    (0.50, (0, 255, 255)),
+    (0.75, (0, 255, 0)),
+    (1.00, (0, 0, 0)),
+)
+
+# Expansão de contraste: valor ** (1 / CONTRAST_FACTOR)
+CONTRAST_FACTOR = 1.8
+
+
+class DepthColormap:
+    """
+    Colormap de profundidade via lookup table.
+
+    A tabela já inclui a inversão (valor máximo do mapa -> vermelho, mínimo
+    -> preto, como no mapeamento por pixel original do web viewer) e a curva
+    de contraste, então aplicar o colormap é
+    só normalizar para um índice e indexar: cv2.LUT para 256 entradas,
+    np.take para tabelas maiores.
+    """
+
+    def __init__(self, size: int = 256, contrast: float = CONTRAST_FACTOR, stops=INTUITIVE_STOPS):
+        if size < 2:
+            raise ValueError("size deve ser >= 2")
+        self.size = size
+
+        # Índice i <-> valor normalizado i/(size-1), invertido antes do contraste
+        depth_norm = np.linspace(0.0, 1.0, size)
+        enhanced = np.power(1.0 - depth_norm, 1.0 / contrast)
+
+        positions = [position for position, _ in stops]
+        colors = np.array([color for _, color in stops], dtype=np.float64)
+        lut = np.empty((size, 3), dtype=np.uint8)
+        for channel in range(3):
+            lut[:, channel] = np.interp(enhanced, positions, colors[:, channel]).astype(np.uint8)
+        self.lut = lut
+        # Formato aceito por cv2.LUT (256 x 1 x 3)
+        self._cv_lut = lut.reshape(size, 1, 3) if size == 256 else None
+
+    def indices(self, depth: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Normaliza pelo min/max do próprio mapa e quantiza para índices da tabela.
+        out: destino uint8 H x W (só para tabelas de 256 entradas).
+        """
+        depth_min, depth_max = float(np.min(depth)), float(np.max(depth))
+        if depth_max > depth_min:
+            scale = (self.size - 1) / (depth_max - depth_min)
+            offset = -depth_min * scale
+        else:
+            # Mapa constante: usar o valor como já normalizado em [0,1]
+            scale, offset = self.size - 1, 0.0
+
+        if self.size == 256:
+            return cv2.convertScaleAbs(depth, dst=out, alpha=scale, beta=offset)
+        normalized = np.clip(depth.astype(np.float32) * np.float32(scale) + np.float32(offset), 0, self.size - 1)
+        return (normalized + 0.5).astype(np.uint16)
+
+    def apply(self, depth: np.ndarray, out: Optional[np.ndarray] = None, pool=None) -> np.ndarray:
+        """
+        Depth map (H x W, qualquer escala) -> imagem BGR uint8.
+        out: destino H x W x 3 (ex.: região de um canvas) escrito in-place.
+        pool: FramePool para os índices intermediários (sem alocar por frame).
+        """
+        if self._cv_lut is None:
+            return np.take(self.lut, self.indices(depth), axis=0, out=out)
+        if pool is None:
+            return cv2.LUT(cv2.cvtColor(self.indices(depth), cv2.COLOR_GRAY2BGR), self._cv_lut, dst=out)
+        with pool.lease("colormap") as scratch:
+            index = self.indices(depth, out=scratch.acquire(depth.shape))
+            index_bgr = cv2.cvtColor(index, cv2.COLOR_GRAY2BGR, dst=scratch.acquire(depth.shape + (3,)))
+            return cv2.LUT(index_bgr, self._cv_lut, dst=out)
+
+    __call__ = apply
+
+
+# Instância compartilhada
+DEPTH_COLORMAP = DepthColormap()
@@ -8,7 +8,6 @@ import numpy as np
 import torch
 import time
 from typing import Optional, Dict, Any, Tuple, NamedTuple
-import base64
 from io import BytesIO
 from PIL import Image
 
@@ -17,11 +16,13 @@ try:
     from tofcam.tof_types import *
     from tofcam.nav import ZoneMapper, StrategicPlanner, ReactiveAvoider
     from tofcam.depth import DepthEstimator
+    from tofcam.pool import FramePool
 except ImportError:
     # Fallback para imports locais
     from tof_types import *
     from nav import ZoneMapper, StrategicPlanner, ReactiveAvoider
     from depth import DepthEstimator
+    from pool import FramePool
 
 class AnalysisConfig:
     """Configuração para análise"""
@@ -32,7 +33,9 @@ class AnalysisConfig:
         use_sophisticated_analysis: bool = True,
         save_frames: bool = False,
         output_dir: str = "output_images",
-        web_format: bool = False
+        web_format: bool = False,
+        zone_stat_mode: str = "exact",
+        threaded_capture: bool = False
     ):
         self.strategic_grid_size = strategic_grid_size
         self.reactive_grid_size = reactive_grid_size
@@ -40,11 +43,16 @@ class AnalysisConfig:
         self.save_frames = save_frames
         self.output_dir = output_dir
         self.web_format = web_format
+        # min_depth dos ZoneMappers: "exact" (np.percentile) ou
+        # "partition" (k-ésimo valor exato, caminho rápido)
+        self.zone_stat_mode = zone_stat_mode
+        # Grabber em segundo plano: a análise sempre recebe o frame mais novo da câmera
+        self.threaded_capture = threaded_capture
 
 class AnalysisResult(NamedTuple):
     """Resultado da análise"""
     rgb_frame: np.ndarray
-    depth_color: np.ndarray
+    depth_color: Optional[np.ndarray]  # Só com web_format ou save_frames
     combined_vis: Optional[np.ndarray]
     strategic_result: Dict[str, Any]
     reactive_result: Dict[str, Any]
@@ -52,6 +60,10 @@ class AnalysisResult(NamedTuple):
     depth_base64: Optional[str] = None
     timestamp: float = 0.0
     frame_id: int = 0
+    # Depth bruto e JPEGs já codificados (bytes imutáveis, sem base64)
+    depth_map: Optional[np.ndarray] = None
+    rgb_jpeg: Optional[EncodedFrame] = None
+    depth_jpeg: Optional[EncodedFrame] = None
 
 class TOFAnalyzer:
     """Analisador centralizado para TOFcam"""
@@ -60,6 +72,10 @@ class TOFAnalyzer:
         self.config = config
         self.frame_counter = 0
         self.camera_id = camera_id
+        # Canvas da visualização combinada (frame | depth), reutilizado a cada frame
+        self._vis_canvas = np.zeros((240, 640, 3), dtype=np.uint8)
+        # Intermediários da visualização (depth reduzido, índices do colormap)
+        self.buffers = FramePool()
         
         # Inicializar camera
         self._init_camera()
@@ -73,7 +89,7 @@ class TOFAnalyzer:
     def _init_camera(self):
         """Inicializar câmera"""
         from .camera import CameraSource
-        self.camera_manager = CameraSource(index=self.camera_id)
+        self.camera_manager = CameraSource(index=self.camera_id, threaded=self.config.threaded_capture)
         self.camera_manager.open()
         
     def _init_algorithms(self):
@@ -84,14 +100,16 @@ class TOFAnalyzer:
                 grid_h=self.config.strategic_grid_size[0],
                 grid_w=self.config.strategic_grid_size[1],
                 warn_threshold=0.3,
-                emergency_threshold=0.15
+                emergency_threshold=0.15,
+                stat_mode=self.config.zone_stat_mode
             )
             
             self.reactive_mapper = ZoneMapper(
                 grid_h=self.config.reactive_grid_size[0],
                 grid_w=self.config.reactive_grid_size[1],
                 warn_threshold=0.2,
-                emergency_threshold=0.1
+                emergency_threshold=0.1,
+                stat_mode=self.config.zone_stat_mode
             )
             
             # Algoritmos
@@ -119,8 +137,11 @@ class TOFAnalyzer:
         # 1. Depth estimation
         depth_map = self.depth_estimator.estimate(frame)
         
-        # 2. Converter depth para visualização colorida
-        depth_color = self._depth_to_color(depth_map)
+        # 2. Depth colorido em resolução completa só se for enviado/salvo;
+        #    sem ele a visualização combinada colore o depth já reduzido
+        depth_color = None
+        if self.config.web_format or self.config.save_frames:
+            depth_color = self._depth_to_color(depth_map)
         
         # 3. Análise sofisticada ou simples
         if self.config.use_sophisticated_analysis and hasattr(self, 'strategic_mapper'):
@@ -130,16 +151,20 @@ class TOFAnalyzer:
         
         # 4. Criar visualização combinada
         combined_vis = self._create_combined_visualization(
-            frame, depth_color, strategic_result, reactive_result, camera_id
+            frame, depth_map, strategic_result, reactive_result, camera_id, depth_color
         )
         
-        # 5. Converter para base64 se necessário (web)
+        # 5. Codificar JPEG se necessário (web); o base64 sai dos mesmos bytes
+        rgb_jpeg = None
+        depth_jpeg = None
         rgb_base64 = None
         depth_base64 = None
         
         if self.config.web_format:
-            rgb_base64 = self._frame_to_base64(combined_vis)
-            depth_base64 = self._frame_to_base64(depth_color)
+            rgb_jpeg = self._encode_frame(combined_vis, timestamp)
+            depth_jpeg = self._encode_frame(depth_color, timestamp)
+            rgb_base64 = rgb_jpeg.data_uri
+            depth_base64 = depth_jpeg.data_uri
         
         # 6. Salvar frames se configurado
         if self.config.save_frames:
@@ -158,12 +183,15 @@ class TOFAnalyzer:
             rgb_base64=rgb_base64,
             depth_base64=depth_base64,
             timestamp=timestamp,
-            frame_id=self.frame_counter
+            frame_id=self.frame_counter,
+            depth_map=depth_map,
+            rgb_jpeg=rgb_jpeg,
+            depth_jpeg=depth_jpeg
         )
     
-    def _depth_to_color(self, depth_map: np.ndarray) -> np.ndarray:
+    def _depth_to_color(self, depth_map: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Converter mapa de profundidade para visualização colorida"""
-        return self.depth_estimator.to_color(depth_map)
+        return self.depth_estimator.to_color(depth_map, out=out, pool=self.buffers)
     
     def _sophisticated_analysis(self, depth_map: np.ndarray) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """Análise sofisticada com ZoneMappers"""
@@ -239,18 +267,29 @@ class TOFAnalyzer:
     def _create_combined_visualization(
         self, 
         frame: np.ndarray, 
-        depth_color: np.ndarray,
+        depth_map: np.ndarray,
         strategic_result: Dict[str, Any],
         reactive_result: Dict[str, Any],
-        camera_id: int
+        camera_id: int,
+        depth_color: Optional[np.ndarray] = None
     ) -> np.ndarray:
-        """Criar visualização combinada"""
-        # Redimensionar para visualização
-        small_frame = cv2.resize(frame, (320, 240))
-        small_depth = cv2.resize(depth_color, (320, 240))
+        """
+        Criar visualização combinada. O desenho usa o canvas 240x640
+        reutilizado a cada frame; o resultado devolvido é uma cópia, para que
+        AnalysisResults anteriores não sejam sobrescritos pelo próximo frame.
+        Com depth_color já calculado o painel é só reduzido dele (um colormap por frame).
+        """
+        combined = self._vis_canvas
         
-        # Combinar lado a lado
-        combined = np.hstack([small_frame, small_depth])
+        # Reduzir para o tamanho do painel antes do colormap, escrevendo direto no canvas
+        cv2.resize(frame, (320, 240), dst=combined[:, :320], interpolation=cv2.INTER_AREA)
+        if depth_color is not None:
+            cv2.resize(depth_color, (320, 240), dst=combined[:, 320:], interpolation=cv2.INTER_AREA)
+        else:
+            with self.buffers.lease("vis") as scratch:
+                small_depth_map = cv2.resize(depth_map, (320, 240), interpolation=cv2.INTER_AREA,
+                                             dst=scratch.acquire((240, 320), depth_map.dtype))
+                self._depth_to_color(small_depth_map, out=combined[:, 320:])
         
         # Adicionar setas de direção
         self._draw_navigation_arrows(combined, strategic_result, reactive_result)
@@ -273,7 +312,7 @@ class TOFAnalyzer:
         cv2.putText(combined, time.strftime("%H:%M:%S"), (10, 310), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
         
-        return combined
+        return combined.copy()
     
     def _draw_navigation_arrows(
         self, 
@@ -302,11 +341,13 @@ class TOFAnalyzer:
         cv2.arrowedLine(combined, (reactive_center_x, center_y), (end_x, end_y), 
                        (255, 0, 255), 3, tipLength=0.3)
     
+    def _encode_frame(self, frame: np.ndarray, timestamp: float = 0.0) -> EncodedFrame:
+        """Codificar frame em JPEG (bytes imutáveis)"""
+        return EncodedFrame.encode(frame, quality=85, frame_id=self.frame_counter, timestamp=timestamp)
+
     def _frame_to_base64(self, frame: np.ndarray) -> str:
         """Converter frame para base64"""
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        encoded_image = base64.b64encode(buffer).decode('utf-8')
-        return f"data:image/jpeg;base64,{encoded_image}"
+        return self._encode_frame(frame).data_uri
     
     def _save_frame_analysis(
         self,
@@ -10,6 +10,11 @@ import cv2
 import numpy as np
 import torch
 
+try:
+    from tofcam.colormap import DEPTH_COLORMAP
+except ImportError:
+    from colormap import DEPTH_COLORMAP
+
 class DepthEstimator:
     """Professional depth estimation using MiDaS"""
     
@@ -51,12 +56,6 @@ class DepthEstimator:
         
         return depth_map
     
-    def to_color(self, depth_map: np.ndarray) -> np.ndarray:
-        """Convert depth map to color visualization"""
-        # Normalize depth map
-        depth_normalized = cv2.normalize(depth_map, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-        
-        # Apply colormap
-        depth_color = cv2.applyColorMap(depth_normalized, cv2.COLORMAP_PLASMA)
-        
-        return depth_color
\ No newline at end of file
+    def to_color(self, depth_map: np.ndarray, out: np.ndarray = None, pool=None) -> np.ndarray:
+        """Convert depth map to color visualization (shared intuitive colormap LUT)"""
+        return DEPTH_COLORMAP.apply(depth_map, out=out, pool=pool)
@@ -0,0 +1,211 @@
+"""
+TOFcam Camera Discovery
+=======================
+
+Detecção de câmeras com sondagem paralela (uma thread por índice, com
+timeout) e cache em arquivo de estado. O cache é indexado pela identidade
+dos dispositivos /dev/video* (inode, device e mtime): enquanto nada for
+conectado ou removido, a inicialização não abre nenhuma câmera. Um rescan em
+segundo plano acompanha hot-plug.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import cv2
+
+# Arquivo de estado padrão ($XDG_CACHE_HOME/tofcam/cameras.json)
+DEFAULT_STATE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'tofcam', 'cameras.json'
+)
+
+STATE_VERSION = 1
+
+
+def probe_camera(index: int) -> Optional[Dict]:
+    """Abrir a câmera index e ler um frame; {'index', 'shape'} se funcional, senão None."""
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        # Configurar propriedades básicas apenas
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # Tentar ler um frame para validar
+        ret, frame = cap.read()
+        if not ret or frame is None or frame.size == 0:
+            print(f"⚠️ Câmera {index} abriu mas sem frame válido")
+            return None
+        return {'index': index, 'shape': list(frame.shape)}
+    finally:
+        cap.release()
+
+
+def device_fingerprint(pattern: str = '/dev/video*') -> Optional[str]:
+    """
+    Identidade dos dispositivos de vídeo (nome, inode, device, mtime).
+    None quando não há nós de dispositivo para comparar (ex.: fora do Linux).
+    """
+    entries = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append(f'{path}:{st.st_ino}:{st.st_rdev}:{st.st_mtime_ns}')
+    if not entries:
+        return None
+    return hashlib.sha256('\n'.join(entries).encode('utf-8')).hexdigest()
+
+
+class CameraDiscovery:
+    """
+    Descoberta de câmeras nos índices 0..max_index-1.
+
+    discover() devolve o cache quando a identidade dos dispositivos não mudou;
+    senão sonda todos os índices ao mesmo tempo e espera no máximo `timeout`
+    (um driver travado não atrasa os demais). start_rescan() repete a checagem
+    em segundo plano e chama on_change(cameras) quando a lista muda.
+    """
+
+    def __init__(
+        self,
+        max_index: int = 5,
+        timeout: float = 3.0,
+        state_file: Optional[str] = DEFAULT_STATE_FILE,
+        prober: Callable[[int], Optional[Dict]] = probe_camera,
+        fingerprint: Callable[[], Optional[str]] = device_fingerprint,
+    ):
+        self.max_index = max_index
+        self.timeout = timeout
+        self.state_file = state_file
+        self.prober = prober
+        self.fingerprint = fingerprint
+        self.cameras: List[int] = []
+        self.details: Dict[int, Dict] = {}
+        self.last_fingerprint = None
+        self.from_cache = False
+        self._lock = threading.Lock()
+        self._rescan_stop = threading.Event()
+        self._rescan_thread = None
+
+    # ---- Estado em arquivo ----
+
+    def _load_state(self) -> Optional[Dict]:
+        if not self.state_file:
+            return None
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') != STATE_VERSION or state.get('max_index') != self.max_index:
+            return None
+        return state
+
+    def _save_state(self, fingerprint, details):
+        if not self.state_file or fingerprint is None:
+            return
+        state = {
+            'version': STATE_VERSION,
+            'max_index': self.max_index,
+            'fingerprint': fingerprint,
+            'timestamp': time.time(),
+            'cameras': [details[index] for index in sorted(details)],
+        }
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            # Escrita atômica: nunca deixar um arquivo pela metade
+            tmp_path = f'{self.state_file}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o cache de câmeras: {e}")
+
+    # ---- Sondagem ----
+
+    def probe_all(self) -> Dict[int, Dict]:
+        """Sondar todos os índices em paralelo; índices que estouram o timeout ficam de fora."""
+        results = {}
+        results_lock = threading.Lock()
+
+        def probe(index):
+            try:
+                info = self.prober(index)
+            except Exception as e:
+                print(f"⚠️ Erro ao testar câmera {index}: {e}")
+                info = None
+            if info is not None:
+                with results_lock:
+                    results[index] = info
+
+        threads = [
+            threading.Thread(target=probe, args=(index,), name=f"camera-probe-{index}", daemon=True)
+            for index in range(self.max_index)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + self.timeout
+        for index, thread in enumerate(threads):
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                print(f"⚠️ Câmera {index} não respondeu em {self.timeout:.1f}s")
+        with results_lock:
+            return dict(results)
+
+    def discover(self, force: bool = False) -> List[int]:
+        """Índices de câmeras funcionais (cache se os dispositivos não mudaram)."""
+        with self._lock:
+            fingerprint = self.fingerprint()
+            state = None if force or fingerprint is None else self._load_state()
+            if state is not None and state.get('fingerprint') == fingerprint:
+                details = {camera['index']: camera for camera in state['cameras']}
+                self.from_cache = True
+            else:
+                details = self.probe_all()
+                self.from_cache = False
+                self._save_state(fingerprint, details)
+            self.details = details
+            self.cameras = sorted(details)
+            self.last_fingerprint = fingerprint
+            return list(self.cameras)
+
+    # ---- Hot-plug ----
+
+    def start_rescan(self, on_change: Callable[[List[int]], None], interval: float = 5.0):
+        """Checar a identidade dos dispositivos a cada interval; re-sondar quando mudar."""
+        if self._rescan_thread is not None:
+            return
+
+        def loop():
+            while not self._rescan_stop.wait(interval):
+                try:
+                    if self.fingerprint() == self.last_fingerprint:
+                        continue
+                    previous = list(self.cameras)
+                    cameras = self.discover(force=True)
+                    if cameras != previous:
+                        print(f"🔌 Câmeras mudaram: {previous} -> {cameras}")
+                        on_change(cameras)
+                except Exception as e:
+                    print(f"⚠️ Erro no rescan de câmeras: {e}")
+
+        self._rescan_stop.clear()
+        self._rescan_thread = threading.Thread(target=loop, name="camera-rescan", daemon=True)
+        self._rescan_thread.start()
+
+    def stop_rescan(self):
+        if self._rescan_thread is None:
+            return
+        self._rescan_stop.set()
+        self._rescan_thread.join(timeout=2.0)
+        self._rescan_thread = None
@@ -0,0 +1,342 @@
+"""
+TOFcam Multi-Camera
+===================
+
+Captura simultânea de várias câmeras (ex.: frontal + lateral) na mesma
+máquina. Cada câmera tem sua thread; um gatilho comum libera todas ao mesmo
+tempo para grab() (captura sem decodificar) e só depois cada uma faz
+retrieve() no próprio anel de buffers. O resultado é um FrameSet com um frame
+por câmera e timestamps alinhados (skew = distância entre o primeiro e o
+último grab()).
+
+O InferenceScheduler consome sempre o FrameSet mais novo (drop-to-latest) e
+roda a inferência de todas as câmeras em um único worker (um modelo, uma GPU).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from tofcam.camera import CameraSource, CapturedFrame
+except ImportError:
+    from camera import CameraSource, CapturedFrame
+
+
+@dataclass
+class FrameSet:
+    """Frames de um disparo do gatilho: câmera -> CapturedFrame (câmeras que falharam ficam de fora)."""
+    sequence: int
+    frames: Dict[int, CapturedFrame]
+
+    @property
+    def timestamp(self) -> float:
+        """Instante do primeiro grab() do conjunto (time.monotonic)."""
+        return min(captured.timestamp for captured in self.frames.values())
+
+    @property
+    def skew(self) -> float:
+        """Segundos entre o primeiro e o último grab() do conjunto."""
+        timestamps = [captured.timestamp for captured in self.frames.values()]
+        return max(timestamps) - min(timestamps)
+
+
+class CameraStats:
+    """Contadores de uma câmera; fps e latência em média móvel exponencial."""
+
+    def __init__(self, smoothing: float = 0.1):
+        self.smoothing = smoothing
+        self.captured = 0
+        self.dropped = 0    # Capturados e nunca processados (ou atrasados para o conjunto)
+        self.failures = 0   # grab()/retrieve() sem frame
+        self.fps = 0.0
+        self.latency = 0.0  # Segundos do grab() ao fim da inferência
+        self._last_timestamp = None
+
+    def record_capture(self, timestamp: float):
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            fps = 1.0 / (timestamp - self._last_timestamp)
+            self.fps = fps if self.fps == 0.0 else self.fps + self.smoothing * (fps - self.fps)
+        self._last_timestamp = timestamp
+        self.captured += 1
+
+    def record_latency(self, seconds: float):
+        self.latency = seconds if self.latency == 0.0 else \
+            self.latency + self.smoothing * (seconds - self.latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'fps': round(self.fps, 1),
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'failures': self.failures,
+            'latency_ms': round(self.latency * 1000.0, 1),
+        }
+
+
+class MultiCameraManager:
+    """
+    N câmeras capturando juntas. max_fps limita o gatilho (0 = o mais rápido
+    que a câmera mais lenta permitir); uma câmera que não responde em
+    grab_timeout fica fora daquele conjunto sem atrasar as outras.
+
+    As fontes devem ser CameraSource(threaded=False): o manager dirige
+    grab()/retrieve() de cada uma na sua própria thread.
+    """
+
+    def __init__(self, sources: Sequence[CameraSource], max_fps: float = 30.0,
+                 ring_size: int = 3, grab_timeout: float = 1.0):
+        if ring_size < 3:
+            raise ValueError("ring_size deve ser >= 3 (escrita, mais recente, em leitura)")
+        if any(source.threaded for source in sources):
+            raise ValueError("use CameraSource(threaded=False): o manager tem suas próprias threads")
+        self.sources: Dict[int, CameraSource] = {source.index: source for source in sources}
+        if len(self.sources) != len(sources):
+            raise ValueError("índices de câmera repetidos")
+        self.max_fps = max_fps
+        self.ring_size = ring_size
+        self.grab_timeout = grab_timeout
+        self.camera_stats = {camera_id: CameraStats() for camera_id in self.sources}
+        self.last_skew = 0.0
+
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Disparo atual do gatilho: geração, slot do anel e frames já entregues
+        self._generation = 0
+        self._slot = 0
+        self._reports: Dict[int, tuple] = {}
+        self._rings: Dict[int, Optional[List[np.ndarray]]] = {camera_id: None for camera_id in self.sources}
+        # Conjunto mais recente e o que está com o consumidor (mesma lógica do grabber do CameraSource)
+        self._latest: Optional[FrameSet] = None
+        self._latest_slot = None
+        self._latest_consumed = True
+        self._held_slot = None
+        self._sequence = 0
+
+    @classmethod
+    def from_indices(cls, indices: Sequence[int], **kwargs) -> "MultiCameraManager":
+        return cls([CameraSource(index) for index in indices], **kwargs)
+
+    # ---- Ciclo de vida ----
+
+    def open(self) -> bool:
+        """Abrir todas as câmeras em paralelo (a abertura de USB leva centenas de ms cada)."""
+        results = {}
+
+        def open_source(camera_id, source):
+            try:
+                results[camera_id] = source.open()
+            except Exception as e:
+                print(f"❌ Erro ao abrir câmera {camera_id}: {e}")
+                results[camera_id] = False
+
+        threads = [threading.Thread(target=open_source, args=item, daemon=True)
+                   for item in self.sources.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return all(results.values())
+
+    def start(self) -> bool:
+        if self._threads:
+            return True
+        opened = self.open()
+        self._stop.clear()
+        for camera_id in self.sources:
+            self._threads.append(threading.Thread(
+                target=self._camera_loop, args=(camera_id,), name=f"multicam-{camera_id}", daemon=True
+            ))
+        self._threads.append(threading.Thread(target=self._trigger_loop, name="multicam-trigger", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return opened
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        for source in self.sources.values():
+            source.release()
+
+    # ---- Threads ----
+
+    def _camera_loop(self, camera_id: int):
+        source = self.sources[camera_id]
+        stats = self.camera_stats[camera_id]
+        handled = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._generation != handled or self._stop.is_set())
+                if self._stop.is_set():
+                    return
+                generation, slot = self._generation, self._slot
+                ring = self._rings[camera_id]
+            handled = generation
+            buffer = ring[slot] if ring is not None else None
+
+            try:
+                grabbed = source.grab()
+                timestamp = time.monotonic()
+                frame = source.retrieve(buffer) if grabbed else None
+            except Exception as e:
+                print(f"⚠️ Erro na captura da câmera {camera_id}: {e}")
+                timestamp, frame = time.monotonic(), None
+
+            with self._condition:
+                if frame is None:
+                    stats.failures += 1
+                elif frame is not buffer:
+                    # Primeiro frame (ou nova resolução): alocar o anel no formato da câmera
+                    ring = [np.empty_like(frame) for _ in range(self.ring_size)]
+                    np.copyto(ring[slot], frame)
+                    frame = ring[slot]
+                    self._rings[camera_id] = ring
+                if generation == self._generation:
+                    self._reports[camera_id] = (frame, timestamp)
+                    self._condition.notify_all()
+                elif frame is not None:
+                    stats.dropped += 1  # Chegou depois do grab_timeout
+
+    def _trigger_loop(self):
+        period = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            with self._condition:
+                # Slot livre: nem o do conjunto mais recente nem o que está com o consumidor
+                busy = (self._latest_slot, self._held_slot)
+                slot = next(i for i in range(self.ring_size) if i not in busy)
+                self._slot = slot
+                self._reports = {}
+                self._generation += 1
+                self._condition.notify_all()
+
+                self._condition.wait_for(
+                    lambda: len(self._reports) == len(self.sources) or self._stop.is_set(),
+                    timeout=self.grab_timeout
+                )
+                if self._stop.is_set():
+                    break
+                self._publish(slot)
+
+            if period:
+                # Sem acumular atraso se uma câmera ficou para trás
+                next_time = max(next_time + period, time.monotonic() - period)
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+
+    def _publish(self, slot: int):
+        """Montar o FrameSet do disparo atual (chamar com o lock)."""
+        frames = {}
+        for camera_id, (frame, timestamp) in self._reports.items():
+            if frame is not None:
+                self.camera_stats[camera_id].record_capture(timestamp)
+                frames[camera_id] = CapturedFrame(frame, timestamp, self._sequence + 1)
+        if not frames:
+            return
+        if not self._latest_consumed and self._latest is not None:
+            for camera_id in self._latest.frames:
+                self.camera_stats[camera_id].dropped += 1
+        self._sequence += 1
+        self._latest = FrameSet(self._sequence, frames)
+        self._latest_slot = slot
+        self._latest_consumed = False
+        self.last_skew = self._latest.skew
+        self._condition.notify_all()
+
+    # ---- Consumo ----
+
+    def read_latest(self, timeout: float = 1.0) -> Optional[FrameSet]:
+        """
+        FrameSet mais recente ainda não lido (espera até timeout por um novo).
+        Sem cópia: os frames valem até a próxima chamada de read_latest().
+        """
+        with self._condition:
+            # Buffers do conjunto anterior voltam para as câmeras
+            self._held_slot = None
+            if not self._condition.wait_for(
+                lambda: not self._latest_consumed or self._stop.is_set(), timeout=timeout
+            ) or self._latest_consumed:
+                return None
+            self._latest_consumed = True
+            self._held_slot = self._latest_slot
+            return self._latest
+
+    def stats(self) -> Dict[str, Any]:
+        """fps, capturados, descartados, falhas e latência por câmera; skew do último conjunto."""
+        with self._condition:
+            return {
+                'cameras': {camera_id: stats.as_dict() for camera_id, stats in self.camera_stats.items()},
+                'sets': self._sequence,
+                'skew_ms': round(self.last_skew * 1000.0, 2),
+            }
+
+
+class InferenceScheduler:
+    """
+    Um worker de inferência para todas as câmeras do manager.
+
+    A cada FrameSet novo chama process(camera_id, frame) para cada câmera,
+    alternando qual vem primeiro para nenhuma ficar sempre com a maior
+    latência. Conjuntos que chegam enquanto a inferência roda são
+    descartados (só o mais novo é processado). O frame vale só durante
+    process(); copie se precisar guardar.
+    """
+
+    def __init__(self, manager: MultiCameraManager, process: Callable[[int, np.ndarray], Any],
+                 on_result: Optional[Callable[[int, Any, FrameSet], None]] = None):
+        self.manager = manager
+        self.process = process
+        self.on_result = on_result
+        self.results: Dict[int, Any] = {}  # câmera -> último resultado
+        self.sets_processed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def step(self, timeout: float = 0.5) -> bool:
+        """Processar o FrameSet mais novo; False se nenhum chegou em timeout."""
+        frameset = self.manager.read_latest(timeout)
+        if frameset is None:
+            return False
+        order = sorted(frameset.frames)
+        start = self.sets_processed % len(order)
+        for camera_id in order[start:] + order[:start]:
+            captured = frameset.frames[camera_id]
+            try:
+                result = self.process(camera_id, captured.frame)
+            except Exception as e:
+                print(f"⚠️ Erro na inferência da câmera {camera_id}: {e}")
+                continue
+            self.manager.camera_stats[camera_id].record_latency(time.monotonic() - captured.timestamp)
+            self.results[camera_id] = result
+            if self.on_result is not None:
+                self.on_result(camera_id, result, frameset)
+        self.sets_processed += 1
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self.step()
+
+        self._thread = threading.Thread(target=loop, name="multicam-inference", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
@@ -1,9 +1,22 @@
 import numpy as np
 from typing import Tuple
 try:
-    from tofcam.tof_types import ZoneGrid, ZoneCell, ZoneStatus, StrategicPlan, ReactiveCommand, CellState
+    from tofcam.tof_types import ZoneGrid, ZoneStatus, StrategicPlan, ReactiveCommand, CellState
 except ImportError:
-    from tof_types import ZoneGrid, ZoneCell, ZoneStatus, StrategicPlan, ReactiveCommand, CellState
+    from tof_types import ZoneGrid, ZoneStatus, StrategicPlan, ReactiveCommand, CellState
+# Percentil usado como "min_depth" de cada célula
+MIN_DEPTH_PERCENTILE = 10
+
+# Modos de cálculo do min_depth:
+#   exact     -> np.percentile (interpolado), comportamento original
+#   partition -> k-ésimo menor valor exato via np.partition, k = floor(0.1 * (n-1));
+#                caminho rápido (~4x mais rápido que exact)
+STAT_MODES = ("exact", "partition")
+
+
+def _kth_index(n: int, q: int = MIN_DEPTH_PERCENTILE) -> int:
+    return (n - 1) * q // 100
+
 
 class ZoneMapper:
     def __init__(
@@ -13,16 +26,78 @@ class ZoneMapper:
         warn_threshold: float = 0.3,
         emergency_threshold: float = 0.15,
         roi: Tuple[float, float, float, float] = (0.0, 1.0, 0.0, 1.0),
+        stat_mode: str = "exact",
     ):
         """
         roi: (y_min_rel, y_max_rel, x_min_rel, x_max_rel) em [0,1]
              para permitir ROIs diferentes (estratégico vs reativo).
+        stat_mode: "exact" ou "partition" (ver STAT_MODES).
         """
+        if stat_mode not in STAT_MODES:
+            raise ValueError(f"stat_mode inválido: {stat_mode!r} (use {', '.join(STAT_MODES)})")
+
         self.grid_h = grid_h
         self.grid_w = grid_w
         self.warn_threshold = warn_threshold
         self.emergency_threshold = emergency_threshold
         self.roi = roi
+        self.stat_mode = stat_mode
+
+    def _cell_blocks(self, roi_h: int, roi_w: int):
+        """
+        Divide a ROI em até 4 blocos de células de mesmo tamanho:
+        interior, última linha, última coluna e canto (a última linha e a
+        última coluna absorvem o resto da divisão inteira).
+
+        Retorna tuplas (r0, r1, c0, c1, y0, y1, x0, x1): faixa de células
+        no grid e faixa de pixels na ROI correspondente.
+        """
+        cell_h = roi_h // self.grid_h
+        cell_w = roi_w // self.grid_w
+
+        rows = [(0, self.grid_h - 1, 0, (self.grid_h - 1) * cell_h),
+                (self.grid_h - 1, self.grid_h, (self.grid_h - 1) * cell_h, roi_h)]
+        cols = [(0, self.grid_w - 1, 0, (self.grid_w - 1) * cell_w),
+                (self.grid_w - 1, self.grid_w, (self.grid_w - 1) * cell_w, roi_w)]
+
+        blocks = []
+        for r0, r1, y0, y1 in rows:
+            for c0, c1, x0, x1 in cols:
+                if r1 > r0 and c1 > c0:
+                    blocks.append((r0, r1, c0, c1, y0, y1, x0, x1))
+        return blocks
+
+    def _block_stats(self, roi_depth: np.ndarray):
+        """min_depth (percentil ou k-ésimo valor) e média de todas as células, bloco a bloco."""
+        roi_h, roi_w = roi_depth.shape
+        min_depth = np.full((self.grid_h, self.grid_w), np.inf, dtype=np.float32)
+        mean_depth = np.full((self.grid_h, self.grid_w), np.inf, dtype=np.float32)
+
+        # Cada bloco vira uma view (nh, nw, ch*cw): uma célula por linha do
+        # último eixo, estatísticas calculadas de uma vez para o bloco todo.
+        for r0, r1, c0, c1, by0, by1, bx0, bx1 in self._cell_blocks(roi_h, roi_w):
+            nh, nw = r1 - r0, c1 - c0
+            ch, cw = (by1 - by0) // nh, (bx1 - bx0) // nw
+            if ch == 0 or cw == 0:
+                continue  # células vazias: inf / FREE
+
+            block = roi_depth[by0:by1, bx0:bx1]
+            cells = block.reshape(nh, ch, nw, cw).swapaxes(1, 2).reshape(nh, nw, ch * cw)
+
+            # Média antes do partition, que reordena cells in-place
+            mean_depth[r0:r1, c0:c1] = cells.mean(axis=-1)
+            if self.stat_mode == "exact":
+                min_depth[r0:r1, c0:c1] = np.percentile(cells, MIN_DEPTH_PERCENTILE, axis=-1)
+            else:
+                k = _kth_index(ch * cw)
+                # Com ch == 1, cw == 1 ou bloco com a largura toda, o reshape é uma
+                # view do depth_map: copiar antes de reordenar
+                if np.may_share_memory(cells, roi_depth):
+                    cells = cells.copy()
+                cells.partition(k, axis=-1)
+                min_depth[r0:r1, c0:c1] = cells[..., k]
+
+        return min_depth, mean_depth
 
     def map_depth_to_zones(self, depth_map: np.ndarray) -> ZoneGrid:
         h, w = depth_map.shape
@@ -33,53 +108,25 @@ class ZoneMapper:
         x1 = int(self.roi[3] * w)
 
         roi_depth = depth_map[y0:y1, x0:x1]
-        roi_h, roi_w = roi_depth.shape
-
-        cell_h = roi_h // self.grid_h
-        cell_w = roi_w // self.grid_w
-
-        cells = np.empty((self.grid_h, self.grid_w), dtype=object)
 
         global_min = float(roi_depth.min())
         global_max = float(roi_depth.max())
 
-        for i in range(self.grid_h):
-            for j in range(self.grid_w):
-                yy0 = y0 + i * cell_h
-                yy1 = y0 + ((i + 1) * cell_h if i < self.grid_h - 1 else roi_h)
-                xx0 = x0 + j * cell_w
-                xx1 = x0 + ((j + 1) * cell_w if j < self.grid_w - 1 else roi_w)
-
-                region = depth_map[yy0:yy1, xx0:xx1]
-                if region.size == 0:
-                    min_depth = np.inf
-                    mean_depth = np.inf
-                    state = CellState.FREE
-                else:
-                    min_depth = float(np.percentile(region, 10))
-                    mean_depth = float(region.mean())
-
-                    if min_depth < self.emergency_threshold:
-                        state = CellState.EMERGENCY
-                    elif min_depth < self.warn_threshold:
-                        state = CellState.WARNING
-                    else:
-                        state = CellState.FREE
-
-                cells[i, j] = ZoneCell(
-                    row=i,
-                    col=j,
-                    min_depth=min_depth,
-                    mean_depth=mean_depth,
-                    state=state,
-                )
+        min_depth, mean_depth = self._block_stats(roi_depth)
+
+        state = np.full((self.grid_h, self.grid_w), CellState.FREE, dtype=np.uint8)
+        state[min_depth < self.warn_threshold] = CellState.WARNING
+        state[min_depth < self.emergency_threshold] = CellState.EMERGENCY
 
         return ZoneGrid(
             grid_h=self.grid_h,
             grid_w=self.grid_w,
-            cells=cells,
+            min_depth=min_depth,
+            mean_depth=mean_depth,
+            state=state,
             depth_min=global_min,
             depth_max=global_max,
+            metadata={'stat_mode': self.stat_mode},
         )
 
 # Estratégico: quase toda imagem
@@ -102,30 +149,20 @@ class StrategicPlanner:
         self.fov_h = np.deg2rad(fov_horizontal_deg)
 
     def plan(self, zone_grid: ZoneGrid) -> StrategicPlan:
-        cells = zone_grid.cells
         gh, gw = zone_grid.grid_h, zone_grid.grid_w
+        min_depth = zone_grid.min_depth.astype(np.float64)
 
         # Agrega por coluna: score por quantidade de FREE + profundidade média
-        col_scores = np.zeros(gw, dtype=float)
-        col_min_depth = np.full(gw, np.inf, dtype=float)
-
-        for j in range(gw):
-            free_count = 0
-            depth_sum = 0.0
-            depth_count = 0
-            for i in range(gh):
-                cell = cells[i, j]
-                if cell.state == CellState.FREE:
-                    free_count += 1
-                if np.isfinite(cell.min_depth):
-                    depth_sum += cell.min_depth
-                    depth_count += 1
-                    if cell.min_depth < col_min_depth[j]:
-                        col_min_depth[j] = cell.min_depth
-
-            avg_depth = (depth_sum / depth_count) if depth_count > 0 else 0.0
-            # Score simples: mais livres + mais longe
-            col_scores[j] = free_count + 0.5 * avg_depth
+        free_count = np.count_nonzero(zone_grid.state == CellState.FREE, axis=0)
+
+        finite = np.isfinite(min_depth)
+        depth_sum = np.where(finite, min_depth, 0.0).sum(axis=0)
+        depth_count = np.count_nonzero(finite, axis=0)
+        avg_depth = np.divide(depth_sum, depth_count, out=np.zeros(gw), where=depth_count > 0)
+        col_min_depth = np.where(finite, min_depth, np.inf).min(axis=0, initial=np.inf)
+
+        # Score simples: mais livres + mais longe
+        col_scores = free_count + 0.5 * avg_depth
 
         best_col = int(np.argmax(col_scores))
         best_score = float(col_scores[best_col])
@@ -148,45 +185,36 @@ class StrategicPlanner:
         )
 
 
+def _sequential_sum(values: np.ndarray) -> float:
+    """Soma em ordem linha a linha (mesmo arredondamento de um laço Python)."""
+    if values.size == 0:
+        return 0.0
+    return float(np.add.accumulate(values.ravel())[-1])
+
+
 class ReactiveAvoider:
     def __init__(self, front_rows: int = 4):
         self.front_rows = front_rows
 
     def compute(self, zone_grid: ZoneGrid) -> ReactiveCommand:
-        cells = zone_grid.cells
         gh, gw = zone_grid.grid_h, zone_grid.grid_w
 
         front_start = max(0, gh - self.front_rows)
+        front = zone_grid.state[front_start:gh]
 
         # centro
         center_col = gw // 2
-        window = range(center_col - 1, center_col + 2)
-
-        has_emergency = False
-        has_warning = False
+        window = front[:, max(0, center_col - 1):center_col + 2]
 
         # Verifica região frontal
-        for i in range(front_start, gh):
-            for j in window:
-                if not (0 <= j < gw):
-                    continue
-                state = cells[i, j].state
-                if state == CellState.EMERGENCY:
-                    has_emergency = True
-                elif state == CellState.WARNING:
-                    has_warning = True
+        has_emergency = bool(np.any(window == CellState.EMERGENCY))
+        has_warning = bool(np.any(window == CellState.WARNING))
 
         # Score esquerda / direita baseado em FREE/ WARNING
-        left_score = 0.0
-        right_score = 0.0
-        for i in range(front_start, gh):
-            for j in range(gw):
-                s = cells[i, j].state
-                weight = 1.0 if s == CellState.FREE else (0.3 if s == CellState.WARNING else 0.0)
-                if j < center_col:
-                    left_score += weight
-                else:
-                    right_score += weight
+        weights = np.where(front == CellState.FREE, 1.0,
+                           np.where(front == CellState.WARNING, 0.3, 0.0))
+        left_score = _sequential_sum(weights[:, :center_col])
+        right_score = _sequential_sum(weights[:, center_col:])
 
         # yaw: para lado mais livre
         if left_score > right_score:
@@ -0,0 +1,122 @@
+"""
+TOFcam Overlay
+==============
+
+Compositor de textos sobre a visualização: cada label é renderizado uma vez
+como sprite (variantes clara/escura + alpha) e aplicado ao frame com
+um único cv2.blendLinear. Labels estáticos ("ORIGINAL", "DEPTH MAP") nunca são
+redesenhados; valores dinâmicos (yaw, câmera, horário) só quando o texto muda.
+"""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+# Limiar de luminosidade do fundo para escolher texto branco ou preto
+BRIGHTNESS_THRESHOLD = 128
+
+# Pesos BT.601 (B, G, R) da conversão BGR -> cinza
+_GRAY_WEIGHTS = (0.114, 0.587, 0.299)
+
+
+class TextSprite:
+    """
+    Texto pré-renderizado com sombra, nas duas polaridades de contraste.
+
+    Fundo escuro -> texto branco com sombra preta; fundo claro -> texto preto
+    com sombra branca. Como a geometria é a mesma, as duas variantes
+    compartilham o alpha.
+
+    O putText com anti-aliasing é afim no fundo (saída = A + fundo * k), então
+    renderizar sobre fundo preto e branco dá a cor e o alpha exatos do sprite.
+    """
+
+    def __init__(self, text: str, position: Tuple[int, int], font=cv2.FONT_HERSHEY_SIMPLEX,
+                 scale: float = 0.5, thickness: int = 1):
+        self.text = text
+        self.position = position
+        self.scale = scale
+        self.thickness = thickness
+        x, y = position
+
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness + 1)
+        pad = thickness + 2
+        self.left, self.top = x - pad, y - text_h - pad
+        width, height = text_w + 2 * pad + 1, text_h + baseline + 2 * pad + 1
+        origin = (x - self.left, y - self.top)
+        shadow_origin = (origin[0] + 1, origin[1] + 1)
+
+        def render(text_color, shadow_color, background):
+            sprite = np.full((height, width, 3), background, dtype=np.uint8)
+            cv2.putText(sprite, text, shadow_origin, font, scale, shadow_color, thickness + 1)
+            cv2.putText(sprite, text, origin, font, scale, text_color, thickness)
+            return sprite.astype(np.float32)
+
+        def unpremultiply(premultiplied):
+            # Cor do sprite sem o alpha: o blend refaz fundo*(1-alpha) + cor*alpha
+            color = premultiplied / np.maximum(self.alpha, 1e-6)[:, :, None]
+            return np.clip(color + 0.5, 0, 255).astype(np.uint8)
+
+        light = render((255, 255, 255), (0, 0, 0), 0)
+        light_on_white = render((255, 255, 255), (0, 0, 0), 255)
+        # Textos/sombras em cinza puro: o alpha é igual nos 3 canais e nas 2 variantes
+        self.alpha = np.ascontiguousarray(1.0 - (light_on_white[:, :, 0] - light[:, :, 0]) / 255.0)
+        self.inverse_alpha = 1.0 - self.alpha
+        self.light = unpremultiply(light)
+        self.dark = unpremultiply(render((0, 0, 0), (255, 255, 255), 0))
+
+        # Região do fundo usada para decidir o contraste (estimativa do texto)
+        self.sample = (
+            max(0, int(y - 20 * scale)), int(y + 5),
+            max(0, int(x - 5)), int(x + len(text) * 10 * scale + 5),
+        )
+
+    def blit(self, img: np.ndarray) -> bool:
+        """Aplicar no frame (in-place); False se o sprite cair fora da imagem."""
+        img_h, img_w = img.shape[:2]
+        x0, y0 = max(self.left, 0), max(self.top, 0)
+        x1 = min(self.left + self.alpha.shape[1], img_w)
+        y1 = min(self.top + self.alpha.shape[0], img_h)
+        if x1 <= x0 or y1 <= y0:
+            return False
+
+        sy0, sy1, sx0, sx1 = self.sample
+        background = img[sy0:min(sy1, img_h), sx0:min(sx1, img_w)]
+        if background.size:
+            mean_b, mean_g, mean_r, _ = cv2.mean(background)
+            brightness = (_GRAY_WEIGHTS[0] * mean_b + _GRAY_WEIGHTS[1] * mean_g
+                          + _GRAY_WEIGHTS[2] * mean_r)
+        else:
+            brightness = 0.0
+        sprite = self.light if brightness < BRIGHTNESS_THRESHOLD else self.dark
+
+        crop = (slice(y0 - self.top, y1 - self.top), slice(x0 - self.left, x1 - self.left))
+        roi = img[y0:y1, x0:x1]
+        cv2.blendLinear(roi, sprite[crop], self.inverse_alpha[crop], self.alpha[crop], dst=roi)
+        return True
+
+
+class OverlayCompositor:
+    """
+    Labels identificados por slot. Um slot só é re-renderizado quando texto,
+    posição ou escala mudam; caso contrário o sprite em cache é reaplicado.
+    """
+
+    def __init__(self, font=cv2.FONT_HERSHEY_SIMPLEX):
+        self.font = font
+        self._slots: Dict[str, TextSprite] = {}
+        self.renders = 0  # Sprites renderizados (para diagnóstico)
+
+    def draw(self, img: np.ndarray, slot: str, text: str, position: Tuple[int, int],
+             scale: float = 0.5, thickness: int = 1) -> bool:
+        sprite = self._slots.get(slot)
+        if (sprite is None or sprite.text != text or sprite.position != position
+                or sprite.scale != scale or sprite.thickness != thickness):
+            sprite = TextSprite(text, position, self.font, scale, thickness)
+            self._slots[slot] = sprite
+            self.renders += 1
+        return sprite.blit(img)
+
+    def clear(self):
+        self._slots.clear()
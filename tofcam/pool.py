@@ -0,0 +1,175 @@
+"""
+TOFcam Frame Pool
+=================
+
+Pool de buffers numpy reutilizados entre frames: captura, resize,
+conversões de cor, profundidade e colormap pegam arrays do pool e os
+devolvem no fim do frame, em vez de alocar (e liberar) megabytes a cada
+quadro. Em regime estável o número de alocações para de crescer.
+
+Contabilidade de vazamentos: cada buffer emprestado é rastreado (tag,
+formato, instante); buffers devolvidos duas vezes ou alheios ao pool geram
+ValueError, e buffers descartados sem release() (coletados pelo GC) são
+contados em `leaked`.
+"""
+
+import itertools
+import threading
+import time
+import weakref
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Buffers livres agrupados por (formato, dtype).
+
+    acquire() devolve um array reutilizado (conteúdo indefinido, como
+    np.empty) ou aloca um novo; release() o devolve. Até max_free buffers
+    livres por formato ficam guardados; o excedente é descartado.
+    """
+
+    def __init__(self, max_free: int = 8):
+        self.max_free = max_free
+        self._free: Dict[Tuple, List[np.ndarray]] = {}
+        # id(buffer) -> (token, chave, tag, instante, finalizer)
+        self._outstanding: Dict[int, Tuple] = {}
+        self._tokens = itertools.count(1)
+        # Reentrante: o GC pode chamar _collected com o lock já tomado nesta thread
+        self._lock = threading.RLock()
+        self.allocations = 0  # Arrays criados pelo pool
+        self.reuses = 0       # acquire() atendidos sem alocar
+        self.discarded = 0    # Devolvidos com a lista de livres cheia
+        self.leaked = 0       # Coletados pelo GC sem release()
+        self.peak_in_use = 0
+
+    @staticmethod
+    def _key(shape, dtype) -> Tuple:
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        return shape, np.dtype(dtype).str
+
+    def acquire(self, shape, dtype=np.uint8, tag: str = "") -> np.ndarray:
+        """Buffer com o formato e dtype pedidos (conteúdo indefinido)."""
+        key = self._key(shape, dtype)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                self.reuses += 1
+            else:
+                buffer = np.empty(key[0], dtype=key[1])
+                self.allocations += 1
+            self._track(buffer, key, tag)
+            return buffer
+
+    def adopt(self, buffer: np.ndarray, tag: str = "") -> np.ndarray:
+        """Passar a rastrear um array alocado fora do pool (ex.: cv2 mudou a resolução)."""
+        with self._lock:
+            if id(buffer) not in self._outstanding:
+                self.allocations += 1
+                self._track(buffer, self._key(buffer.shape, buffer.dtype), tag)
+        return buffer
+
+    def _track(self, buffer, key, tag):
+        token = next(self._tokens)
+        finalizer = weakref.finalize(buffer, self._collected, id(buffer), token)
+        finalizer.atexit = False
+        self._outstanding[id(buffer)] = (token, key, tag, time.monotonic(), finalizer)
+        self.peak_in_use = max(self.peak_in_use, len(self._outstanding))
+
+    def _collected(self, buffer_id, token):
+        # Chamado pelo GC: o buffer sumiu sem passar por release()
+        with self._lock:
+            entry = self._outstanding.get(buffer_id)
+            if entry is not None and entry[0] == token:
+                del self._outstanding[buffer_id]
+                self.leaked += 1
+
+    def release(self, buffer: np.ndarray):
+        """Devolver um buffer obtido com acquire()/adopt()."""
+        with self._lock:
+            entry = self._outstanding.pop(id(buffer), None)
+            if entry is None:
+                raise ValueError("buffer não pertence ao pool ou já foi devolvido")
+            _, key, _, _, finalizer = entry
+            finalizer.detach()
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free:
+                free.append(buffer)
+            else:
+                self.discarded += 1
+
+    def lease(self, tag: str = "") -> "FrameLease":
+        """Grupo de buffers devolvidos juntos (ex.: os de um frame)."""
+        return FrameLease(self, tag)
+
+    @property
+    def in_use(self) -> int:
+        with self._lock:
+            return len(self._outstanding)
+
+    def outstanding(self, older_than: float = 0.0) -> List[Dict]:
+        """Buffers emprestados há mais de older_than segundos (suspeitos de vazamento)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {'tag': tag, 'shape': key[0], 'dtype': key[1], 'age': now - since}
+                for _, key, tag, since, _ in list(self._outstanding.values())
+                if now - since >= older_than
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'in_use': len(self._outstanding),
+                'peak_in_use': self.peak_in_use,
+                'free': sum(len(free) for free in self._free.values()),
+                'discarded': self.discarded,
+                'leaked': self.leaked,
+            }
+
+    def clear(self):
+        """Esvaziar as listas de livres (buffers emprestados continuam rastreados)."""
+        with self._lock:
+            self._free.clear()
+
+
+class FrameLease:
+    """
+    Buffers de um frame, devolvidos ao pool de uma vez em release()
+    (ou no fim do bloco with). release() é idempotente.
+    """
+
+    def __init__(self, pool: FramePool, tag: str = ""):
+        self.pool = pool
+        self.tag = tag
+        self._buffers: List[np.ndarray] = []
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        buffer = self.pool.acquire(shape, dtype, self.tag)
+        self._buffers.append(buffer)
+        return buffer
+
+    def adopt(self, buffer: np.ndarray) -> np.ndarray:
+        self.pool.adopt(buffer, self.tag)
+        self._buffers.append(buffer)
+        return buffer
+
+    def release(self):
+        buffers, self._buffers = self._buffers, []
+        for buffer in buffers:
+            self.pool.release(buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def __len__(self):
+        return len(self._buffers)
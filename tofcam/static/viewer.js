@@ -0,0 +1,377 @@
+let pollingTimer = null;
+
+function startStream() {
+    // MJPEG: o servidor envia cada frame novo; polling só como fallback
+    const img = document.getElementById('videoStream');
+    img.onerror = function() {
+        console.log('⚠️ MJPEG indisponível, usando polling');
+        startPolling();
+    };
+    img.onload = null;
+    img.src = '/mjpeg';
+}
+
+function startPolling() {
+    if (pollingTimer) return;
+    document.getElementById('videoStream').onerror = null;
+    updateStream();
+    pollingTimer = setInterval(updateStream, 500);  // 2 FPS
+}
+
+let lastStreamEtag = null;
+
+function updateStream() {
+    // Mesma URL sempre: o navegador revalida com If-None-Match e recebe 304 sem frame novo
+    fetch('/stream', {cache: 'no-cache'})
+        .then(response => {
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            const etag = response.headers.get('ETag');
+            if (etag && etag === lastStreamEtag) return null;  // Frame já exibido
+            lastStreamEtag = etag;
+            return response.blob();
+        })
+        .then(blob => {
+            if (!blob) return;
+            const img = document.getElementById('videoStream');
+            const oldSrc = img.src;
+            img.onload = () => { if (lastData) drawOverlay(lastData); };
+            img.src = URL.createObjectURL(blob);
+            if (oldSrc.startsWith('blob:')) URL.revokeObjectURL(oldSrc);
+        })
+        .catch(err => console.log('❌ Erro ao carregar imagem:', err));
+}
+
+function loadCameras() {
+    fetch('/cameras')
+        .then(response => response.json())
+        .then(cameras => {
+            const select = document.getElementById('cameraSelect');
+            const controls = document.querySelector('.camera-controls');
+
+            select.innerHTML = '';
+            cameras.forEach(cam => {
+                const option = document.createElement('option');
+                option.value = cam.id;
+                option.textContent = `Câmera ${cam.id}`;
+                if (cam.active) option.selected = true;
+                select.appendChild(option);
+            });
+
+            const activeCamera = cameras.find(cam => cam.active);
+
+            // Se há apenas uma câmera, desabilitar seletor
+            if (cameras.length <= 1) {
+                select.disabled = true;
+                document.getElementById('cameraStatus').textContent = 
+                    `📹 Câmera ${activeCamera ? activeCamera.id : 'N/A'} (única disponível)`;
+            } else {
+                select.disabled = false;
+                document.getElementById('cameraStatus').textContent = 
+                    `Ativa: Câmera ${activeCamera ? activeCamera.id : 'N/A'} (${cameras.length} disponíveis)`;
+            }
+        })
+        .catch(err => {
+            console.error('Erro ao carregar câmeras:', err);
+            document.getElementById('cameraStatus').textContent = 'Erro';
+        });
+}
+
+const SWITCH_STATES = {
+    pending: 'Na fila...',
+    opening: 'Abrindo câmera...',
+    warming: 'Aquecendo câmera...',
+    swapping: 'Trocando...'
+};
+
+function switchCamera() {
+    const select = document.getElementById('cameraSelect');
+    const cameraId = parseInt(select.value);
+
+    document.getElementById('cameraStatus').textContent = 'Trocando...';
+
+    // A troca roda em segundo plano: o stream atual continua até a nova câmera estar pronta
+    fetch('/switch_camera', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({camera_id: cameraId})
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success && result.job === undefined) {
+            loadCameras();  // Troca síncrona (web_viewer.py): já concluída
+        } else if (result.success) {
+            watchCameraSwitch(cameraId, result.job);
+        } else {
+            document.getElementById('cameraStatus').textContent = 'Erro na troca';
+            console.error(`❌ Erro ao trocar câmera: ${result.error}`);
+        }
+    })
+    .catch(err => {
+        console.error('Erro ao trocar câmera:', err);
+        document.getElementById('cameraStatus').textContent = 'Erro na troca';
+    });
+}
+
+function watchCameraSwitch(cameraId, jobId) {
+    // Progresso do job em /cameras, até concluir ou falhar
+    fetch('/cameras', {cache: 'no-cache'})
+        .then(response => response.json())
+        .then(cameras => {
+            const camera = cameras.find(cam => cam.id === cameraId);
+            const job = camera && camera.switch;
+            if (!job || job.id !== jobId) return;  // Substituído por outra troca
+            if (job.state === 'done') {
+                console.log(`✅ Câmera trocada para ${cameraId}`);
+                loadCameras();
+            } else if (job.state === 'failed') {
+                document.getElementById('cameraStatus').textContent = 'Erro na troca';
+                console.error(`❌ Erro ao trocar câmera: ${job.error}`);
+                loadCameras();
+            } else {
+                document.getElementById('cameraStatus').textContent = SWITCH_STATES[job.state] || 'Trocando...';
+                setTimeout(() => watchCameraSwitch(cameraId, jobId), 300);
+            }
+        })
+        .catch(err => {
+            console.error('Erro ao acompanhar troca de câmera:', err);
+            document.getElementById('cameraStatus').textContent = 'Erro na troca';
+        });
+}
+
+function changeDepthMode() {
+    const select = document.getElementById('depthModeSelect');
+    const mode = select.value;
+
+    fetch('/depth_mode', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({mode: mode})
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            console.log(`✅ Modo de profundidade alterado para: ${result.mode}`);
+        } else {
+            console.error(`❌ Erro ao alterar modo: ${result.error}`);
+        }
+    })
+    .catch(err => {
+        console.error('Erro ao alterar modo de profundidade:', err);
+    });
+}
+
+function updateWeights() {
+    const midasWeight = document.getElementById('midasWeight').value;
+    const gradientWeight = document.getElementById('gradientWeight').value;
+
+    // Atualizar displays
+    document.getElementById('midasValue').textContent = midasWeight + '%';
+    document.getElementById('gradientValue').textContent = gradientWeight + '%';
+
+    // Enviar para servidor
+    fetch('/depth_weights', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            midas_weight: midasWeight / 100.0,
+            gradient_weight: gradientWeight / 100.0
+        })
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            console.log(`✅ Pesos atualizados - MiDaS: ${result.midas_weight}, Gradiente: ${result.gradient_weight}`);
+        } else {
+            console.error(`❌ Erro ao atualizar pesos: ${result.error}`);
+        }
+    })
+    .catch(err => {
+        console.error('Erro ao atualizar pesos:', err);
+    });
+}
+
+function changeOverlayMode() {
+    const mode = document.getElementById('overlaySelect').value;
+
+    fetch('/overlay_mode', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({mode: mode})
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            console.log(`✅ Overlay desenhado no: ${result.mode}`);
+        } else {
+            console.error(`❌ Erro ao alterar overlay: ${result.error}`);
+        }
+    })
+    .catch(err => {
+        console.error('Erro ao alterar modo de overlay:', err);
+    });
+}
+
+// Overlay no navegador: o servidor envia só original | depth (640x240) e o
+// registro de navegação; setas, labels e grades são desenhados aqui
+let overlayMode = 'server';
+let lastData = null;
+const CELL_COLORS = ['rgba(0,255,0,0.15)', 'rgba(255,255,0,0.35)', 'rgba(255,0,0,0.45)'];
+
+function applyOverlayMode(mode) {
+    if (mode === overlayMode) return;
+    overlayMode = mode;
+    const client = mode === 'client';
+    document.getElementById('videoStream').classList.toggle('source-only', client);
+    document.getElementById('overlayCanvas').style.display = client ? 'block' : 'none';
+    document.getElementById('overlaySelect').value = mode;
+}
+
+function drawLabel(ctx, text, x, y, size, color) {
+    ctx.font = `${size}px sans-serif`;
+    ctx.lineWidth = Math.max(2, size / 5);
+    ctx.strokeStyle = 'black';
+    ctx.strokeText(text, x, y);
+    ctx.fillStyle = color;
+    ctx.fillText(text, x, y);
+}
+
+function drawGrid(ctx, grid, x, y, w, h) {
+    const [y0, y1, x0, x1] = grid.roi;
+    const cellW = w * (x1 - x0) / grid.cols;
+    const cellH = h * (y1 - y0) / grid.rows;
+    for (let i = 0; i < grid.rows; i++) {
+        for (let j = 0; j < grid.cols; j++) {
+            ctx.fillStyle = CELL_COLORS[grid.states.charCodeAt(i * grid.cols + j) - 48];
+            ctx.fillRect(x + w * x0 + j * cellW, y + h * y0 + i * cellH, cellW, cellH);
+        }
+    }
+}
+
+function drawArrow(ctx, direction, x, y, w, h, color) {
+    // Mesma convenção do servidor: direção * 45°, 0 = para cima
+    const angle = direction * 45 * Math.PI / 180;
+    const cx = x + w / 2, cy = y + h / 2, length = h / 4;
+    const ex = cx + length * Math.sin(angle), ey = cy - length * Math.cos(angle);
+    const head = length * 0.3;
+    ctx.strokeStyle = color;
+    ctx.lineWidth = Math.max(3, h / 80);
+    ctx.beginPath();
+    ctx.moveTo(cx, cy);
+    ctx.lineTo(ex, ey);
+    ctx.lineTo(ex - head * Math.sin(angle - 0.5), ey + head * Math.cos(angle - 0.5));
+    ctx.moveTo(ex, ey);
+    ctx.lineTo(ex - head * Math.sin(angle + 0.5), ey + head * Math.cos(angle + 0.5));
+    ctx.stroke();
+}
+
+function drawOverlay(data) {
+    if (overlayMode !== 'client') return;
+    const img = document.getElementById('videoStream');
+    const canvas = document.getElementById('overlayCanvas');
+    if (!img.naturalWidth) return;
+
+    // Resolução do canvas = tamanho exibido (vetorial, independente do JPEG)
+    const dpr = window.devicePixelRatio || 1;
+    const width = Math.round(canvas.clientWidth * dpr);
+    if (canvas.width !== width) {
+        canvas.width = width;
+        canvas.height = Math.round(width * 3 / 4);
+    }
+    const w = canvas.width / 2, h = canvas.height / 2;
+    const srcW = img.naturalWidth / 2, srcH = img.naturalHeight;
+    const ctx = canvas.getContext('2d');
+
+    // Linha de cima: original | depth; linha de baixo: depth com grades e setas
+    ctx.drawImage(img, 0, 0, img.naturalWidth, srcH, 0, 0, canvas.width, h);
+    ctx.drawImage(img, srcW, 0, srcW, srcH, 0, h, w, h);
+    ctx.drawImage(img, srcW, 0, srcW, srcH, w, h, w, h);
+
+    const grids = data.grids || {};
+    if (grids.strategic) drawGrid(ctx, grids.strategic, 0, h, w, h);
+    if (grids.reactive) drawGrid(ctx, grids.reactive, w, h, w, h);
+    drawArrow(ctx, data.strategic, 0, h, w, h, 'rgb(0,255,255)');
+    drawArrow(ctx, data.reactive, w, h, w, h, 'rgb(255,0,255)');
+
+    const size = h / 14, small = h / 18, pad = w / 32;
+    drawLabel(ctx, 'ORIGINAL', pad, pad + size, size, 'white');
+    drawLabel(ctx, 'DEPTH MAP', w + pad, pad + size, size, 'white');
+    drawLabel(ctx, `STRATEGIC: ${data.strategic >= 0 ? '+' : ''}${data.strategic.toFixed(2)}`,
+              pad, h + pad + size, size, 'white');
+    drawLabel(ctx, `REACTIVE: ${data.reactive >= 0 ? '+' : ''}${data.reactive.toFixed(2)}`,
+              w + pad, h + pad + size, size, 'white');
+    drawLabel(ctx, `Camera ${data.camera}`, pad, h + 2 * pad + 2 * size, small, 'white');
+    drawLabel(ctx, new Date(data.timestamp * 1000).toLocaleTimeString(),
+              pad, h + 3 * pad + 3 * size, small, 'white');
+}
+
+function updateData() {
+    fetch('/data')
+        .then(response => response.json())
+        .then(showData)
+        .catch(err => console.error('Erro ao buscar dados:', err));
+}
+
+function showData(data) {
+    if (data.strategic === undefined) return;  // Ainda sem frame
+    lastData = data;
+    if (data.overlay) applyOverlayMode(data.overlay);
+    drawOverlay(data);
+    // Strategic
+    const strategicEl = document.getElementById('strategicValue');
+    strategicEl.textContent = data.strategic.toFixed(3) + '°';
+
+    // Reactive
+    const reactiveEl = document.getElementById('reactiveValue');
+    reactiveEl.textContent = data.reactive.toFixed(3) + '°';
+
+    // Frame count
+    document.getElementById('frameCount').textContent = data.frame_count;
+
+    // Status
+    const diff = Math.abs(data.strategic - data.reactive);
+    let status, statusClass;
+    if (diff < 0.1) {
+        status = 'ACORDO ✅';
+        statusClass = 'positive';
+    } else if (diff < 0.3) {
+        status = 'SIMILAR 🟡';
+        statusClass = 'neutral';
+    } else {
+        status = 'DIVERGEM 🔴';
+        statusClass = 'negative';
+    }
+
+    const statusEl = document.getElementById('status');
+    statusEl.textContent = status;
+    statusEl.className = 'stat-value ' + statusClass;
+}
+
+let dataTimer = null;
+
+function startEvents() {
+    // SSE: dados de navegação a cada frame; polling 1 Hz só como fallback
+    if (!window.EventSource) {
+        dataTimer = setInterval(updateData, 1000);
+        return;
+    }
+    const events = new EventSource('/events');
+    events.onmessage = function(event) {
+        showData(JSON.parse(event.data));
+    };
+    events.onerror = function() {
+        if (events.readyState === EventSource.CLOSED && !dataTimer) {
+            console.log('⚠️ SSE indisponível, usando polling');
+            dataTimer = setInterval(updateData, 1000);
+        }
+    };
+}
+
+// Atualizar stream e dados
+console.log('🚀 Iniciando atualizações...');
+
+// Primeira atualização
+console.log('📡 Primeira atualização...');
+loadCameras();  // Carregar lista de câmeras
+startStream();
+updateData();
+startEvents();
@@ -1,6 +1,8 @@
 import abc
-from dataclasses import dataclass
-from typing import Optional, Tuple
+import base64
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, Iterator, Optional, Tuple
 from enum import IntEnum
 
 import cv2
@@ -35,13 +37,100 @@ class ZoneCell:
     state: CellState
 
 
+def _zone_cell(grid: "ZoneGrid", i: int, j: int) -> ZoneCell:
+    i = range(grid.grid_h)[i]
+    j = range(grid.grid_w)[j]
+    return ZoneCell(
+        row=i,
+        col=j,
+        min_depth=float(grid.min_depth[i, j]),
+        mean_depth=float(grid.mean_depth[i, j]),
+        state=CellState(int(grid.state[i, j])),
+    )
+
+
+class ZoneRowView:
+    """Linha i de um ZoneCellView: cells[i][j] e iteração pelas células da linha."""
+
+    def __init__(self, grid: "ZoneGrid", row: int):
+        self._grid = grid
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._grid.grid_w
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [_zone_cell(self._grid, self._row, col) for col in range(self._grid.grid_w)[j]]
+        return _zone_cell(self._grid, self._row, j)
+
+    def __iter__(self) -> Iterator[ZoneCell]:
+        for j in range(self._grid.grid_w):
+            yield _zone_cell(self._grid, self._row, j)
+
+
+class ZoneCellView:
+    """
+    Visão de compatibilidade sobre um ZoneGrid, com o acesso da antiga matriz
+    de ZoneCell: cells[i, j], cells[i][j] e iteração por linhas. Os ZoneCell
+    são montados sob demanda.
+    """
+
+    def __init__(self, grid: "ZoneGrid"):
+        self._grid = grid
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self._grid.grid_h, self._grid.grid_w)
+
+    def __len__(self) -> int:
+        return self._grid.grid_h
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            i, j = index
+            return _zone_cell(self._grid, i, j)
+        if isinstance(index, slice):
+            return [ZoneRowView(self._grid, i) for i in range(self._grid.grid_h)[index]]
+        return ZoneRowView(self._grid, range(self._grid.grid_h)[index])
+
+    def __iter__(self) -> Iterator[ZoneRowView]:
+        for i in range(self._grid.grid_h):
+            yield ZoneRowView(self._grid, i)
+
+
 @dataclass
 class ZoneGrid:
     grid_h: int
     grid_w: int
-    cells: np.ndarray  # matriz (grid_h x grid_w) de ZoneCell
+    min_depth: np.ndarray   # (grid_h x grid_w) float32
+    mean_depth: np.ndarray  # (grid_h x grid_w) float32
+    state: np.ndarray       # (grid_h x grid_w) uint8 com valores de CellState
     depth_min: float
     depth_max: float
+    metadata: Dict[str, Any] = field(default_factory=dict)  # ex.: stat_mode
+
+    def __post_init__(self):
+        self.min_depth = np.ascontiguousarray(self.min_depth, dtype=np.float32)
+        self.mean_depth = np.ascontiguousarray(self.mean_depth, dtype=np.float32)
+        self.state = np.ascontiguousarray(self.state, dtype=np.uint8)
+
+    @property
+    def cells(self) -> ZoneCellView:
+        """Acesso célula a célula (compatibilidade): cells[i, j] -> ZoneCell."""
+        return ZoneCellView(self)
+
+    def copy(self) -> "ZoneGrid":
+        return ZoneGrid(
+            grid_h=self.grid_h,
+            grid_w=self.grid_w,
+            min_depth=self.min_depth.copy(),
+            mean_depth=self.mean_depth.copy(),
+            state=self.state.copy(),
+            depth_min=self.depth_min,
+            depth_max=self.depth_max,
+            metadata=dict(self.metadata),
+        )
 
 
 @dataclass
@@ -66,6 +155,36 @@ class ReactiveCommand:
     emergency_brake: bool
 
 
+@dataclass(frozen=True)
+class EncodedFrame:
+    """
+    Frame JPEG já codificado, imutável, compartilhado entre threads e clientes.
+    O base64 (data URI) só é gerado sob demanda, uma vez por frame.
+    """
+    jpeg: bytes
+    frame_id: int = 0
+    timestamp: float = 0.0
+
+    @classmethod
+    def encode(cls, image: np.ndarray, quality: int = 85, frame_id: int = 0,
+               timestamp: float = 0.0) -> "EncodedFrame":
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Falha ao codificar frame em JPEG")
+        return cls(buffer.tobytes(), frame_id, timestamp)
+
+    def __len__(self) -> int:
+        return len(self.jpeg)
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.jpeg).decode('ascii')
+
+    @property
+    def data_uri(self) -> str:
+        return f"data:image/jpeg;base64,{self.base64}"
+
+
 class DepthEstimator(abc.ABC):
     @abc.abstractmethod
     def estimate_depth(self, frame_bgr: np.ndarray) -> np.ndarray:
@@ -15,6 +15,7 @@ Features:
 Usage:
     conda activate opencv          # OBRIGATÓRIO
     python tofcam/web.py          # Servidor standalone
+    python tofcam/web.py --async  # Backend asyncio (muitas conexões de streaming)
     python main.py --web         # Via main unificado
 
 URL: http://localhost:8082
@@ -26,12 +27,15 @@ Requirements:
 
 import cv2
 import numpy as np
-import base64
+import itertools
 import json
 import time
 import threading
+from contextlib import contextmanager
+from dataclasses import replace
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
 import sys
 import os
 
@@ -68,7 +72,7 @@ try:
     print("✅ Mappers carregados")
 except ImportError:
     try:
-        from tofcam.lib.navigation import StrategicPlanner, ReactiveAvoider
+        from tofcam.nav import StrategicPlanner, ReactiveAvoider
         print("✅ Mappers carregados")
     except ImportError as e:
         print(f"⚠️ Mapping não disponível: {e}")
@@ -86,24 +90,242 @@ except ImportError:
         print(f"⚠️ View não disponível: {e}")
         def depth_to_color(depth):
             # Usar esquema intuitivo: Vermelho=Próximo, Verde=Longe
-            try:
-                return ColorUtils.depth_to_color(depth)
-            except:
-                # Fallback personalizado com esquema vermelho->verde
-                import cv2
-                # Criar colormap customizado
-                d = (depth * 255).astype(np.uint8)
-                # Inverter JET para que vermelho seja próximo
-                colored = cv2.applyColorMap(255 - d, cv2.COLORMAP_JET)
-                # Ajustar para nosso padrão: trocar azul por vermelho para proximidade
-                colored[:,:,[0,2]] = colored[:,:,[2,0]]  # Trocar B e R
-                return colored
+            return DEPTH_COLORMAP.apply(depth)
         def draw_yaw_arrow(img, angle):
             return img
 
+try:
+    from tofcam.assets import StaticAssets, etag_matches
+    from tofcam.binary import DEPTH_FLOAT16, DEPTH_UINT16, encode_depth, encode_grid
+    from tofcam.colormap import DEPTH_COLORMAP
+    from tofcam.discovery import CameraDiscovery
+    from tofcam.nav import ZoneMapper
+    from tofcam.overlay import OverlayCompositor
+    from tofcam.pool import FramePool
+    from tofcam.tof_types import EncodedFrame
+except ImportError:
+    from assets import StaticAssets, etag_matches
+    from binary import DEPTH_FLOAT16, DEPTH_UINT16, encode_depth, encode_grid
+    from colormap import DEPTH_COLORMAP
+    from discovery import CameraDiscovery
+    from nav import ZoneMapper
+    from overlay import OverlayCompositor
+    from pool import FramePool
+    from tof_types import EncodedFrame
+
 class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
     """Servidor HTTP com threading para múltiplas conexões."""
     allow_reuse_address = True
+    # Conexões MJPEG ficam abertas indefinidamente: não bloquear o shutdown
+    daemon_threads = True
+    # Backlog padrão (5) faz conexões simultâneas de vários viewers esperarem retransmissão do SYN
+    request_queue_size = 64
+
+class FrameArrays:
+    """
+    Arrays numéricos de um frame (depth map e grades de zonas) para os
+    endpoints binários. Cada formato é serializado na primeira requisição
+    e cacheado: N clientes do mesmo frame custam uma serialização.
+
+    lease: buffers do pool usados pelo frame (depth map incluso), devolvidos
+    em retire() quando o FrameHub publica o frame seguinte.
+    """
+
+    def __init__(self, depth_map, grids, lease=None):
+        self.frame_id = 0  # Definido pelo FrameHub ao publicar
+        self.depth_map = depth_map
+        self.grids = grids  # nome -> ZoneGrid
+        self.lease = lease
+        self.retired = False
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def retire(self):
+        """Frame substituído: devolver os buffers (espera serializações em andamento)."""
+        with self._lock:
+            self.retired = True
+            self.depth_map = None
+            if self.lease is not None:
+                self.lease.release()
+
+    def _cached(self, key, encode):
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is None:
+                payload = self._payloads[key] = encode()
+            return payload
+
+    def grid(self, name):
+        """Payload binário da grade `name` (ou None se o frame não tem essa grade)."""
+        grid = self.grids.get(name)
+        if grid is None:
+            return None
+        return self._cached(('grid', name), lambda: encode_grid(grid, self.frame_id))
+
+    def depth(self, dtype=DEPTH_FLOAT16):
+        """Payload binário do depth map (float16 ou uint16 quantizado); None se já aposentado."""
+        with self._lock:
+            payload = self._payloads.get(('depth', dtype))
+            if payload is None and self.depth_map is not None:
+                payload = self._payloads[('depth', dtype)] = encode_depth(self.depth_map, self.frame_id, dtype)
+            return payload
+
+
+class FrameHub:
+    """
+    Difusão de frames para vários clientes: o capture_loop publica uma vez e
+    cada cliente aguarda um frame_id mais novo que o último que recebeu.
+
+    Semântica drop-to-latest: um cliente lento simplesmente recebe o frame
+    mais recente quando volta a esperar (os intermediários são descartados
+    só para ele), sem atrasar o publicador nem os outros clientes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._closed = False
+        self.frame_id = 0
+        self.frame = None   # EncodedFrame mais recente
+        self.data = {}      # Dados do mesmo frame (dict substituído, nunca alterado)
+        self.data_json = b'{}'  # data serializado uma vez por frame, compartilhado
+        self.arrays = None  # FrameArrays do mesmo frame (endpoints binários)
+        self.clients = 0
+        self._listeners = []
+        # Demanda: clientes de streaming, requisições recentes (polling) e o aviso ao capture_loop
+        self.last_request = 0.0
+        self._demand = threading.Event()
+        # Distingue frame_ids de execuções diferentes do servidor nos ETags
+        self.epoch = format(time.time_ns() // 1000000, 'x')
+
+    def publish(self, frame, data, arrays=None):
+        """
+        Publicar frame e dados atomicamente; O(1) independente do número de clientes.
+        O frame recebe o frame_id do hub (o mesmo dos ETags e ids do SSE).
+        """
+        data_json = json.dumps(data).encode('utf-8')
+        with self._condition:
+            previous = self.arrays
+            self.frame_id += 1
+            if frame is not None and frame.frame_id != self.frame_id:
+                frame = replace(frame, frame_id=self.frame_id)
+            self.frame = frame
+            self.data = data
+            self.data_json = data_json
+            self.arrays = arrays
+            if arrays is not None:
+                arrays.frame_id = self.frame_id
+            self._condition.notify_all()
+        self._notify_listeners()
+        if previous is not None and previous is not arrays:
+            previous.retire()  # Buffers do frame anterior voltam ao pool
+
+    def add_listener(self, callback):
+        """
+        Registrar callback() chamado (na thread do publicador) a cada frame
+        novo e no fechamento; usado para acordar event loops (asyncio).
+        """
+        with self._condition:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._condition:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify_listeners(self):
+        for callback in list(self._listeners):
+            callback()
+
+    def latest(self):
+        """(frame_id, frame, data) mais recentes, sem esperar."""
+        with self._condition:
+            return self.frame_id, self.frame, self.data
+
+    def etag(self, frame_id):
+        """ETag HTTP do frame frame_id."""
+        return f'"{self.epoch}-{frame_id}"'
+
+    def latest_arrays(self):
+        """(frame_id, FrameArrays) mais recentes, sem esperar."""
+        with self._condition:
+            return self.frame_id, self.arrays
+
+    def snapshot(self):
+        """(frame_id, frame, data, data_json) consistentes entre si, sem esperar."""
+        with self._condition:
+            return self.frame_id, self.frame, self.data, self.data_json
+
+    def _wait_new(self, last_frame_id, timeout):
+        """Esperar frame_id != last_frame_id; True se há frame novo (chamar com o lock)."""
+        self._condition.wait_for(
+            lambda: self.frame_id != last_frame_id or self._closed,
+            timeout=timeout
+        )
+        return self.frame_id != last_frame_id and self.frame is not None
+
+    def wait(self, last_frame_id, timeout=1.0):
+        """
+        Aguardar um frame mais novo que last_frame_id.
+        Retorna (frame_id, frame, data) ou (last_frame_id, None, None) no timeout/fechamento.
+        """
+        with self._condition:
+            if not self._wait_new(last_frame_id, timeout):
+                return last_frame_id, None, None
+            return self.frame_id, self.frame, self.data
+
+    def wait_json(self, last_frame_id, timeout=1.0):
+        """Como wait(), mas retorna (frame_id, data_json) do mesmo frame, ou (last_frame_id, None)."""
+        with self._condition:
+            if not self._wait_new(last_frame_id, timeout):
+                return last_frame_id, None
+            return self.frame_id, self.data_json
+
+    def open(self):
+        with self._condition:
+            self._closed = False
+
+    def close(self):
+        """Acordar todos os clientes em espera (fim da captura)."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._demand.set()  # Tirar o capture_loop do sono idle
+        self._notify_listeners()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def touch(self):
+        """Registrar uma requisição (clientes de polling contam como viewers por um tempo)."""
+        self.last_request = time.monotonic()
+        self._demand.set()
+
+    def has_viewers(self, idle_timeout):
+        """Há cliente de streaming ou requisição nos últimos idle_timeout segundos?"""
+        return self.clients > 0 or time.monotonic() - self.last_request < idle_timeout
+
+    def wait_for_demand(self, timeout):
+        """Dormir até timeout, acordando assim que um cliente chegar; True se acordou por demanda."""
+        woke = self._demand.wait(timeout)
+        self._demand.clear()
+        return woke
+
+    @contextmanager
+    def client(self):
+        """Registrar um cliente de streaming enquanto o bloco estiver ativo."""
+        with self._condition:
+            self.clients += 1
+        self._demand.set()
+        try:
+            yield self
+        finally:
+            with self._condition:
+                self.clients -= 1
+
+
+# Jobs de troca de câmera mantidos para consulta em /cameras
+SWITCH_JOB_HISTORY = 16
 
 class TOFcamWebViewer:
     """Visualizador web para TOFcam."""
@@ -114,40 +336,54 @@ class TOFcamWebViewer:
         self.strategic = None
         self.reactive = None
         self.is_running = False
-        self.current_frame = None
-        self.current_data = {}
+        # Frame/dados atuais, difundidos para todos os clientes
+        self.hub = FrameHub()
+        # Canvas 640x480 da grade 2x2, reutilizado a cada frame (codificado antes do próximo)
+        self._canvas = np.zeros((480, 640, 3), dtype=np.uint8)
+        # Modo "client": só os painéis original|depth (640x240); o navegador desenha setas/labels/grades
+        self.overlay_mode = "server"  # "server", "client"
+        self._panels = np.zeros((240, 640, 3), dtype=np.uint8)
+        
+        # Processamento sob demanda: sem viewers não há visualização nem JPEG;
+        # sem consumidores de navegação também, cai para idle_interval
+        self.frame_interval = 0.1   # ~10 FPS com viewers ou consumidores
+        self.idle_interval = 1.0    # Sem ninguém: 1 frame/s só para manter o estado
+        self.viewer_timeout = 5.0   # Requisição de polling conta como viewer por 5s
+        self.pipeline_mode = "idle"  # "full", "navigation", "idle"
+        self._navigation_consumers = []
+        
+        # Troca de câmera assíncrona: (id, fonte, evento) aguardando a fronteira do frame
+        self._camera_lock = threading.Lock()
+        self._switch_lock = threading.Lock()
+        self._pending_camera = None
+        self._retired_sources = []  # Fontes trocadas aguardando o capture_loop liberar
+        self.switch_timeout = 5.0  # Espera pela fronteira de frame antes de trocar direto
+        self._job_ids = itertools.count(1)
+        self.switch_jobs = {}  # id -> job, em ordem de criação
+        # Labels pré-renderizados; textos dinâmicos só re-renderizam quando mudam
+        self.overlay = OverlayCompositor()
+        # Buffers reutilizados entre frames (captura, resize, profundidade, colormap)
+        self.buffers = FramePool()
+        self._capture_shape = None
         self.current_camera = 0  # Será definido para a maior câmera disponível
         self.available_cameras = []
+        # Sondagem paralela com cache por identidade de /dev/video*; rescan para hot-plug
+        self.discovery = CameraDiscovery()
+        self.rescan_interval = 5.0
         
         # Controles para técnica híbrida de profundidade
         self.depth_mode = "hybrid"  # "midas", "gradient", "hybrid"
         self.midas_weight = 0.87  # Peso do MiDaS (0.0 a 1.0) - 87% padrão
         self.gradient_weight = 0.58  # Peso do gradiente (0.0 a 1.0) - 58% padrão
         
-    def find_available_cameras(self):
-        """Detectar câmeras disponíveis."""
-        cameras = []
+    def find_available_cameras(self, force=False):
+        """Detectar câmeras disponíveis (sondagem paralela, cache entre execuções)."""
         print("🔍 Testando câmeras disponíveis...")
-        
-        # Testar câmeras de 0 a 4 com método simples que funcionava antes
-        for i in range(5):  
-            cap = cv2.VideoCapture(i)
-            
-            if cap.isOpened():
-                # Configurar propriedades básicas apenas
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                
-                # Tentar ler um frame para validar
-                ret, frame = cap.read()
-                if ret and frame is not None and frame.size > 0:
-                    cameras.append(i)
-                    print(f"✅ Câmera {i} disponível - resolução: {frame.shape}")
-                else:
-                    print(f"⚠️ Câmera {i} abriu mas sem frame válido")
-                    
-                cap.release()
+        cameras = self.discovery.discover(force=force)
+        if self.discovery.from_cache:
+            print("📹 Dispositivos inalterados - usando cache de câmeras")
+        for i in cameras:
+            print(f"✅ Câmera {i} disponível - resolução: {tuple(self.discovery.details[i]['shape'])}")
                 
         self.available_cameras = cameras
         # Definir câmera padrão como a maior disponível  
@@ -156,6 +392,12 @@ class TOFcamWebViewer:
             print(f"📹 Câmera padrão definida: {self.current_camera} (maior disponível)")
         print(f"📹 Total de câmeras funcionais: {len(cameras)} - {cameras}")
         return cameras
+    
+    def _on_cameras_changed(self, cameras):
+        """Hot-plug: atualizar a lista (a câmera em uso fica, mesmo sem responder à sonda)."""
+        if self.camera_source is not None and self.current_camera not in cameras:
+            cameras = sorted(cameras + [self.current_camera])
+        self.available_cameras = cameras
         
     def initialize_components(self):
         """Inicializar componentes do sistema."""
@@ -208,83 +450,154 @@ class TOFcamWebViewer:
         else:
             print("⚠️ Algoritmos desabilitados")
             
-        # Inicializar ZoneMapper para análise sofisticada (igual ao main_analyzer)
-        try:
-            from mapping import ZoneMapper
-            # Usar as mesmas configurações do main_analyzer.py
-            self.strategic_mapper = ZoneMapper(
-                grid_h=24, grid_w=32,
-                warn_threshold=0.35, emergency_threshold=0.20,
-                roi=(0.10, 1.00, 0.10, 0.90)
-            )
-            self.reactive_mapper = ZoneMapper(
-                grid_h=12, grid_w=16,
-                warn_threshold=0.25, emergency_threshold=0.12,
-                roi=(0.50, 1.00, 0.25, 0.75)
-            )
-            print("✅ ZoneMappers carregados com configuração completa!")
-        except Exception as e:
-            print(f"⚠️ ZoneMappers não disponíveis: {e}")
-            self.strategic_mapper = None
-            self.reactive_mapper = None
+        self._init_zone_mappers()
         
         print("✅ Componentes prontos!")
+    
+    def _init_zone_mappers(self):
+        """Inicializar ZoneMappers para análise sofisticada (igual ao main_analyzer)."""
+        # Usar as mesmas configurações do main_analyzer.py
+        self.strategic_mapper = ZoneMapper(
+            grid_h=24, grid_w=32,
+            warn_threshold=0.35, emergency_threshold=0.20,
+            roi=(0.10, 1.00, 0.10, 0.90)
+        )
+        self.reactive_mapper = ZoneMapper(
+            grid_h=12, grid_w=16,
+            warn_threshold=0.25, emergency_threshold=0.12,
+            roi=(0.50, 1.00, 0.25, 0.75)
+        )
+        print("✅ ZoneMappers carregados com configuração completa!")
         
-    def switch_camera(self, camera_id):
-        """Trocar para uma câmera diferente."""
-        if camera_id not in self.available_cameras:
-            return False
-            
-        print(f"📹 Trocando para câmera {camera_id}...")
-        
-        # Parar captura atual
-        was_running = self.is_running
-        if was_running:
-            self.stop_capture()
-            
-        # Fechar câmera atual
-        if self.camera_source:
-            if CameraSource and hasattr(self.camera_source, 'cap'):
-                self.camera_source.cap.release()
-            elif hasattr(self.camera_source, 'release'):
-                self.camera_source.release()
-            
-        # Abrir nova câmera
+    def _open_camera(self, camera_id, job=None):
+        """Abrir e aquecer uma câmera (sem tocar na atual); retorna a fonte ou None."""
         if CameraSource:
-            self.camera_source = CameraSource(camera_id)
-            success = self.camera_source.open()
+            source = CameraSource(camera_id)
+            success = source.open()
         else:
-            self.camera_source = cv2.VideoCapture(camera_id)
-            success = self.camera_source.isOpened()
+            source = cv2.VideoCapture(camera_id)
+            success = source.isOpened()
             
             # Configurar propriedades específicas para câmeras USB
             if success and camera_id >= 2:
                 print(f"   🔧 Configurando câmera USB {camera_id}...")
-                self.camera_source.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                self.camera_source.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                self.camera_source.set(cv2.CAP_PROP_FPS, 15)  # FPS mais baixo para USB
-                self.camera_source.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Buffer mínimo
+                source.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+                source.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+                source.set(cv2.CAP_PROP_FPS, 15)  # FPS mais baixo para USB
+                source.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Buffer mínimo
                 
                 # Descartar alguns frames iniciais para estabilizar
+                if job:
+                    job.update(state='warming')
                 for i in range(3):
-                    ret, _ = self.camera_source.read()
+                    ret, _ = source.read()
                     if ret:
                         break
-                    import time
                     time.sleep(0.1)
+        
+        if not success:
+            self._release_source(source)
+            return None
+        return source
+    
+    def _release_source(self, source):
+        """Liberar uma fonte de câmera (CameraSource ou cv2.VideoCapture)."""
+        try:
+            if CameraSource and hasattr(source, 'cap'):
+                source.cap.release()
+            elif hasattr(source, 'release'):
+                source.release()
+        except Exception as e:
+            print(f"⚠️ Erro ao liberar câmera: {e}")
+    
+    def _swap_pending_camera(self, release_old=True):
+        """
+        Trocar pela câmera pendente (chamado entre frames pelo capture_loop).
+        release_old=False: a fonte antiga fica para o capture_loop liberar na
+        próxima fronteira de frame (ele pode estar dentro de um read() nela).
+        """
+        with self._camera_lock:
+            pending = self._pending_camera
+            self._pending_camera = None
+            if pending is not None:
+                camera_id, source, swapped = pending
+                old_source, self.camera_source = self.camera_source, source
+                self.current_camera = camera_id
+                if old_source is not None and old_source is not source:
+                    self._retired_sources.append(old_source)
+            retired = []
+            if release_old:
+                retired, self._retired_sources = self._retired_sources, []
+        if pending is not None:
+            swapped.set()
+        for old_source in retired:
+            self._release_source(old_source)
+    
+    def switch_camera(self, camera_id, job=None):
+        """
+        Trocar para uma câmera diferente. A nova é aberta e aquecida enquanto a
+        atual continua transmitindo; a troca acontece entre dois frames.
+        """
+        if camera_id not in self.available_cameras:
+            return False
+        
+        with self._switch_lock:  # Uma troca por vez
+            if camera_id == self.current_camera and self.camera_source is not None:
+                return True
             
-        if success:
-            self.current_camera = camera_id
+            print(f"📹 Trocando para câmera {camera_id}...")
+            if job:
+                job.update(state='opening')
+            source = self._open_camera(camera_id, job)
+            if source is None:
+                print(f"❌ Falha ao abrir câmera {camera_id}")
+                return False
+            
+            if job:
+                job.update(state='swapping')
+            swapped = threading.Event()
+            with self._camera_lock:
+                self._pending_camera = (camera_id, source, swapped)
+            # Com captura ativa, o capture_loop troca na fronteira do frame
+            capture_alive = self.is_running and getattr(self, 'capture_thread', None) is not None \
+                and self.capture_thread.is_alive()
+            if not capture_alive:
+                self._swap_pending_camera()
+            elif not swapped.wait(timeout=self.switch_timeout):
+                # capture_loop preso em um read(): trocar já, mas a câmera antiga
+                # só é liberada por ele, depois que o read() em andamento voltar
+                self._swap_pending_camera(release_old=False)
             
-            # Reiniciar captura se estava rodando
-            if was_running:
-                self.start_capture()
-                
             print(f"✅ Câmera {camera_id} ativada!")
             return True
-        else:
-            print(f"❌ Falha ao abrir câmera {camera_id}")
-            return False
+    
+    def start_camera_switch(self, camera_id):
+        """
+        Iniciar a troca de câmera em segundo plano; retorna o job (dict com
+        id, camera e state: pending, opening, warming, swapping, done, failed).
+        """
+        job = {'id': next(self._job_ids), 'camera': camera_id, 'state': 'pending'}
+        with self._camera_lock:
+            self.switch_jobs[job['id']] = job
+            # Histórico curto: só os jobs mais recentes
+            for old_id in list(self.switch_jobs)[:-SWITCH_JOB_HISTORY]:
+                del self.switch_jobs[old_id]
+        
+        def run():
+            try:
+                success = self.switch_camera(camera_id, job)
+                job.update(state='done' if success else 'failed')
+                if not success:
+                    job['error'] = f'Falha ao trocar para câmera {camera_id}'
+            except Exception as e:
+                job.update(state='failed', error=str(e))
+        
+        threading.Thread(target=run, daemon=True, name=f"camera-switch-{job['id']}").start()
+        return job
+    
+    def latest_switch_job(self):
+        with self._camera_lock:
+            return next(reversed(self.switch_jobs.values()), None)
         
     def _simple_analysis_fallback(self, depth_normalized):
         """Análise simples 3x3 como fallback."""
@@ -329,27 +642,105 @@ class TOFcamWebViewer:
             
         return strategic_direction, reactive_direction
 
-    def process_frame(self):
-        """Processar um frame e gerar dados."""
+    def depth_source_weights(self):
+        """
+        Fontes de profundidade necessárias para o modo e pesos atuais: [(fonte, peso)].
+        fonte: "gradient" (Sobel) ou "primary" (MiDaS, ou luminosidade se indisponível).
+        Fontes com peso zero ficam de fora e não são calculadas.
+        """
+        if self.depth_mode == "midas":
+            return [("primary", 1.0)]
+        if self.depth_mode == "hybrid":
+            # Normalizar pesos
+            total_weight = self.midas_weight + self.gradient_weight
+            if total_weight > 0:
+                weight_primary = self.midas_weight / total_weight
+                weight_gradient = self.gradient_weight / total_weight
+            else:
+                weight_primary = 0.5
+                weight_gradient = 0.5
+            return [(source, weight) for source, weight in
+                    (("primary", weight_primary), ("gradient", weight_gradient)) if weight > 0]
+        return [("gradient", 1.0)]  # "gradient" e fallback
+
+    @staticmethod
+    def _gradient_depth(gray, lease=None):
+        """Depth map por gradiente Sobel (bordas = próximo), em float32 (buffers do lease, se houver)."""
+        buffer = (lambda: lease.acquire(gray.shape, np.float32)) if lease is not None else (lambda: None)
+        grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=buffer(), ksize=3)
+        grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=buffer(), ksize=3)
+        gradient = cv2.magnitude(grad_x, grad_y, magnitude=buffer())
+        max_gradient = cv2.minMaxLoc(gradient)[1]
+        # 1 - gradiente normalizado, in-place
+        gradient *= np.float32(-1.0 / (max_gradient + 1e-8))
+        gradient += np.float32(1.0)
+        return gradient
+
+    def _primary_depth(self, frame, gray, lease=None):
+        """MiDaS real se disponível; senão luminosidade (áreas escuras = próximas, como MiDaS)."""
+        if self.depth_estimator:
+            try:
+                depth_midas = self.depth_estimator.estimate_depth(frame)
+                depth_midas = depth_midas.astype(np.float32)
+                if depth_midas.max() > 1.0:
+                    depth_midas /= depth_midas.max()
+                return depth_midas
+            except Exception as e:
+                print(f"⚠️ Erro no MiDaS: {e}")
+        
+        if lease is None:
+            blurred = cv2.GaussianBlur(gray, (9, 9), 0)
+            return (255 - blurred).astype(np.float32) / 255.0
+        blurred = cv2.GaussianBlur(gray, (9, 9), 0, dst=lease.acquire(gray.shape))
+        depth = np.subtract(np.float32(255), blurred, out=lease.acquire(gray.shape, np.float32))
+        depth /= np.float32(255.0)
+        return depth
+
+    def process_frame(self, render=True, lease=None):
+        """
+        Processar um frame e gerar dados.
+        render=False: só profundidade e navegação, sem montar a visualização
+        (result sem 'combined'), quando ninguém está assistindo.
+        lease: FrameLease que recebe os buffers do frame (depth_map incluso);
+        quem chama devolve quando terminar de usar o result. Sem lease, os
+        buffers voltam ao pool aqui e o depth_map do result é uma cópia.
+        """
         if not self.camera_source:
             return None
-            
-        # Inicializar variáveis que serão usadas ao longo da função
-        depth_color = None
-        frame = None
-            
+        
+        if lease is not None:
+            return self._process_frame(render, lease)
+        with self.buffers.lease("frame") as own_lease:
+            result = self._process_frame(render, own_lease)
+            if result is not None:
+                result['depth_map'] = result['depth_map'].copy()
+            return result
+    
+    def _read_frame(self, lease):
+        """Um frame da câmera; cv2.VideoCapture escreve direto em um buffer do pool."""
+        if CameraSource and hasattr(self.camera_source, 'read'):
+            return self.camera_source.read()
+        if isinstance(self.camera_source, cv2.VideoCapture) and self._capture_shape is not None:
+            buffer = lease.acquire(self._capture_shape)
+            ret, frame = self.camera_source.read(buffer)
+            if ret and frame is not None and frame is not buffer:
+                lease.adopt(frame)  # Resolução mudou: o cv2 alocou outro array
+        else:
+            ret, frame = self.camera_source.read()
+        if not ret:
+            return None
+        if frame is not None:
+            self._capture_shape = frame.shape
+        return frame
+    
+    def _process_frame(self, render, lease):
         # Ler frame com múltiplas tentativas para câmeras USB problemáticas
         frame = None
         max_attempts = 3
         
         for attempt in range(max_attempts):
             try:
-                if CameraSource and hasattr(self.camera_source, 'read'):
-                    frame = self.camera_source.read()
-                else:
-                    ret, frame = self.camera_source.read()
-                    if not ret:
-                        frame = None
+                frame = self._read_frame(lease)
                 
                 # Se conseguiu um frame válido, usar
                 if frame is not None and frame.size > 0:
@@ -366,160 +757,36 @@ class TOFcamWebViewer:
             print("⚠️ Nenhum frame capturado")
             return None
             
-        # Redimensionar para tamanho padrão
-        frame = cv2.resize(frame, (640, 480))
+        # Redimensionar para tamanho padrão (frames já em 640x480 seguem sem cópia)
+        if frame.shape[:2] != (480, 640):
+            frame = cv2.resize(frame, (640, 480), dst=lease.acquire((480, 640) + frame.shape[2:], frame.dtype))
         
         # Análise de profundidade com técnica híbrida configurável
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=lease.acquire((480, 640)))
         try:
-            # Sempre gerar múltiplos depth maps para permitir mistura visual
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # 1. Depth map por gradiente Sobel (bordas)
-            grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            gradient = np.sqrt(grad_x**2 + grad_y**2)
-            gradient = gradient / (gradient.max() + 1e-8)
-            depth_gradient = 1.0 - gradient  # Bordas = próximo
-            
-            # 2. Depth map por luminosidade (simulação MiDaS quando não disponível)
-            # Áreas mais escuras = mais próximas (como MiDaS)
-            blurred = cv2.GaussianBlur(gray, (9, 9), 0)
-            depth_luminosity = (255 - blurred).astype(np.float32) / 255.0
-            
-            # 3. Usar MiDaS real se disponível
-            depth_midas = None
-            if self.depth_estimator:
-                try:
-                    depth_midas = self.depth_estimator.estimate_depth(frame)
-                    depth_midas = depth_midas.astype(np.float32)
-                    if depth_midas.max() > 1.0:
-                        depth_midas = depth_midas / depth_midas.max()
-                except Exception as e:
-                    print(f"⚠️ Erro no MiDaS: {e}")
-                    depth_midas = None
-            
-            # Combinar depth maps conforme modo e pesos
-            if self.depth_mode == "gradient":
-                depth_map = depth_gradient
-            elif self.depth_mode == "midas":
-                depth_map = depth_midas if depth_midas is not None else depth_luminosity
-            elif self.depth_mode == "hybrid":
-                # Usar MiDaS real se disponível, senão usar luminosidade como substituto
-                primary_depth = depth_midas if depth_midas is not None else depth_luminosity
-                
-                # Normalizar pesos
-                total_weight = self.midas_weight + self.gradient_weight
-                if total_weight > 0:
-                    weight_primary = self.midas_weight / total_weight
-                    weight_gradient = self.gradient_weight / total_weight
+            # Só as fontes que o modo/pesos atuais usam são calculadas; pesos e soma in-place
+            depth_map = None
+            for source, weight in self.depth_source_weights():
+                if source == "gradient":
+                    depth = self._gradient_depth(gray, lease)
                 else:
-                    weight_primary = 0.5
-                    weight_gradient = 0.5
-                
-                # Combinar com pesos visíveis
-                depth_map = (primary_depth * weight_primary + 
-                           depth_gradient * weight_gradient)
-            else:
-                depth_map = depth_gradient  # Fallback
-                
-                depth_normalized = depth_map
-                
-                # Aplicar mapeamento de cores personalizado com maior contraste
-                def enhanced_depth_colormap(depth_array):
-                    """Mapear profundidade para cores com maior variação de contraste."""
-                    # Normalizar corretamente para garantir uso completo da escala
-                    depth_min = np.min(depth_array)
-                    depth_max = np.max(depth_array)
-                    
-                    # Evitar divisão por zero
-                    if depth_max > depth_min:
-                        # Normalizar para 0-1 usando min/max reais da imagem
-                        depth_norm = (depth_array - depth_min) / (depth_max - depth_min)
-                    else:
-                        depth_norm = depth_array
-                    
-                    # Inverter para que maior distância = valor mais alto = cor mais distante (preto)
-                    # MiDaS: valores altos = longe, valores baixos = perto
-                    # Nossa escala: 0 = perto (vermelho), 1 = longe (preto)
-                    depth_norm = 1.0 - depth_norm
-                    
-                    # Expandir contraste com mapeamento não-linear para melhor distribuição
-                    contrast_factor = 1.8  # Fator ajustado para melhor distribuição
-                    depth_enhanced = np.power(depth_norm, 1.0 / contrast_factor)
-                    
-                    # Mapear para esquema de cores INTUITIVO: Vermelho->Amarelo->Verde->Preto
-                    # 0.0 -> Vermelho intenso (255, 0, 0) - PERIGO/MUITO PRÓXIMO
-                    # 0.25 -> Vermelho-laranja (255, 128, 0) - ATENÇÃO/PRÓXIMO  
-                    # 0.5 -> Amarelo (255, 255, 0) - CUIDADO/MÉDIO
-                    # 0.75 -> Verde (0, 255, 0) - SEGURO/LONGE
-                    # 1.0 -> Preto (0, 0, 0) - MUITO LONGE/IRRELEVANTE
-                    
-                    height, width = depth_enhanced.shape
-                    colored = np.zeros((height, width, 3), dtype=np.uint8)
-                    
-                    for i in range(height):
-                        for j in range(width):
-                            val = depth_enhanced[i, j]
-                            
-                            if val <= 0.25:  # Vermelho intenso -> Vermelho-laranja (PERIGO)
-                                ratio = val / 0.25
-                                colored[i, j] = [
-                                    255,                     # R: mantém vermelho máximo
-                                    int(128 * ratio),        # G: 0->128 (adiciona laranja)
-                                    0                        # B: mantém 0
-                                ]
-                            elif val <= 0.5:  # Vermelho-laranja -> Amarelo (ATENÇÃO)
-                                ratio = (val - 0.25) / 0.25
-                                colored[i, j] = [
-                                    255,                     # R: mantém 255
-                                    int(128 + 127 * ratio),  # G: 128->255 (completa amarelo)
-                                    0                        # B: mantém 0
-                                ]
-                            elif val <= 0.75:  # Amarelo -> Verde (CUIDADO -> SEGURO)
-                                ratio = (val - 0.5) / 0.25
-                                colored[i, j] = [
-                                    int(255 - 255 * ratio),  # R: 255->0 (remove vermelho)
-                                    255,                     # G: mantém verde máximo
-                                    0                        # B: mantém 0
-                                ]
-                            else:  # Verde -> Preto (LONGE -> IRRELEVANTE)
-                                ratio = (val - 0.75) / 0.25
-                                colored[i, j] = [
-                                    0,                       # R: mantém 0
-                                    int(255 - 255 * ratio),  # G: 255->0 (escurece)
-                                    0                        # B: mantém 0
-                                ]
-                    
-                    return colored
-                
-                # Usar mapeamento personalizado ou fallback intuitivo
-                try:
-                    depth_color = enhanced_depth_colormap(depth_map)
-                except Exception as e:
-                    print(f"⚠️ Erro no mapeamento personalizado: {e}, usando fallback intuitivo")
-                    # Fallback com esquema vermelho->verde
-                    depth_normalized = (depth_map - np.min(depth_map)) / (np.max(depth_map) - np.min(depth_map) + 1e-8)
-                    depth_inverted = 1.0 - depth_normalized  # Inverter: 0=longe, 1=perto
-                    depth_color = cv2.applyColorMap((depth_inverted * 255).astype(np.uint8), cv2.COLORMAP_HOT)
-                    
+                    depth = self._primary_depth(frame, gray, lease)
+                if weight != 1.0:
+                    depth *= np.float32(weight)
+                if depth_map is None:
+                    depth_map = depth
+                else:
+                    depth_map += depth
+            
         except Exception as e:
             print(f"⚠️ Erro no processamento de profundidade: {e}")
             # Fallback para análise simples
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
             depth_map = (255 - blurred).astype(np.float32) / 255.0
-            depth_normalized = depth_map
-            # Usar esquema intuitivo também no fallback
-            depth_inverted = 1.0 - depth_normalized  # Inverter para vermelho=próximo
-            depth_color = cv2.applyColorMap((depth_inverted * 255).astype(np.uint8), cv2.COLORMAP_HOT)
-        
-        # Garantir que depth_color esteja sempre definido
-        if depth_color is None:
-            depth_inverted = 1.0 - depth_map  # Inverter para vermelho=próximo
-            depth_color = cv2.applyColorMap((depth_inverted * 255).astype(np.uint8), cv2.COLORMAP_HOT)
         
         # Processar algoritmos de navegação com análise sofisticada (igual ao main_analyzer)
         depth_normalized = depth_map
+        strategic_grid = reactive_grid = None
         
         # Usar ZoneMappers completos se disponíveis
         if hasattr(self, 'strategic_mapper') and self.strategic_mapper and hasattr(self, 'reactive_mapper') and self.reactive_mapper:
@@ -548,13 +815,50 @@ class TOFcamWebViewer:
         else:
             # Fallback para análise simples 3x3
             strategic_direction, reactive_direction = self._simple_analysis_fallback(depth_normalized)
-        # Redimensionar imagens para 320x240 para melhor performance
-        small_frame = cv2.resize(frame, (320, 240))
-        small_depth = cv2.resize(depth_color, (320, 240))
+        result = {
+            'strategic': float(strategic_direction),
+            'reactive': float(reactive_direction),
+            'timestamp': time.time(),
+            'overlay': self.overlay_mode,
+            'depth_map': depth_map,
+            'zone_grids': {'strategic': strategic_grid, 'reactive': reactive_grid},
+            'zone_analysis': {
+                'strategic_grid': f"{strategic_grid.grid_h}x{strategic_grid.grid_w}" if strategic_grid is not None else "N/A",
+                'reactive_grid': f"{reactive_grid.grid_h}x{reactive_grid.grid_w}" if reactive_grid is not None else "N/A"
+            }  # Para debug
+        }
+        if not render:
+            return result
+        
+        # Grade 2x2 montada direto no canvas preallocado (reutilizado a cada frame);
+        # no modo client só a linha de cima (original | depth)
+        client_overlay = self.overlay_mode == "client"
+        combined = self._panels if client_overlay else self._canvas
+        result['combined'] = combined
+        small_frame = combined[:240, :320]
+        small_depth = combined[:240, 320:]
+        
+        # Reduzir para o tamanho do painel antes do colormap (4x menos pixels)
+        cv2.resize(frame, (320, 240), dst=small_frame, interpolation=cv2.INTER_AREA)
+        small_depth_map = cv2.resize(depth_map, (320, 240), dst=lease.acquire((240, 320), np.float32),
+                                     interpolation=cv2.INTER_AREA)
+        # Esquema de cores INTUITIVO (Vermelho->Amarelo->Verde->Preto) por lookup table
+        DEPTH_COLORMAP.apply(small_depth_map, out=small_depth, pool=self.buffers)
         
-        # Criar versões com setas de direção
-        strategic_vis = small_depth.copy()
-        reactive_vis = small_depth.copy()
+        if client_overlay:
+            # Registro compacto das grades para o navegador desenhar
+            result['grids'] = {}
+            if strategic_grid is not None:
+                result['grids']['strategic'] = zone_grid_record(strategic_grid, self.strategic_mapper.roi)
+            if reactive_grid is not None:
+                result['grids']['reactive'] = zone_grid_record(reactive_grid, self.reactive_mapper.roi)
+            return result
+        
+        # Painéis com setas de direção
+        strategic_vis = combined[240:, :320]
+        reactive_vis = combined[240:, 320:]
+        strategic_vis[:] = small_depth
+        reactive_vis[:] = small_depth
         
         # Desenhar setas indicando direção
         center_x, center_y = 160, 120
@@ -572,109 +876,105 @@ class TOFcamWebViewer:
         end_y = int(center_y - arrow_length * np.cos(np.radians(reactive_angle)))
         cv2.arrowedLine(reactive_vis, (center_x, center_y), (end_x, end_y), (255, 0, 255), 3, tipLength=0.3)
         
-        # Combinar em grade 2x2
-        top_row = np.hstack([small_frame, small_depth])
-        bottom_row = np.hstack([strategic_vis, reactive_vis])
-        combined = np.vstack([top_row, bottom_row])
+        # Labels com contraste automático (sprites em cache, um cv2.copyTo cada)
+        overlay = self.overlay
+        overlay.draw(combined, 'original', "ORIGINAL", (10, 20))
+        overlay.draw(combined, 'depth', "DEPTH MAP", (330, 20))
+        overlay.draw(combined, 'strategic', f"STRATEGIC: {strategic_direction:+.2f}", (10, 260))
+        overlay.draw(combined, 'reactive', f"REACTIVE: {reactive_direction:+.2f}", (330, 260))
         
-        # Adicionar labels com contraste automático
-        def add_text_with_contrast(img, text, position, font=cv2.FONT_HERSHEY_SIMPLEX, scale=0.5, thickness=1):
-            """Adicionar texto com contraste automático baseado no fundo."""
-            x, y = position
-            
-            # Verificar se a posição está dentro da imagem
-            if x >= 0 and y >= 0 and x < img.shape[1] and y < img.shape[0]:
-                # Calcular cor média da região do texto (área aproximada)
-                text_width = len(text) * 10 * scale  # Estimativa da largura do texto
-                text_height = 20 * scale  # Estimativa da altura do texto
-                
-                # Definir região para análise (com limites seguros)
-                x1 = max(0, int(x - 5))
-                y1 = max(0, int(y - text_height))
-                x2 = min(img.shape[1], int(x + text_width + 5))
-                y2 = min(img.shape[0], int(y + 5))
-                
-                if x2 > x1 and y2 > y1:
-                    # Calcular luminosidade média da região
-                    region = img[y1:y2, x1:x2]
-                    if len(region.shape) == 3:
-                        # Converter para escala de cinza se colorido
-                        gray_region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
-                    else:
-                        gray_region = region
-                    
-                    avg_brightness = np.mean(gray_region)
-                    
-                    # Escolher cor do texto baseada na luminosidade
-                    if avg_brightness < 128:  # Fundo escuro
-                        text_color = (255, 255, 255)  # Texto branco
-                        shadow_color = (0, 0, 0)      # Sombra preta
-                    else:  # Fundo claro
-                        text_color = (0, 0, 0)        # Texto preto
-                        shadow_color = (255, 255, 255) # Sombra branca
-                    
-                    # Adicionar sombra para maior contraste
-                    cv2.putText(img, text, (x + 1, y + 1), font, scale, shadow_color, thickness + 1)
-                    # Adicionar texto principal
-                    cv2.putText(img, text, (x, y), font, scale, text_color, thickness)
-                else:
-                    # Fallback para texto branco se não conseguir analisar
-                    cv2.putText(img, text, (x, y), font, scale, (255, 255, 255), thickness)
-            else:
-                # Fallback para texto branco se posição inválida
-                cv2.putText(img, text, (10, 20), font, scale, (255, 255, 255), thickness)
+        # Informação da câmera e timestamp
+        overlay.draw(combined, 'camera', f"Camera {self.current_camera}", (10, 290), scale=0.4)
+        overlay.draw(combined, 'clock', time.strftime("%H:%M:%S"), (10, 310), scale=0.4)
         
-        # Adicionar labels com contraste inteligente
-        add_text_with_contrast(combined, "ORIGINAL", (10, 20))
-        add_text_with_contrast(combined, "DEPTH MAP", (330, 20))
-        add_text_with_contrast(combined, f"STRATEGIC: {strategic_direction:+.2f}", (10, 260))
-        add_text_with_contrast(combined, f"REACTIVE: {reactive_direction:+.2f}", (330, 260))
-        
-        # Adicionar informação da câmera e timestamp com contraste automático
-        add_text_with_contrast(combined, f"Camera {self.current_camera}", (10, 290), scale=0.4)
-        add_text_with_contrast(combined, time.strftime("%H:%M:%S"), (10, 310), scale=0.4)
-        
-        return {
-            'combined': combined,
-            'strategic': float(strategic_direction),
-            'reactive': float(reactive_direction),
-            'timestamp': time.time(),
-            'zone_analysis': {
-                'strategic_grid': f"{strategic_grid.grid_h}x{strategic_grid.grid_w}" if 'strategic_grid' in locals() else "N/A",
-                'reactive_grid': f"{reactive_grid.grid_h}x{reactive_grid.grid_w}" if 'reactive_grid' in locals() else "N/A"
-            }  # Para debug
-        }
+        return result
     
+    def add_navigation_consumer(self, callback):
+        """
+        Registrar callback(data) chamado a cada frame com os dados de navegação
+        (mesmo dict publicado em /data). Com consumidores o pipeline roda na
+        taxa normal mesmo sem viewers.
+        """
+        self._navigation_consumers.append(callback)
+
+    def remove_navigation_consumer(self, callback):
+        if callback in self._navigation_consumers:
+            self._navigation_consumers.remove(callback)
+
+    def update_pipeline_mode(self):
+        """full (há viewers), navigation (só consumidores) ou idle (ninguém)."""
+        if self.hub.has_viewers(self.viewer_timeout):
+            mode = "full"
+        elif self._navigation_consumers:
+            mode = "navigation"
+        else:
+            mode = "idle"
+        if mode != self.pipeline_mode:
+            print(f"🔋 Pipeline: {self.pipeline_mode} -> {mode}")
+            self.pipeline_mode = mode
+        return mode
+
     def capture_loop(self):
-        """Loop de captura contínua."""
+        """Loop de captura contínua (taxa e trabalho conforme a demanda)."""
         frame_count = 0
         while self.is_running:
             try:
-                result = self.process_frame()
+                self._swap_pending_camera()
+                mode = self.update_pipeline_mode()
+                render = mode == "full"
+                # Buffers do frame: com render ficam com o FrameArrays até o próximo publish
+                lease = self.buffers.lease("frame")
+                try:
+                    result = self.process_frame(render=render, lease=lease)
+                except Exception:
+                    lease.release()
+                    raise
                 if result:
-                    # Converter para base64 com menor qualidade
-                    _, buffer = cv2.imencode('.jpg', result['combined'], [cv2.IMWRITE_JPEG_QUALITY, 60])
-                    img_base64 = base64.b64encode(buffer).decode('utf-8')
-                    
-                    self.current_frame = img_base64
-                    self.current_data = {
+                    data = {
                         'strategic': float(result['strategic']),
                         'reactive': float(result['reactive']),
                         'frame_count': frame_count,
                         'timestamp': result['timestamp'],
-                        'camera': self.current_camera
+                        'camera': self.current_camera,
+                        'overlay': result['overlay']
                     }
+                    if 'grids' in result:
+                        data['grids'] = result['grids']
+                    
+                    if render:
+                        # Codificar JPEG com menor qualidade (bytes imutáveis, base64 só sob demanda);
+                        # o frame_id é definido pelo hub ao publicar
+                        encoded = EncodedFrame.encode(
+                            result['combined'], quality=60, timestamp=result['timestamp']
+                        )
+                        # Arrays crus para /grid/* e /depth.bin (serializados sob demanda)
+                        grids = {name: grid for name, grid in result['zone_grids'].items() if grid is not None}
+                        self.hub.publish(encoded, data, FrameArrays(result['depth_map'], grids, lease))
+                    else:
+                        lease.release()
+                    
+                    for consumer in list(self._navigation_consumers):
+                        try:
+                            consumer(data)
+                        except Exception as e:
+                            print(f"⚠️ Erro no consumidor de navegação: {e}")
                     
                     frame_count += 1
                     if frame_count % 30 == 0:  # Debug a cada 30 frames
                         strategic_val = result['strategic']
                         reactive_val = result['reactive']
                         print(f"📊 Frame {frame_count} - Strategic: {strategic_val:+.2f}, Reactive: {reactive_val:+.2f}")
-                        print(f"    Imagem: {len(img_base64)} bytes, Câmera: {self.current_camera}")
+                        if render:
+                            print(f"    Imagem: {len(encoded)} bytes, Câmera: {self.current_camera}")
                 else:
+                    lease.release()
                     print("⚠️  Nenhum frame capturado")
-                    
-                time.sleep(0.1)  # ~10 FPS
+                
+                if mode == "idle":
+                    # Acorda no mesmo instante em que um cliente conecta
+                    self.hub.wait_for_demand(self.idle_interval)
+                else:
+                    time.sleep(self.frame_interval)  # ~10 FPS
                 
             except KeyboardInterrupt:
                 print("\n⏹️  Interrompendo captura...")
@@ -685,9 +985,30 @@ class TOFcamWebViewer:
                 traceback.print_exc()
                 time.sleep(1)
     
+    @property
+    def current_frame(self):
+        """EncodedFrame mais recente (ou None)."""
+        return self.hub.frame
+
+    @property
+    def current_data(self):
+        return self.hub.data
+
+    def wait_for_frame(self, last_frame_id, timeout=1.0):
+        """
+        Aguardar um frame mais novo que last_frame_id.
+        Retorna (frame_id, EncodedFrame) ou (last_frame_id, None) no timeout.
+        """
+        frame_id, frame, _ = self.hub.wait(last_frame_id, timeout)
+        return frame_id, frame
+
     def start_capture(self):
         """Iniciar captura em thread separada."""
         self.is_running = True
+        self.hub.open()
+        # Hot-plug só faz sentido depois de uma descoberta com dispositivos reais
+        if self.discovery.last_fingerprint is not None:
+            self.discovery.start_rescan(self._on_cameras_changed, self.rescan_interval)
         self.capture_thread = threading.Thread(target=self.capture_loop)
         self.capture_thread.daemon = True
         self.capture_thread.start()
@@ -696,10 +1017,19 @@ class TOFcamWebViewer:
         """Parar captura e liberar recursos."""
         print("⏹️  Parando captura...")
         self.is_running = False
+        self.hub.close()  # Liberar clientes MJPEG
+        self.discovery.stop_rescan()
         
         # Aguardar thread terminar
         if hasattr(self, 'capture_thread') and self.capture_thread.is_alive():
             self.capture_thread.join(timeout=2)
+        
+        # Câmeras trocadas que o capture_loop não chegou a liberar
+        if not (hasattr(self, 'capture_thread') and self.capture_thread.is_alive()):
+            with self._camera_lock:
+                retired, self._retired_sources = self._retired_sources, []
+            for source in retired:
+                self._release_source(source)
             
         # Fechar câmera se aberta
         if hasattr(self, 'camera_source') and self.camera_source:
@@ -711,574 +1041,250 @@ class TOFcamWebViewer:
                 
         print("✅ Captura parada")
 
+def zone_grid_record(grid, roi):
+    """
+    Grade de zonas em JSON compacto para o overlay no navegador:
+    estados (CellState) em uma string por linhas, ROI em frações do frame.
+    """
+    return {
+        'rows': int(grid.grid_h),
+        'cols': int(grid.grid_w),
+        'roi': [float(v) for v in roi],
+        'states': (grid.state.ravel() + ord('0')).tobytes().decode('ascii'),
+    }
+
 # Instância global
 tofcam_viewer = TOFcamWebViewer()
 
+# Lógica das rotas, independente do backend HTTP (threads ou asyncio)
+
+def data_payload(viewer, path):
+    """Corpo JSON de /data (/data?image=1 inclui o frame como data URI)."""
+    hub = viewer.hub
+    query = parse_qs(urlparse(path).query)
+    if query.get('image', ['0'])[0] not in ('', '0') and hub.frame is not None:
+        # base64 gerado sob demanda e cacheado no próprio frame
+        _, frame, data = hub.latest()
+        data = dict(data, image=frame.data_uri, image_frame_id=frame.frame_id)
+        return json.dumps(data).encode('utf-8')
+    # JSON já serializado pelo hub
+    return hub.data_json
+
+# Rotas binárias: path -> payload do FrameArrays do frame mais recente
+BINARY_ROUTES = {
+    '/grid/strategic': lambda arrays, query: arrays.grid('strategic'),
+    '/grid/reactive': lambda arrays, query: arrays.grid('reactive'),
+    '/depth.bin': lambda arrays, query: arrays.depth(
+        DEPTH_UINT16 if query.get('dtype', [''])[0] == 'uint16' else DEPTH_FLOAT16
+    ),
+}
+
+def binary_payload(viewer, path):
+    """
+    Corpo de um endpoint binário: (status, payload, etag).
+    /depth.bin?dtype=uint16 quantiza o depth em 16 bits (padrão: float16).
+    """
+    url = urlparse(path)
+    route = BINARY_ROUTES.get(url.path)
+    if route is None:
+        return 404, None, None
+    for _ in range(2):
+        frame_id, arrays = viewer.hub.latest_arrays()
+        if arrays is None:
+            return 503, None, None
+        payload = route(arrays, parse_qs(url.query))
+        # Frame substituído entre a leitura e a serialização: usar o novo
+        if payload is not None or not arrays.retired:
+            break
+    if payload is None:
+        return 503, None, None  # Frame sem essa grade (análise simples)
+    return 200, payload, viewer.hub.etag(frame_id)
+
+def cameras_payload(viewer):
+    """Corpo JSON de /cameras (a câmera alvo da última troca traz o progresso em 'switch')."""
+    job = viewer.latest_switch_job()
+    cameras_data = []
+    for cam_id in viewer.available_cameras:
+        camera = {
+            'id': cam_id,
+            'active': cam_id == viewer.current_camera
+        }
+        if job and job['camera'] == cam_id:
+            camera['switch'] = dict(job)
+        cameras_data.append(camera)
+    return json.dumps(cameras_data).encode('utf-8')
+
+def switch_camera_action(viewer, data):
+    """Lidar com troca de câmera: responde na hora com o job; progresso em /cameras."""
+    camera_id = data.get('camera_id')
+    if camera_id not in viewer.available_cameras:
+        return {'success': False, 'error': f'Câmera {camera_id} não disponível'}
+    
+    job = viewer.start_camera_switch(camera_id)
+    return {'success': True, 'job': job['id'], 'state': job['state']}
+
+def depth_mode_action(viewer, data):
+    """Lidar com mudança de modo de profundidade."""
+    mode = data.get('mode', 'hybrid')
+    
+    if mode in ['midas', 'gradient', 'hybrid']:
+        viewer.depth_mode = mode
+        success = True
+        print(f"🎯 Modo de profundidade alterado para: {mode}")
+    else:
+        success = False
+    
+    return {'success': success, 'mode': viewer.depth_mode}
+
+def overlay_mode_action(viewer, data):
+    """Lidar com mudança de modo de overlay (setas/labels no servidor ou no navegador)."""
+    mode = data.get('mode', 'server')
+    success = mode in ('server', 'client')
+    if success:
+        viewer.overlay_mode = mode
+        print(f"🖌️ Overlay desenhado no: {'navegador' if mode == 'client' else 'servidor'}")
+    
+    return {'success': success, 'mode': viewer.overlay_mode}
+
+def depth_weights_action(viewer, data):
+    """Lidar com mudança de pesos de profundidade."""
+    midas_weight = float(data.get('midas_weight', 0.87))
+    gradient_weight = float(data.get('gradient_weight', 0.29))
+    
+    # Validar pesos (0.0 a 1.0)
+    midas_weight = max(0.0, min(1.0, midas_weight))
+    gradient_weight = max(0.0, min(1.0, gradient_weight))
+    
+    viewer.midas_weight = midas_weight
+    viewer.gradient_weight = gradient_weight
+    
+    print(f"⚖️ Pesos alterados - MiDaS: {midas_weight:.2f}, Gradiente: {gradient_weight:.2f}")
+    
+    return {
+        'success': True, 
+        'midas_weight': midas_weight,
+        'gradient_weight': gradient_weight
+    }
+
+# Rotas POST: path -> ação(viewer, dados JSON) -> resposta JSON
+POST_ACTIONS = {
+    '/switch_camera': switch_camera_action,
+    '/depth_mode': depth_mode_action,
+    '/depth_weights': depth_weights_action,
+    '/overlay_mode': overlay_mode_action,
+}
+
+# Boundary das partes do stream MJPEG
+MJPEG_BOUNDARY = 'tofcamframe'
+
+def mjpeg_part(frame):
+    """Cabeçalho + JPEG de uma parte do stream multipart/x-mixed-replace."""
+    return (
+        f'--{MJPEG_BOUNDARY}\r\n'
+        f'Content-Type: image/jpeg\r\n'
+        f'Content-Length: {len(frame)}\r\n\r\n'.encode('ascii')
+        + frame.jpeg + b'\r\n'
+    )
+
+def sse_event(frame_id, data_json):
+    """Mensagem SSE com o JSON de um frame."""
+    return b'id: %d\ndata: %s\n\n' % (frame_id, data_json)
+
+# Comentário SSE enviado sem frames novos, para detectar clientes desconectados
+SSE_KEEPALIVE = 15.0
+
+# Página, CSS e JS (tofcam/static) carregados uma vez, crus e gzip
+STATIC_ASSETS = StaticAssets()
+
 class TOFcamRequestHandler(BaseHTTPRequestHandler):
     """Handler para requisições HTTP."""
     
+    # Conexões persistentes: todas as respostas levam Content-Length,
+    # exceto os streams, que fecham a conexão ao terminar
+    protocol_version = 'HTTP/1.1'
+    
+    def send_body(self, status, content_type, body, headers=()):
+        """Enviar resposta completa com Content-Length."""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
+    def start_stream(self, content_type, cache_control='no-cache'):
+        """Iniciar resposta de tamanho indefinido (MJPEG/SSE): conexão fecha no fim."""
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+    
     def do_GET(self):
-        if self.path == '/':
-            self.serve_html()
+        tofcam_viewer.hub.touch()
+        asset = STATIC_ASSETS.get(self.path)
+        if asset is not None:
+            self.serve_asset(asset)
+        elif self.path == '/mjpeg':
+            self.serve_mjpeg()
         elif self.path.startswith('/stream'):  # Aceitar /stream com query string
             self.serve_stream()
-        elif self.path == '/data':
+        elif self.path == '/events':
+            self.serve_events()
+        elif self.path == '/data' or self.path.startswith('/data?'):
             self.serve_data()
         elif self.path == '/cameras':
             self.serve_cameras()
+        elif urlparse(self.path).path in BINARY_ROUTES:
+            self.serve_binary()
         else:
             print(f"❌ Endpoint não encontrado: {self.path}")
             self.send_error(404)
             
     def do_POST(self):
-        if self.path == '/switch_camera':
-            self.handle_camera_switch()
-        elif self.path == '/depth_mode':
-            self.handle_depth_mode()
-        elif self.path == '/depth_weights':
-            self.handle_depth_weights()
+        tofcam_viewer.hub.touch()
+        action = POST_ACTIONS.get(self.path)
+        if action:
+            self.handle_json_action(action)
         else:
             self.send_error(404)
     
-    def serve_html(self):
-        """Servir página HTML principal."""
-        html_content = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>TOFcam Web Viewer - Interface Completa</title>
-    <meta charset="utf-8">
-    <style>
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            margin: 0; 
-            padding: 20px; 
-            background: linear-gradient(135deg, #0f0f23 0%, #1a1a3a 100%); 
-            color: white; 
-            min-height: 100vh;
-        }
-        .header { 
-            text-align: center; 
-            margin-bottom: 30px;
-            background: rgba(255,255,255,0.05);
-            padding: 20px;
-            border-radius: 15px;
-            backdrop-filter: blur(10px);
-        }
-        .header h1 {
-            font-size: 2.5em;
-            background: linear-gradient(45deg, #00ffff, #ff00ff);
-            background-clip: text;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin: 0;
-        }
-        .subtitle {
-            color: #aaa;
-            font-size: 1.1em;
-            margin-top: 10px;
-        }
-        .container { 
-            display: flex; 
-            flex-direction: row;
-            align-items: flex-start; 
-            max-width: 1400px;
-            margin: 0 auto;
-            gap: 30px;
-        }
-        .left-section {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            flex: 2;
-        }
-        .controls-container {
-            width: 100%;
-            max-width: 800px;
-            display: flex;
-            flex-direction: column;
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        .right-section {
-            display: flex;
-            flex-direction: column;
-            gap: 20px;
-            flex: 1;
-            min-width: 300px;
-        }
-        .camera-controls {
-            padding: 20px;
-            background: rgba(42,42,62,0.8);
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            gap: 15px;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.3);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.1);
-            width: 100%;
-            box-sizing: border-box;
-        }
-        .camera-controls label {
-            font-weight: bold;
-            color: #00ffff;
-        }
-        .camera-controls select {
-            padding: 8px 15px;
-            background: rgba(26,26,46,0.9);
-            color: white;
-            border: 2px solid #444;
-            border-radius: 8px;
-            font-size: 14px;
-            cursor: pointer;
-            transition: border-color 0.3s ease;
-        }
-        .camera-controls select:hover {
-            border-color: #00ffff;
-        }
-        .camera-status {
-            color: #00ff88;
-            font-size: 14px;
-            font-weight: 500;
-        }
-        .depth-controls {
-            padding: 20px;
-            background: rgba(42,42,62,0.8);
-            border-radius: 12px;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.3);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.1);
-            width: 100%;
-            box-sizing: border-box;
-        }
-        .depth-controls label {
-            font-weight: bold;
-            color: #ff00ff;
-            display: block;
-            margin-bottom: 10px;
-        }
-        .depth-controls select {
-            width: 100%;
-            padding: 12px 15px;
-            background: rgba(26,26,46,0.9);
-            color: white;
-            border: 2px solid #444;
-            border-radius: 8px;
-            font-size: 14px;
-            cursor: pointer;
-            transition: border-color 0.3s ease;
-            margin-bottom: 20px;
-        }
-        .depth-controls select:hover {
-            border-color: #ff00ff;
-        }
-        .weight-controls {
-            display: flex;
-            gap: 20px;
-            flex-wrap: wrap;
-        }
-        .weight-group {
-            flex: 1;
-            min-width: 200px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        .weight-group label {
-            color: #aaa;
-            font-size: 14px;
-            margin-bottom: 0;
-            min-width: 80px;
-        }
-        .weight-group input[type="range"] {
-            flex: 1;
-            height: 6px;
-            background: rgba(68,68,68,0.5);
-            border-radius: 3px;
-            appearance: none;
-        }
-        .weight-group input[type="range"]::-webkit-slider-thumb {
-            appearance: none;
-            width: 20px;
-            height: 20px;
-            background: #ff00ff;
-            border-radius: 50%;
-            cursor: pointer;
-            box-shadow: 0 0 10px rgba(255,0,255,0.5);
-        }
-        .weight-group span {
-            color: #ff00ff;
-            font-weight: bold;
-            min-width: 40px;
-        }
-        .video-container { 
-            border: 3px solid #333; 
-            border-radius: 15px; 
-            overflow: hidden; 
-            margin-bottom: 30px; 
-            box-shadow: 0 15px 40px rgba(0,0,0,0.4);
-            position: relative;
-        }
-        .video-container::before {
-            content: '';
-            position: absolute;
-            top: -2px;
-            left: -2px;
-            right: -2px;
-            bottom: -2px;
-            background: linear-gradient(45deg, #00ffff, #ff00ff, #ffff00, #00ffff);
-            border-radius: 17px;
-            z-index: -1;
-            animation: borderGlow 3s linear infinite;
-        }
-        @keyframes borderGlow {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-        .stats { 
-            display: flex;
-            flex-direction: column;
-            gap: 15px;
-            width: 100%;
-        }
-        .stat-box { 
-            background: rgba(42,42,62,0.8); 
-            padding: 20px; 
-            border-radius: 12px; 
-            text-align: center;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.1);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }
-        .stat-box:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 35px rgba(0,0,0,0.3);
-        }
-        .stat-value { 
-            font-size: 28px; 
-            font-weight: bold; 
-            margin-bottom: 10px;
-            text-shadow: 0 2px 4px rgba(0,0,0,0.5);
-        }
-        .stat-label {
-            color: #aaa;
-            font-size: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        .strategic { color: #00ffff; text-shadow: 0 0 10px #00ffff; }
-        .reactive { color: #ff00ff; text-shadow: 0 0 10px #ff00ff; }
-        .positive { color: #00ff88; }
-        .negative { color: #ff6666; }
-        .neutral { color: #ffff00; }
-        .frame-info { color: #88ccff; }
-        
-        #videoStream { 
-            max-width: 100%; 
-            height: auto;
-            display: block;
-        }
-        
-        .loading {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        
-        .spinner {
-            width: 20px;
-            height: 20px;
-            border: 2px solid #444;
-            border-top: 2px solid #00ffff;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .algorithm-detail {
-            font-size: 12px;
-            color: #999;
-            margin-top: 8px;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🚀 TOFcam Web Viewer</h1>
-        <p class="subtitle">Visualização completa com 4 visualizações simultâneas</p>
-    </div>
-    
-    <div class="container">
-        <div class="left-section">
-            <div class="controls-container">
-                <div class="camera-controls">
-                    <label for="cameraSelect">📹 Câmera:</label>
-                    <select id="cameraSelect" onchange="switchCamera()">
-                        <!-- Opções serão preenchidas via JavaScript -->
-                    </select>
-                    <span id="cameraStatus" class="camera-status">Carregando...</span>
-                </div>
-                
-                <div class="depth-controls">
-                    <label for="depthModeSelect">🧠 Modo Profundidade:</label>
-                    <select id="depthModeSelect" onchange="changeDepthMode()">
-                        <option value="midas">MiDaS Puro</option>
-                        <option value="gradient">Gradiente Puro</option>
-                        <option value="hybrid" selected>Híbrido (MiDaS + Gradiente)</option>
-                    </select>
-                    
-                    <div class="weight-controls">
-                        <div class="weight-group">
-                            <label for="midasWeight">MiDaS:</label>
-                            <input type="range" id="midasWeight" min="0" max="100" value="87" oninput="updateWeights()">
-                            <span id="midasValue">87%</span>
-                        </div>
-                        <div class="weight-group">
-                            <label for="gradientWeight">Gradiente:</label>
-                            <input type="range" id="gradientWeight" min="0" max="100" value="58" oninput="updateWeights()">
-                            <span id="gradientValue">58%</span>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="video-container">
-                <img id="videoStream" src="" alt="TOFcam Stream Combinado (4 visualizações)" />
-            </div>
-        </div>
-        
-        <div class="right-section">
-            <div class="stats">
-                <div class="stat-box">
-                    <div class="stat-value strategic" id="strategicValue">--</div>
-                    <div class="stat-label">Strategic Navigation</div>
-                    <div class="algorithm-detail" id="strategicDetail">Planejamento estratégico</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value reactive" id="reactiveValue">--</div>
-                    <div class="stat-label">Reactive Avoidance</div>
-                    <div class="algorithm-detail" id="reactiveDetail">Desvio reativo</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value frame-info" id="frameCount">--</div>
-                    <div class="stat-label">Frame Count</div>
-                    <div class="algorithm-detail">Frames processados</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value" id="status">--</div>
-                    <div class="stat-label">System Status</div>
-                    <div class="algorithm-detail">Estado do sistema</div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        function updateStream() {
-            const img = document.getElementById('videoStream');
-            const oldSrc = img.src;
-            img.onerror = function() {
-                console.log('❌ Erro ao carregar imagem');
-                setTimeout(updateStream, 1000); // Tentar novamente em 1s
-            };
-            img.onload = function() {
-                console.log('✅ Imagem carregada');
-            };
-            img.src = '/stream?' + new Date().getTime();
-        }
-        
-        function loadCameras() {
-            fetch('/cameras')
-                .then(response => response.json())
-                .then(cameras => {
-                    const select = document.getElementById('cameraSelect');
-                    const controls = document.querySelector('.camera-controls');
-                    
-                    select.innerHTML = '';
-                    cameras.forEach(cam => {
-                        const option = document.createElement('option');
-                        option.value = cam.id;
-                        option.textContent = `Câmera ${cam.id}`;
-                        if (cam.active) option.selected = true;
-                        select.appendChild(option);
-                    });
-                    
-                    const activeCamera = cameras.find(cam => cam.active);
-                    
-                    // Se há apenas uma câmera, desabilitar seletor
-                    if (cameras.length <= 1) {
-                        select.disabled = true;
-                        document.getElementById('cameraStatus').textContent = 
-                            `📹 Câmera ${activeCamera ? activeCamera.id : 'N/A'} (única disponível)`;
-                    } else {
-                        select.disabled = false;
-                        document.getElementById('cameraStatus').textContent = 
-                            `Ativa: Câmera ${activeCamera ? activeCamera.id : 'N/A'} (${cameras.length} disponíveis)`;
-                    }
-                })
-                .catch(err => {
-                    console.error('Erro ao carregar câmeras:', err);
-                    document.getElementById('cameraStatus').textContent = 'Erro';
-                });
-        }
-        
-        function switchCamera() {
-            const select = document.getElementById('cameraSelect');
-            const cameraId = parseInt(select.value);
-            
-            document.getElementById('cameraStatus').textContent = 'Trocando...';
-            
-            fetch('/switch_camera', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({camera_id: cameraId})
-            })
-            .then(response => response.json())
-            .then(result => {
-                if (result.success) {
-                    document.getElementById('cameraStatus').textContent = `Ativa: Câmera ${cameraId}`;
-                    console.log(`✅ Câmera trocada para ${cameraId}`);
-                } else {
-                    document.getElementById('cameraStatus').textContent = 'Erro na troca';
-                    console.error(`❌ Erro ao trocar câmera: ${result.error}`);
-                }
-            })
-            .catch(err => {
-                console.error('Erro ao trocar câmera:', err);
-                document.getElementById('cameraStatus').textContent = 'Erro na troca';
-            });
-        }
-        
-        function changeDepthMode() {
-            const select = document.getElementById('depthModeSelect');
-            const mode = select.value;
-            
-            fetch('/depth_mode', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({mode: mode})
-            })
-            .then(response => response.json())
-            .then(result => {
-                if (result.success) {
-                    console.log(`✅ Modo de profundidade alterado para: ${result.mode}`);
-                } else {
-                    console.error(`❌ Erro ao alterar modo: ${result.error}`);
-                }
-            })
-            .catch(err => {
-                console.error('Erro ao alterar modo de profundidade:', err);
-            });
-        }
-        
-        function updateWeights() {
-            const midasWeight = document.getElementById('midasWeight').value;
-            const gradientWeight = document.getElementById('gradientWeight').value;
-            
-            // Atualizar displays
-            document.getElementById('midasValue').textContent = midasWeight + '%';
-            document.getElementById('gradientValue').textContent = gradientWeight + '%';
-            
-            // Enviar para servidor
-            fetch('/depth_weights', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({
-                    midas_weight: midasWeight / 100.0,
-                    gradient_weight: gradientWeight / 100.0
-                })
-            })
-            .then(response => response.json())
-            .then(result => {
-                if (result.success) {
-                    console.log(`✅ Pesos atualizados - MiDaS: ${result.midas_weight}, Gradiente: ${result.gradient_weight}`);
-                } else {
-                    console.error(`❌ Erro ao atualizar pesos: ${result.error}`);
-                }
-            })
-            .catch(err => {
-                console.error('Erro ao atualizar pesos:', err);
-            });
-        }
-        
-        function updateData() {
-            fetch('/data')
-                .then(response => response.json())
-                .then(data => {
-                    // Strategic
-                    const strategicEl = document.getElementById('strategicValue');
-                    strategicEl.textContent = data.strategic.toFixed(3) + '°';
-                    
-                    // Reactive
-                    const reactiveEl = document.getElementById('reactiveValue');
-                    reactiveEl.textContent = data.reactive.toFixed(3) + '°';
-                    
-                    // Frame count
-                    document.getElementById('frameCount').textContent = data.frame_count;
-                    
-                    // Status
-                    const diff = Math.abs(data.strategic - data.reactive);
-                    let status, statusClass;
-                    if (diff < 0.1) {
-                        status = 'ACORDO ✅';
-                        statusClass = 'positive';
-                    } else if (diff < 0.3) {
-                        status = 'SIMILAR 🟡';
-                        statusClass = 'neutral';
-                    } else {
-                        status = 'DIVERGEM 🔴';
-                        statusClass = 'negative';
-                    }
-                    
-                    const statusEl = document.getElementById('status');
-                    statusEl.textContent = status;
-                    statusEl.className = 'stat-value ' + statusClass;
-                })
-                .catch(err => console.error('Erro ao buscar dados:', err));
-        }
-        
-        // Atualizar stream e dados
-        console.log('🚀 Iniciando atualizações...');
-        setInterval(updateStream, 500);  // 2 FPS (mais lento para debug)
-        setInterval(updateData, 1000);    // 1 Hz
-        
-        // Primeira atualização
-        console.log('📡 Primeira atualização...');
-        loadCameras();  // Carregar lista de câmeras
-        updateStream();
-        updateData();
-    </script>
-</body>
-</html>
-        '''
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+    def serve_asset(self, asset):
+        """Servir página/CSS/JS em cache (gzip se aceito; 304 se o cliente já tem)."""
+        status, body, headers = STATIC_ASSETS.response(
+            asset, self.path, self.headers.get('Accept-Encoding'), self.headers.get('If-None-Match')
+        )
+        if status == 304:
+            self.send_response(304)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_body(status, asset.content_type, body, headers)
     
     def serve_stream(self):
-        """Servir stream de imagem."""
+        """Servir snapshot JPEG (ETag = frame; 304 se o cliente já tem o mais recente)."""
         try:
-            if tofcam_viewer.current_frame:
-                self.send_response(200)
-                self.send_header('Content-type', 'image/jpeg')
-                self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-                self.send_header('Pragma', 'no-cache')
-                self.send_header('Expires', '0')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
+            hub = tofcam_viewer.hub
+            frame_id, frame, _ = hub.latest()
+            if frame is not None:
+                etag = hub.etag(frame_id)
+                # no-cache (sem no-store): o navegador guarda e revalida com If-None-Match
+                headers = (('ETag', etag), ('Cache-Control', 'no-cache'))
+                if etag_matches(self.headers.get('If-None-Match'), etag):
+                    self.send_response(304)
+                    for name, value in headers:
+                        self.send_header(name, value)
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    return
                 
-                img_data = base64.b64decode(tofcam_viewer.current_frame)
-                self.wfile.write(img_data)
-                print(f"🖼️  Imagem servida: {len(img_data)} bytes para {self.path}")
+                self.send_body(200, 'image/jpeg', frame.jpeg, headers)
             else:
                 print(f"❌ Nenhuma imagem disponível para {self.path}")
                 self.send_error(503, "Nenhuma imagem disponível")
@@ -1286,135 +1292,94 @@ class TOFcamRequestHandler(BaseHTTPRequestHandler):
             print(f"❌ Erro ao servir imagem: {e}")
             self.send_error(500, f"Erro interno: {e}")
     
+    def serve_mjpeg(self):
+        """Servir stream MJPEG (multipart/x-mixed-replace): cada frame novo é enviado assim que capturado."""
+        self.start_stream(f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}',
+                          'no-cache, no-store, must-revalidate')
+
+        hub = tofcam_viewer.hub
+        frame_id = 0
+        try:
+            with hub.client():
+                while not hub.closed:
+                    frame_id, frame, _ = hub.wait(frame_id)
+                    if frame is None:
+                        continue
+                    self.wfile.write(mjpeg_part(frame))
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # Cliente desconectou
+
+    def serve_events(self):
+        """Servir Server-Sent Events: JSON de navegação de cada frame, assim que publicado."""
+        self.start_stream('text/event-stream')
+
+        hub = tofcam_viewer.hub
+        frame_id = 0
+        last_write = time.time()
+        try:
+            with hub.client():
+                while not hub.closed:
+                    frame_id, data_json = hub.wait_json(frame_id)
+                    if data_json is None:
+                        if time.time() - last_write >= SSE_KEEPALIVE:
+                            self.wfile.write(b': keepalive\n\n')
+                            self.wfile.flush()
+                            last_write = time.time()
+                        continue
+                    self.wfile.write(sse_event(frame_id, data_json))
+                    self.wfile.flush()
+                    last_write = time.time()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # Cliente desconectou
+
     def serve_data(self):
-        """Servir dados em JSON."""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        data = tofcam_viewer.current_data if tofcam_viewer.current_data else {}
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        """Servir dados em JSON (/data?image=1 inclui o frame como data URI)."""
+        self.send_body(200, 'application/json', data_payload(tofcam_viewer, self.path),
+                       (('Cache-Control', 'no-cache'),))
     
-    def serve_cameras(self):
-        """Servir lista de câmeras disponíveis."""
-        cameras_data = []
-        for cam_id in tofcam_viewer.available_cameras:
-            cameras_data.append({
-                'id': cam_id,
-                'active': cam_id == tofcam_viewer.current_camera
-            })
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(cameras_data).encode('utf-8'))
-    
-    def handle_camera_switch(self):
-        """Lidar com troca de câmera."""
-        try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            camera_id = data.get('camera_id')
-            
-            success = tofcam_viewer.switch_camera(camera_id)
-            
-            response = {'success': success}
-            if not success:
-                response['error'] = f'Falha ao trocar para câmera {camera_id}'
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-        except Exception as e:
-            error_response = {'success': False, 'error': str(e)}
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
+    def serve_binary(self):
+        """Servir grade de zonas ou depth map em binário (ETag = frame; 304 se já recebido)."""
+        status, payload, etag = binary_payload(tofcam_viewer, self.path)
+        if status != 200:
+            self.send_error(status, "Nenhum dado disponível")
+            return
+        headers = (('ETag', etag), ('Cache-Control', 'no-cache'))
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            for name, value in headers:
+                self.send_header(name, value)
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            return
+        self.send_body(200, 'application/octet-stream', payload, headers)
     
-    def handle_depth_mode(self):
-        """Lidar com mudança de modo de profundidade."""
-        try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            mode = data.get('mode', 'hybrid')
-            
-            if mode in ['midas', 'gradient', 'hybrid']:
-                tofcam_viewer.depth_mode = mode
-                success = True
-                print(f"🎯 Modo de profundidade alterado para: {mode}")
-            else:
-                success = False
-            
-            response = {'success': success, 'mode': tofcam_viewer.depth_mode}
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-        except Exception as e:
-            error_response = {'success': False, 'error': str(e)}
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+    def serve_cameras(self):
+        """Servir lista de câmeras disponíveis."""
+        self.send_body(200, 'application/json', cameras_payload(tofcam_viewer),
+                       (('Cache-Control', 'no-cache'),))
     
-    def handle_depth_weights(self):
-        """Lidar com mudança de pesos de profundidade."""
+    def handle_json_action(self, action):
+        """Executar uma ação POST JSON (ver POST_ACTIONS) e responder em JSON."""
         try:
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            midas_weight = float(data.get('midas_weight', 0.87))
-            gradient_weight = float(data.get('gradient_weight', 0.29))
-            
-            # Validar pesos (0.0 a 1.0)
-            midas_weight = max(0.0, min(1.0, midas_weight))
-            gradient_weight = max(0.0, min(1.0, gradient_weight))
-            
-            tofcam_viewer.midas_weight = midas_weight
-            tofcam_viewer.gradient_weight = gradient_weight
-            
-            print(f"⚖️ Pesos alterados - MiDaS: {midas_weight:.2f}, Gradiente: {gradient_weight:.2f}")
-            
-            response = {
-                'success': True, 
-                'midas_weight': midas_weight,
-                'gradient_weight': gradient_weight
-            }
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
+            status, response = 200, action(tofcam_viewer, json.loads(post_data.decode('utf-8')))
         except Exception as e:
-            error_response = {'success': False, 'error': str(e)}
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            status, response = 500, {'success': False, 'error': str(e)}
+        
+        self.send_body(status, 'application/json', json.dumps(response).encode('utf-8'))
     
     def log_message(self, format, *args):
         """Suprimir logs HTTP."""
         pass
 
-def main():
-    """Função principal."""
+def main(backend="threaded"):
+    """
+    Função principal.
+    backend: "threaded" (ThreadedHTTPServer, uma thread por conexão) ou
+             "async" (tofcam/web_async.py, um event loop para todas as conexões).
+    """
     print("🌐 TOFcam Web Viewer")
     print("=" * 40)
     
@@ -1427,6 +1392,17 @@ def main():
         
         # Iniciar servidor web
         port = 8082
+        if backend == "async":
+            try:
+                from tofcam.web_async import AsyncWebServer
+            except ImportError:
+                from web_async import AsyncWebServer
+            print(f"🚀 Servidor asyncio iniciado em: http://localhost:{port}")
+            print("⏹️  Pressione Ctrl+C para parar")
+            print("-" * 40)
+            AsyncWebServer(tofcam_viewer, 'localhost', port).run()
+            return
+        
         server = ThreadedHTTPServer(('localhost', port), TOFcamRequestHandler)
         
         print(f"🚀 Servidor iniciado em: http://localhost:{port}")
@@ -1459,4 +1435,4 @@ def main():
         print("✅ Servidor parado!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(backend="async" if "--async" in sys.argv[1:] else "threaded")
\ No newline at end of file
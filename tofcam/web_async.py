@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+TOFcam Web Viewer - Backend asyncio
+===================================
+
+Alternativa ao ThreadedHTTPServer com as mesmas rotas, usando só a
+biblioteca padrão. Cada conexão é uma corrotina em um único event loop,
+então centenas de streams ociosos (/mjpeg, /events) não ocupam centenas
+de threads nem disputam o GIL com captura e inferência.
+
+O FrameHub continua sendo publicado pela thread de captura; o
+AsyncFrameBridge leva cada publicação para o event loop via
+loop.call_soon_threadsafe.
+
+Usage:
+    python tofcam/web.py --async
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import urlparse
+
+try:
+    from tofcam import web
+except ImportError:
+    import web
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+# Limite do cabeçalho HTTP de uma requisição
+MAX_HEADER_SIZE = 64 * 1024
+
+
+class AsyncFrameBridge:
+    """
+    Ponte FrameHub -> event loop: a cada publicação (ou fechamento) o future
+    atual é resolvido e trocado por um novo; os clientes aguardam esse future.
+    """
+
+    def __init__(self, hub, loop):
+        self.hub = hub
+        self.loop = loop
+        self._future = loop.create_future()
+        hub.add_listener(self._on_publish)
+
+    def _on_publish(self):
+        # Thread de captura: só agenda o aviso no event loop
+        try:
+            self.loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass  # Event loop já encerrado
+
+    def _wake(self):
+        future, self._future = self._future, self.loop.create_future()
+        future.set_result(None)
+
+    async def wait(self, last_frame_id, timeout=1.0):
+        """
+        Aguardar um frame mais novo que last_frame_id (drop-to-latest).
+        Retorna hub.snapshot() ou None no timeout/fechamento.
+        """
+        if self.hub.frame_id == last_frame_id and not self.hub.closed:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._future), timeout)
+            except asyncio.TimeoutError:
+                pass
+        snapshot = self.hub.snapshot()
+        if snapshot[0] == last_frame_id or snapshot[1] is None:
+            return None
+        return snapshot
+
+    def close(self):
+        self.hub.remove_listener(self._on_publish)
+
+
+class AsyncWebServer:
+    """Servidor HTTP asyncio com as rotas do TOFcamRequestHandler."""
+
+    def __init__(self, viewer, host='localhost', port=8082):
+        self.viewer = viewer
+        self.host = host
+        self.port = port
+        self.server = None
+        self.bridge = None
+        self._connections = set()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.bridge = AsyncFrameBridge(self.viewer.hub, loop)
+        self.server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, backlog=256
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.bridge:
+            self.bridge.close()
+        if self.server:
+            self.server.close()
+        # Encerrar streams ainda abertos
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+
+    def run(self):
+        """Bloquear servindo até Ctrl+C."""
+        asyncio.run(self.serve_forever())
+
+    # ---- HTTP ----
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            # HTTP/1.1 keep-alive: várias requisições por conexão até um stream ou "Connection: close"
+            keep_alive = True
+            while keep_alive:
+                request = await self._read_request(reader)
+                if request is None:
+                    return
+                method, path, version, headers, body = request
+                self.viewer.hub.touch()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                if method == 'GET':
+                    keep_alive = await self._handle_get(path, headers, writer, keep_alive)
+                elif method == 'POST':
+                    await self._handle_post(path, body, writer, keep_alive)
+                else:
+                    self._respond(writer, 404, 'text/plain', b'Not Found', keep_alive=keep_alive)
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError, asyncio.IncompleteReadError):
+            pass  # Cliente desconectou
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError):
+                pass
+
+    async def _read_request(self, reader):
+        """(method, path, version, headers, body) ou None se a conexão fechar/for inválida."""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return None
+        if len(head) > MAX_HEADER_SIZE:
+            return None
+
+        request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+        parts = request_line.split(' ')
+        if len(parts) != 3:
+            return None
+        method, path, version = parts
+
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        body = b''
+        length = int(headers.get('content-length', 0) or 0)
+        if length:
+            body = await reader.readexactly(length)
+        return method, path, version, headers, body
+
+    def _respond(self, writer, status, content_type, body, extra_headers=(), keep_alive=False):
+        head = [
+            f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(body)}',
+            'Access-Control-Allow-Origin: *',
+            'Connection: keep-alive' if keep_alive else 'Connection: close',
+            *extra_headers,
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+    def _start_stream(self, writer, content_type):
+        head = [
+            'HTTP/1.1 200 OK',
+            f'Content-Type: {content_type}',
+            'Cache-Control: no-cache, no-store, must-revalidate',
+            'Access-Control-Allow-Origin: *',
+            'Connection: close',
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+
+    async def _handle_get(self, path, headers, writer, keep_alive):
+        """Responder um GET; retorna se a conexão continua aberta."""
+        route = urlparse(path).path
+        viewer = self.viewer
+        asset = web.STATIC_ASSETS.get(path)
+        if asset is not None:
+            status, body, asset_headers = web.STATIC_ASSETS.response(
+                asset, path, headers.get('accept-encoding'), headers.get('if-none-match')
+            )
+            extra = [f'{name}: {value}' for name, value in asset_headers]
+            if status == 304:
+                self._respond_not_modified(writer, extra, keep_alive)
+            else:
+                self._respond(writer, status, asset.content_type, body, extra, keep_alive=keep_alive)
+        elif route == '/mjpeg':
+            await self._serve_mjpeg(writer)
+            return False
+        elif route.startswith('/stream'):
+            hub = viewer.hub
+            frame_id, frame, _ = hub.latest()
+            if frame is None:
+                self._respond(writer, 503, 'text/plain', 'Nenhuma imagem disponível'.encode('utf-8'),
+                              keep_alive=keep_alive)
+            else:
+                etag = hub.etag(frame_id)
+                cache_headers = (f'ETag: {etag}', 'Cache-Control: no-cache')
+                if web.etag_matches(headers.get('if-none-match'), etag):
+                    self._respond_not_modified(writer, cache_headers, keep_alive)
+                else:
+                    self._respond(writer, 200, 'image/jpeg', frame.jpeg, cache_headers,
+                                  keep_alive=keep_alive)
+        elif route == '/events':
+            await self._serve_events(writer)
+            return False
+        elif route == '/data':
+            self._respond(writer, 200, 'application/json', web.data_payload(viewer, path),
+                          ('Cache-Control: no-cache',), keep_alive=keep_alive)
+        elif route == '/cameras':
+            self._respond(writer, 200, 'application/json', web.cameras_payload(viewer),
+                          ('Cache-Control: no-cache',), keep_alive=keep_alive)
+        elif route in web.BINARY_ROUTES:
+            status, payload, etag = web.binary_payload(viewer, path)
+            if status != 200:
+                self._respond(writer, status, 'text/plain', 'Nenhum dado disponível'.encode('utf-8'),
+                              keep_alive=keep_alive)
+            else:
+                cache_headers = (f'ETag: {etag}', 'Cache-Control: no-cache')
+                if web.etag_matches(headers.get('if-none-match'), etag):
+                    self._respond_not_modified(writer, cache_headers, keep_alive)
+                else:
+                    self._respond(writer, 200, 'application/octet-stream', payload, cache_headers,
+                                  keep_alive=keep_alive)
+        else:
+            print(f"❌ Endpoint não encontrado: {path}")
+            self._respond(writer, 404, 'text/plain', b'Not Found', keep_alive=keep_alive)
+        return keep_alive
+
+    def _respond_not_modified(self, writer, extra_headers, keep_alive):
+        head = [
+            'HTTP/1.1 304 Not Modified',
+            'Access-Control-Allow-Origin: *',
+            'Connection: keep-alive' if keep_alive else 'Connection: close',
+            *extra_headers,
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+
+    async def _handle_post(self, path, body, writer, keep_alive):
+        action = web.POST_ACTIONS.get(path)
+        if action is None:
+            self._respond(writer, 404, 'text/plain', b'Not Found', keep_alive=keep_alive)
+            return
+        try:
+            data = json.loads(body.decode('utf-8'))
+            # Ações podem bloquear (ex.: abrir câmera): fora do event loop
+            loop = asyncio.get_running_loop()
+            status, response = 200, await loop.run_in_executor(None, action, self.viewer, data)
+        except Exception as e:
+            status, response = 500, {'success': False, 'error': str(e)}
+        self._respond(writer, status, 'application/json', json.dumps(response).encode('utf-8'),
+                      keep_alive=keep_alive)
+
+    async def _serve_mjpeg(self, writer):
+        self._start_stream(writer, f'multipart/x-mixed-replace; boundary={web.MJPEG_BOUNDARY}')
+        hub = self.viewer.hub
+        frame_id = 0
+        with hub.client():
+            while not hub.closed:
+                snapshot = await self.bridge.wait(frame_id)
+                if snapshot is None:
+                    continue
+                frame_id, frame = snapshot[0], snapshot[1]
+                writer.write(web.mjpeg_part(frame))
+                await writer.drain()
+
+    async def _serve_events(self, writer):
+        self._start_stream(writer, 'text/event-stream')
+        hub = self.viewer.hub
+        frame_id = 0
+        last_write = time.time()
+        with hub.client():
+            while not hub.closed:
+                snapshot = await self.bridge.wait(frame_id)
+                if snapshot is None:
+                    if time.time() - last_write >= web.SSE_KEEPALIVE:
+                        writer.write(b': keepalive\n\n')
+                        await writer.drain()
+                        last_write = time.time()
+                    continue
+                frame_id, data_json = snapshot[0], snapshot[3]
+                writer.write(web.sse_event(frame_id, data_json))
+                await writer.drain()
+                last_write = time.time()
@@ -60,6 +60,15 @@ except ImportError:
         StrategicPlanner = ReactiveAvoider = None
         USE_MAPPING = False
 
+try:
+    from tofcam.assets import StaticAssets
+    from tofcam.colormap import DEPTH_COLORMAP
+    from tofcam.discovery import CameraDiscovery
+except ImportError:
+    from assets import StaticAssets
+    from colormap import DEPTH_COLORMAP
+    from discovery import CameraDiscovery
+
 try:
     from ..view import depth_to_color, draw_yaw_arrow
     print("✅ View carregado")
@@ -70,10 +79,8 @@ except ImportError:
     except ImportError as e:
         print(f"⚠️ View não disponível: {e}")
         def depth_to_color(depth):
-            # Fallback: converter depth para colormap
-            import cv2
-            d = (depth * 255).astype(np.uint8)
-            return cv2.applyColorMap(d, cv2.COLORMAP_JET)
+            # Fallback: colormap intuitivo compartilhado
+            return DEPTH_COLORMAP.apply(depth)
         def draw_yaw_arrow(img, angle):
             return img
 
@@ -94,31 +101,14 @@ class TOFcamWebViewer:
         self.current_data = {}
         self.current_camera = 0
         self.available_cameras = []
+        self.discovery = CameraDiscovery()
         
-    def find_available_cameras(self):
-        """Detectar câmeras disponíveis."""
-        cameras = []
+    def find_available_cameras(self, force=False):
+        """Detectar câmeras disponíveis (sondagem paralela, cache entre execuções)."""
         print("🔍 Testando câmeras disponíveis...")
-        
-        # Testar câmeras de 0 a 4 com método simples que funcionava antes
-        for i in range(5):  
-            cap = cv2.VideoCapture(i)
-            
-            if cap.isOpened():
-                # Configurar propriedades básicas apenas
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                
-                # Tentar ler um frame para validar
-                ret, frame = cap.read()
-                if ret and frame is not None and frame.size > 0:
-                    cameras.append(i)
-                    print(f"✅ Câmera {i} disponível - resolução: {frame.shape}")
-                else:
-                    print(f"⚠️ Câmera {i} abriu mas sem frame válido")
-                    
-                cap.release()
+        cameras = self.discovery.discover(force=force)
+        for i in cameras:
+            print(f"✅ Câmera {i} disponível - resolução: {tuple(self.discovery.details[i]['shape'])}")
                 
         self.available_cameras = cameras
         print(f"📹 Total de câmeras funcionais: {len(cameras)} - {cameras}")
@@ -126,6 +116,12 @@ class TOFcamWebViewer:
         print(f"📹 Total de câmeras funcionais: {len(cameras)} - {cameras}")
         return cameras
         
+    def _on_cameras_changed(self, cameras):
+        """Hot-plug: atualizar a lista (a câmera em uso fica, mesmo sem responder à sonda)."""
+        if self.camera_source is not None and self.current_camera not in cameras:
+            cameras = sorted(cameras + [self.current_camera])
+        self.available_cameras = cameras
+        
     def initialize_components(self):
         """Inicializar componentes do sistema."""
         print("🔍 Detectando câmeras disponíveis...")
@@ -333,7 +329,7 @@ class TOFcamWebViewer:
                 # Normalizar para 0-1 como no main_analyzer
                 depth_normalized = depth_map.astype(np.float32)
                 # Converter para visualização usando a mesma função
-                depth_color = depth_to_color(depth_map) if depth_to_color else cv2.applyColorMap((depth_map * 255).astype(np.uint8), cv2.COLORMAP_JET)
+                depth_color = depth_to_color(depth_map) if depth_to_color else DEPTH_COLORMAP.apply(depth_map)
             except Exception as e:
                 print(f"⚠️ Erro no MiDaS: {e}")
                 # Fallback para análise simples
@@ -341,14 +337,14 @@ class TOFcamWebViewer:
                 blurred = cv2.GaussianBlur(gray, (5, 5), 0)
                 depth_map = (255 - blurred).astype(np.float32) / 255.0
                 depth_normalized = depth_map
-                depth_color = cv2.applyColorMap((depth_map * 255).astype(np.uint8), cv2.COLORMAP_JET)
+                depth_color = DEPTH_COLORMAP.apply(depth_map)
         else:
             # Análise simples baseada em luminosidade
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
             depth_map = (255 - blurred).astype(np.float32) / 255.0
             depth_normalized = depth_map
-            depth_color = cv2.applyColorMap((depth_map * 255).astype(np.uint8), cv2.COLORMAP_JET)
+            depth_color = DEPTH_COLORMAP.apply(depth_map)
         
         # Processar algoritmos de navegação com análise sofisticada (igual ao main_analyzer)
         h, w = depth_normalized.shape
@@ -474,6 +470,9 @@ class TOFcamWebViewer:
     def start_capture(self):
         """Iniciar captura em thread separada."""
         self.is_running = True
+        # Hot-plug só faz sentido depois de uma descoberta com dispositivos reais
+        if self.discovery.last_fingerprint is not None:
+            self.discovery.start_rescan(self._on_cameras_changed)
         self.capture_thread = threading.Thread(target=self.capture_loop)
         self.capture_thread.daemon = True
         self.capture_thread.start()
@@ -482,6 +481,7 @@ class TOFcamWebViewer:
         """Parar captura e liberar recursos."""
         print("⏹️  Parando captura...")
         self.is_running = False
+        self.discovery.stop_rescan()
         
         # Aguardar thread terminar
         if hasattr(self, 'capture_thread') and self.capture_thread.is_alive():
@@ -500,12 +500,16 @@ class TOFcamWebViewer:
 # Instância global
 tofcam_viewer = TOFcamWebViewer()
 
+# Página do visualizador (tofcam/static/web_viewer.html) e o CSS/JS compartilhados com web.py
+STATIC_ASSETS = StaticAssets(index='web_viewer.html')
+
 class TOFcamRequestHandler(BaseHTTPRequestHandler):
     """Handler para requisições HTTP."""
     
     def do_GET(self):
-        if self.path == '/':
-            self.serve_html()
+        asset = STATIC_ASSETS.get(self.path)
+        if asset is not None:
+            self.serve_asset(asset)
         elif self.path.startswith('/stream'):  # Aceitar /stream com query string
             self.serve_stream()
         elif self.path == '/data':
@@ -522,357 +526,19 @@ class TOFcamRequestHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404)
     
-    def serve_html(self):
-        """Servir página HTML principal."""
-        html_content = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>TOFcam Web Viewer - Interface Completa</title>
-    <meta charset="utf-8">
-    <style>
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            margin: 0; 
-            padding: 20px; 
-            background: linear-gradient(135deg, #0f0f23 0%, #1a1a3a 100%); 
-            color: white; 
-            min-height: 100vh;
-        }
-        .header { 
-            text-align: center; 
-            margin-bottom: 30px;
-            background: rgba(255,255,255,0.05);
-            padding: 20px;
-            border-radius: 15px;
-            backdrop-filter: blur(10px);
-        }
-        .header h1 {
-            font-size: 2.5em;
-            background: linear-gradient(45deg, #00ffff, #ff00ff);
-            background-clip: text;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin: 0;
-        }
-        .subtitle {
-            color: #aaa;
-            font-size: 1.1em;
-            margin-top: 10px;
-        }
-        .container { 
-            display: flex; 
-            flex-direction: column; 
-            align-items: center; 
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .camera-controls {
-            margin-bottom: 30px;
-            padding: 20px;
-            background: rgba(42,42,62,0.8);
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            gap: 15px;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.3);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.1);
-        }
-        .camera-controls label {
-            font-weight: bold;
-            color: #00ffff;
-        }
-        .camera-controls select {
-            padding: 8px 15px;
-            background: rgba(26,26,46,0.9);
-            color: white;
-            border: 2px solid #444;
-            border-radius: 8px;
-            font-size: 14px;
-            cursor: pointer;
-            transition: border-color 0.3s ease;
-        }
-        .camera-controls select:hover {
-            border-color: #00ffff;
-        }
-        .camera-status {
-            color: #00ff88;
-            font-size: 14px;
-            font-weight: 500;
-        }
-        .video-container { 
-            border: 3px solid #333; 
-            border-radius: 15px; 
-            overflow: hidden; 
-            margin-bottom: 30px; 
-            box-shadow: 0 15px 40px rgba(0,0,0,0.4);
-            position: relative;
-        }
-        .video-container::before {
-            content: '';
-            position: absolute;
-            top: -2px;
-            left: -2px;
-            right: -2px;
-            bottom: -2px;
-            background: linear-gradient(45deg, #00ffff, #ff00ff, #ffff00, #00ffff);
-            border-radius: 17px;
-            z-index: -1;
-            animation: borderGlow 3s linear infinite;
-        }
-        @keyframes borderGlow {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-        .stats { 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); 
-            gap: 20px; 
-            width: 100%; 
-            max-width: 1000px; 
-        }
-        .stat-box { 
-            background: rgba(42,42,62,0.8); 
-            padding: 25px; 
-            border-radius: 12px; 
-            text-align: center;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.1);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }
-        .stat-box:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 35px rgba(0,0,0,0.3);
-        }
-        .stat-value { 
-            font-size: 28px; 
-            font-weight: bold; 
-            margin-bottom: 10px;
-            text-shadow: 0 2px 4px rgba(0,0,0,0.5);
-        }
-        .stat-label {
-            color: #aaa;
-            font-size: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        .strategic { color: #00ffff; text-shadow: 0 0 10px #00ffff; }
-        .reactive { color: #ff00ff; text-shadow: 0 0 10px #ff00ff; }
-        .positive { color: #00ff88; }
-        .negative { color: #ff6666; }
-        .neutral { color: #ffff00; }
-        .frame-info { color: #88ccff; }
-        
-        #videoStream { 
-            max-width: 100%; 
-            height: auto;
-            display: block;
-        }
-        
-        .loading {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        
-        .spinner {
-            width: 20px;
-            height: 20px;
-            border: 2px solid #444;
-            border-top: 2px solid #00ffff;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .algorithm-detail {
-            font-size: 12px;
-            color: #999;
-            margin-top: 8px;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🚀 TOFcam Web Viewer</h1>
-        <p class="subtitle">Visualização completa com 4 visualizações simultâneas</p>
-    </div>
-    
-    <div class="container">
-        <div class="camera-controls">
-            <label for="cameraSelect">📹 Câmera:</label>
-            <select id="cameraSelect" onchange="switchCamera()">
-                <!-- Opções serão preenchidas via JavaScript -->
-            </select>
-            <span id="cameraStatus" class="camera-status">Carregando...</span>
-        </div>
-        
-        <div class="video-container">
-            <img id="videoStream" src="" alt="TOFcam Stream Combinado (4 visualizações)" />
-        </div>
-        
-        <div class="stats">
-            <div class="stat-box">
-                <div class="stat-value strategic" id="strategicValue">--</div>
-                <div class="stat-label">Strategic Navigation</div>
-                <div class="algorithm-detail" id="strategicDetail">Planejamento estratégico</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value reactive" id="reactiveValue">--</div>
-                <div class="stat-label">Reactive Avoidance</div>
-                <div class="algorithm-detail" id="reactiveDetail">Desvio reativo</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value frame-info" id="frameCount">--</div>
-                <div class="stat-label">Frame Count</div>
-                <div class="algorithm-detail">Frames processados</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value" id="status">--</div>
-                <div class="stat-label">System Status</div>
-                <div class="algorithm-detail">Estado do sistema</div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        function updateStream() {
-            const img = document.getElementById('videoStream');
-            const oldSrc = img.src;
-            img.onerror = function() {
-                console.log('❌ Erro ao carregar imagem');
-                setTimeout(updateStream, 1000); // Tentar novamente em 1s
-            };
-            img.onload = function() {
-                console.log('✅ Imagem carregada');
-            };
-            img.src = '/stream?' + new Date().getTime();
-        }
-        
-        function loadCameras() {
-            fetch('/cameras')
-                .then(response => response.json())
-                .then(cameras => {
-                    const select = document.getElementById('cameraSelect');
-                    const controls = document.querySelector('.camera-controls');
-                    
-                    select.innerHTML = '';
-                    cameras.forEach(cam => {
-                        const option = document.createElement('option');
-                        option.value = cam.id;
-                        option.textContent = `Câmera ${cam.id}`;
-                        if (cam.active) option.selected = true;
-                        select.appendChild(option);
-                    });
-                    
-                    const activeCamera = cameras.find(cam => cam.active);
-                    
-                    // Se há apenas uma câmera, desabilitar seletor
-                    if (cameras.length <= 1) {
-                        select.disabled = true;
-                        document.getElementById('cameraStatus').textContent = 
-                            `📹 Câmera ${activeCamera ? activeCamera.id : 'N/A'} (única disponível)`;
-                    } else {
-                        select.disabled = false;
-                        document.getElementById('cameraStatus').textContent = 
-                            `Ativa: Câmera ${activeCamera ? activeCamera.id : 'N/A'} (${cameras.length} disponíveis)`;
-                    }
-                })
-                .catch(err => {
-                    console.error('Erro ao carregar câmeras:', err);
-                    document.getElementById('cameraStatus').textContent = 'Erro';
-                });
-        }
-        
-        function switchCamera() {
-            const select = document.getElementById('cameraSelect');
-            const cameraId = parseInt(select.value);
-            
-            document.getElementById('cameraStatus').textContent = 'Trocando...';
-            
-            fetch('/switch_camera', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({camera_id: cameraId})
-            })
-            .then(response => response.json())
-            .then(result => {
-                if (result.success) {
-                    document.getElementById('cameraStatus').textContent = `Ativa: Câmera ${cameraId}`;
-                    console.log(`✅ Câmera trocada para ${cameraId}`);
-                } else {
-                    document.getElementById('cameraStatus').textContent = 'Erro na troca';
-                    console.error(`❌ Erro ao trocar câmera: ${result.error}`);
-                }
-            })
-            .catch(err => {
-                console.error('Erro ao trocar câmera:', err);
-                document.getElementById('cameraStatus').textContent = 'Erro na troca';
-            });
-        }
-        
-        function updateData() {
-            fetch('/data')
-                .then(response => response.json())
-                .then(data => {
-                    // Strategic
-                    const strategicEl = document.getElementById('strategicValue');
-                    strategicEl.textContent = data.strategic.toFixed(3) + '°';
-                    
-                    // Reactive
-                    const reactiveEl = document.getElementById('reactiveValue');
-                    reactiveEl.textContent = data.reactive.toFixed(3) + '°';
-                    
-                    // Frame count
-                    document.getElementById('frameCount').textContent = data.frame_count;
-                    
-                    // Status
-                    const diff = Math.abs(data.strategic - data.reactive);
-                    let status, statusClass;
-                    if (diff < 0.1) {
-                        status = 'ACORDO ✅';
-                        statusClass = 'positive';
-                    } else if (diff < 0.3) {
-                        status = 'SIMILAR 🟡';
-                        statusClass = 'neutral';
-                    } else {
-                        status = 'DIVERGEM 🔴';
-                        statusClass = 'negative';
-                    }
-                    
-                    const statusEl = document.getElementById('status');
-                    statusEl.textContent = status;
-                    statusEl.className = 'stat-value ' + statusClass;
-                })
-                .catch(err => console.error('Erro ao buscar dados:', err));
-        }
-        
-        // Atualizar stream e dados
-        console.log('🚀 Iniciando atualizações...');
-        setInterval(updateStream, 500);  // 2 FPS (mais lento para debug)
-        setInterval(updateData, 1000);    // 1 Hz
-        
-        // Primeira atualização
-        console.log('📡 Primeira atualização...');
-        loadCameras();  // Carregar lista de câmeras
-        updateStream();
-        updateData();
-    </script>
-</body>
-</html>
-        '''
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
+    def serve_asset(self, asset):
+        """Servir página/CSS/JS de tofcam/static, carregados uma vez (crus e gzip)."""
+        status, body, headers = STATIC_ASSETS.response(
+            asset, self.path, self.headers.get('Accept-Encoding'), self.headers.get('If-None-Match')
+        )
+        self.send_response(status)
+        if status == 200:
+            self.send_header('Content-type', asset.content_type)
+            self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+        self.wfile.write(body)
     
     def serve_stream(self):
         """Servir stream de imagem."""